@@ -15,8 +15,12 @@ from app.db.base import Base
 # 导入所有模型（用于 autogenerate 支持）
 from app.models.crop import Crop
 from app.models.animal import Animal
-from app.models.flower import Flower
+from app.models.flower import Flower, FlowerColor, FlowerBloomSeason
 from app.models.yield_record import YieldRecord
+from app.models.farm_summary import FarmSummary
+from app.models.farm_event import FarmEvent
+from app.models.yield_rollup import YieldDailyRollup, YieldMonthlyRollup
+from app.models.data_version import DataVersion
 
 # Alembic Config 对象
 config = context.config
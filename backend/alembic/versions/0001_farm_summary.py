@@ -0,0 +1,69 @@
+"""add farm_summary table and variety indexes
+
+基础业务表（crops/animals/flowers/yield_records）由 init_db 创建，
+本迁移在其基础上新增总览统计使用的汇总表
+
+Revision ID: 0001_farm_summary
+Revises:
+Create Date: 2026-10-18 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_farm_summary"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "farm_summary",
+        sa.Column("id", sa.Integer(), primary_key=True, comment="固定为1"),
+        sa.Column("total_crops", sa.Integer(), nullable=False, server_default="0", comment="粮食记录数"),
+        sa.Column("growing_crops", sa.Integer(), nullable=False, server_default="0", comment="生长中数量"),
+        sa.Column("harvested_crops", sa.Integer(), nullable=False, server_default="0", comment="已收获数量"),
+        sa.Column("total_crop_yield", sa.Float(), nullable=False, server_default="0", comment="粮食总产量"),
+        sa.Column("total_animal_varieties", sa.Integer(), nullable=False, server_default="0", comment="动物品种数"),
+        sa.Column("total_animals", sa.Integer(), nullable=False, server_default="0", comment="动物总数量"),
+        sa.Column("estimated_daily_yield", sa.Float(), nullable=False, server_default="0", comment="预估日产量合计"),
+        sa.Column("total_flower_varieties", sa.Integer(), nullable=False, server_default="0", comment="花卉品种数"),
+        sa.Column("total_flowers", sa.Integer(), nullable=False, server_default="0", comment="花卉总数量"),
+        sa.Column("updated_at", sa.DateTime(), comment="更新时间"),
+    )
+    op.create_index("ix_animals_variety", "animals", ["variety"])
+    op.create_index("ix_flowers_variety", "flowers", ["variety"])
+
+    # 用现有数据初始化汇总行
+    op.execute(
+        """
+        INSERT INTO farm_summary (
+            id, total_crops, growing_crops, harvested_crops, total_crop_yield,
+            total_animal_varieties, total_animals, estimated_daily_yield,
+            total_flower_varieties, total_flowers, updated_at
+        )
+        SELECT
+            1,
+            (SELECT count(*) FROM crops),
+            (SELECT count(*) FROM crops WHERE status = 'GROWING'),
+            (SELECT count(*) FROM crops WHERE status = 'HARVESTED'),
+            (SELECT coalesce(sum(total_yield), 0) FROM crops),
+            (SELECT count(DISTINCT variety) FROM animals),
+            (SELECT coalesce(sum(quantity), 0) FROM animals),
+            (SELECT coalesce(sum(estimated_daily_yield), 0) FROM animals),
+            (SELECT count(DISTINCT variety) FROM flowers),
+            (SELECT coalesce(sum(quantity), 0) FROM flowers),
+            now()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_flowers_variety", table_name="flowers")
+    op.drop_index("ix_animals_variety", table_name="animals")
+    op.drop_table("farm_summary")
@@ -0,0 +1,32 @@
+"""add date indexes for calendar range queries
+
+Revision ID: 0002_calendar_date_indexes
+Revises: 0001_farm_summary
+Create Date: 2026-10-18 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_calendar_date_indexes"
+down_revision: Union[str, None] = "0001_farm_summary"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_crops_plant_date", "crops", ["plant_date"])
+    op.create_index("ix_crops_expected_harvest_date", "crops", ["expected_harvest_date"])
+    op.create_index("ix_crops_actual_harvest_date", "crops", ["actual_harvest_date"])
+    op.create_index("ix_flowers_plant_date", "flowers", ["plant_date"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_flowers_plant_date", table_name="flowers")
+    op.drop_index("ix_crops_actual_harvest_date", table_name="crops")
+    op.drop_index("ix_crops_expected_harvest_date", table_name="crops")
+    op.drop_index("ix_crops_plant_date", table_name="crops")
@@ -0,0 +1,60 @@
+"""add farm_events table for calendar queries
+
+Revision ID: 0003_farm_events
+Revises: 0002_calendar_date_indexes
+Create Date: 2026-10-18 11:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_farm_events"
+down_revision: Union[str, None] = "0002_calendar_date_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "farm_events",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("date", sa.Date(), nullable=False, comment="事件日期"),
+        sa.Column("type", sa.String(20), nullable=False, comment="事件类型（plant/harvest）"),
+        sa.Column("kind", sa.String(30), nullable=False, comment="事件细分（plant/expected_harvest/harvest）"),
+        sa.Column("category", sa.String(20), nullable=False, comment="数据分类（crop/flower）"),
+        sa.Column("entity_id", sa.Integer(), nullable=False, comment="来源记录ID"),
+        sa.Column("title", sa.String(200), nullable=False, comment="事件标题"),
+        sa.Column("created_at", sa.DateTime(), comment="创建时间"),
+    )
+    op.create_index("ix_farm_events_id", "farm_events", ["id"])
+    op.create_index("ix_farm_events_date_category", "farm_events", ["date", "category"])
+    op.create_index("ix_farm_events_category_entity", "farm_events", ["category", "entity_id"])
+
+    # 用现有数据回填事件
+    op.execute(
+        """
+        INSERT INTO farm_events (date, type, kind, category, entity_id, title, created_at)
+        SELECT plant_date, 'plant', 'plant', 'crop', id, '种植 ' || name, now()
+        FROM crops
+        UNION ALL
+        SELECT expected_harvest_date, 'harvest', 'expected_harvest', 'crop', id, '预计收获 ' || name, now()
+        FROM crops WHERE expected_harvest_date IS NOT NULL
+        UNION ALL
+        SELECT actual_harvest_date, 'harvest', 'harvest', 'crop', id, '收获 ' || name, now()
+        FROM crops WHERE actual_harvest_date IS NOT NULL
+        UNION ALL
+        SELECT plant_date, 'plant', 'plant', 'flower', id, '种植 ' || name, now()
+        FROM flowers
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_farm_events_category_entity", table_name="farm_events")
+    op.drop_index("ix_farm_events_date_category", table_name="farm_events")
+    op.drop_index("ix_farm_events_id", table_name="farm_events")
+    op.drop_table("farm_events")
@@ -0,0 +1,81 @@
+"""add daily/monthly yield rollup tables
+
+Revision ID: 0004_yield_rollups
+Revises: 0003_farm_events
+Create Date: 2026-10-18 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_yield_rollups"
+down_revision: Union[str, None] = "0003_farm_events"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "yield_daily_rollups",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("crop_id", sa.Integer(), sa.ForeignKey("crops.id", ondelete="CASCADE"), nullable=False, comment="关联粮食ID"),
+        sa.Column("record_date", sa.Date(), nullable=False, comment="记录日期"),
+        sa.Column("week_start", sa.Date(), nullable=False, comment="所在周的周一"),
+        sa.Column("unit", sa.String(20), nullable=False, comment="单位（无单位为空串）"),
+        sa.Column("total_quantity", sa.Float(), nullable=False, comment="产量合计"),
+        sa.Column("total_area", sa.Float(), nullable=False, comment="收获面积合计"),
+        sa.Column("record_count", sa.Integer(), nullable=False, comment="记录条数"),
+        sa.Column("updated_at", sa.DateTime(), comment="更新时间"),
+        sa.UniqueConstraint("crop_id", "record_date", "unit", name="uq_yield_daily_rollups_crop_date_unit"),
+    )
+    op.create_index("ix_yield_daily_rollups_id", "yield_daily_rollups", ["id"])
+    op.create_index("ix_yield_daily_rollups_record_date", "yield_daily_rollups", ["record_date"])
+    op.create_index("ix_yield_daily_rollups_week_start", "yield_daily_rollups", ["week_start"])
+
+    op.create_table(
+        "yield_monthly_rollups",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("crop_id", sa.Integer(), sa.ForeignKey("crops.id", ondelete="CASCADE"), nullable=False, comment="关联粮食ID"),
+        sa.Column("month_start", sa.Date(), nullable=False, comment="月份第一天"),
+        sa.Column("year", sa.Integer(), nullable=False, comment="年份"),
+        sa.Column("unit", sa.String(20), nullable=False, comment="单位（无单位为空串）"),
+        sa.Column("total_quantity", sa.Float(), nullable=False, comment="产量合计"),
+        sa.Column("total_area", sa.Float(), nullable=False, comment="收获面积合计"),
+        sa.Column("record_count", sa.Integer(), nullable=False, comment="记录条数"),
+        sa.Column("updated_at", sa.DateTime(), comment="更新时间"),
+        sa.UniqueConstraint("crop_id", "month_start", "unit", name="uq_yield_monthly_rollups_crop_month_unit"),
+    )
+    op.create_index("ix_yield_monthly_rollups_id", "yield_monthly_rollups", ["id"])
+    op.create_index("ix_yield_monthly_rollups_month_start", "yield_monthly_rollups", ["month_start"])
+    op.create_index("ix_yield_monthly_rollups_year", "yield_monthly_rollups", ["year"])
+
+    # 用现有产量记录回填
+    op.execute(
+        """
+        INSERT INTO yield_daily_rollups
+            (crop_id, record_date, week_start, unit, total_quantity, total_area, record_count, updated_at)
+        SELECT crop_id, record_date, date_trunc('week', record_date)::date, coalesce(unit, ''),
+               sum(quantity), sum(coalesce(area_harvested, 0)), count(*), now()
+        FROM yield_records
+        GROUP BY crop_id, record_date, coalesce(unit, '')
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO yield_monthly_rollups
+            (crop_id, month_start, year, unit, total_quantity, total_area, record_count, updated_at)
+        SELECT crop_id, date_trunc('month', record_date)::date, extract(year FROM record_date)::int,
+               unit, sum(total_quantity), sum(total_area), sum(record_count), now()
+        FROM yield_daily_rollups
+        GROUP BY crop_id, date_trunc('month', record_date)::date, extract(year FROM record_date)::int, unit
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("yield_monthly_rollups")
+    op.drop_table("yield_daily_rollups")
@@ -0,0 +1,71 @@
+"""normalize flower colors / bloom seasons into indexed lookup tables
+
+Revision ID: 0005_flower_tags
+Revises: 0004_yield_rollups
+Create Date: 2026-10-18 13:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_flower_tags"
+down_revision: Union[str, None] = "0004_yield_rollups"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "flower_colors",
+        sa.Column("flower_id", sa.Integer(), sa.ForeignKey("flowers.id", ondelete="CASCADE"), primary_key=True, comment="关联花卉ID"),
+        sa.Column("color", sa.String(50), primary_key=True, comment="颜色"),
+    )
+    op.create_index("ix_flower_colors_color_flower", "flower_colors", ["color", "flower_id"])
+
+    op.create_table(
+        "flower_bloom_seasons",
+        sa.Column("flower_id", sa.Integer(), sa.ForeignKey("flowers.id", ondelete="CASCADE"), primary_key=True, comment="关联花卉ID"),
+        sa.Column("season", sa.String(20), primary_key=True, comment="季节（spring/summer/autumn/winter）"),
+    )
+    op.create_index("ix_flower_bloom_seasons_season_flower", "flower_bloom_seasons", ["season", "flower_id"])
+
+    # 回填颜色
+    op.execute(
+        """
+        INSERT INTO flower_colors (flower_id, color)
+        SELECT DISTINCT f.id, c.color
+        FROM flowers f, json_array_elements_text(f.colors) AS c(color)
+        WHERE json_typeof(f.colors) = 'array' AND c.color <> ''
+        """
+    )
+
+    # 回填季节：优先 bloom_seasons 明细，否则 ALL_YEAR 展开为四季，其余取 bloom_season
+    op.execute(
+        """
+        INSERT INTO flower_bloom_seasons (flower_id, season)
+        SELECT DISTINCT f.id, s.season
+        FROM flowers f, json_array_elements_text(f.bloom_seasons) AS s(season)
+        WHERE json_typeof(f.bloom_seasons) = 'array'
+        UNION
+        SELECT f.id, s.season
+        FROM flowers f, unnest(ARRAY['spring', 'summer', 'autumn', 'winter']) AS s(season)
+        WHERE (f.bloom_seasons IS NULL OR json_typeof(f.bloom_seasons) <> 'array'
+               OR json_array_length(f.bloom_seasons) = 0)
+          AND f.bloom_season = 'ALL_YEAR'
+        UNION
+        SELECT f.id, lower(f.bloom_season::text)
+        FROM flowers f
+        WHERE (f.bloom_seasons IS NULL OR json_typeof(f.bloom_seasons) <> 'array'
+               OR json_array_length(f.bloom_seasons) = 0)
+          AND f.bloom_season IS NOT NULL AND f.bloom_season <> 'ALL_YEAR'
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("flower_bloom_seasons")
+    op.drop_table("flower_colors")
@@ -0,0 +1,37 @@
+"""add data_versions table for conditional statistics requests
+
+Revision ID: 0006_data_versions
+Revises: 0005_flower_tags
+Create Date: 2026-10-18 14:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_data_versions"
+down_revision: Union[str, None] = "0005_flower_tags"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "data_versions",
+        sa.Column("category", sa.String(20), primary_key=True, comment="数据分类（crop/animal/flower）"),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="0", comment="版本号"),
+        sa.Column("updated_at", sa.DateTime(), comment="更新时间"),
+    )
+    op.execute(
+        """
+        INSERT INTO data_versions (category, version, updated_at)
+        VALUES ('crop', 1, now()), ('animal', 1, now()), ('flower', 1, now())
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("data_versions")
@@ -0,0 +1,49 @@
+"""replace single-column sort indexes with (sort column, id) composites for keyset pagination
+
+Revision ID: 0007_keyset_indexes
+Revises: 0006_data_versions
+Create Date: 2026-10-18 15:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_keyset_indexes"
+down_revision: Union[str, None] = "0006_data_versions"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CROP_SORT_COLUMNS = (
+    "plant_date", "expected_harvest_date", "actual_harvest_date",
+    "name", "variety", "area", "total_yield", "status",
+    "created_at", "updated_at",
+)
+
+
+def upgrade() -> None:
+    # 单列日期索引是复合索引的前缀，直接替换
+    op.drop_index("ix_crops_plant_date", table_name="crops")
+    op.drop_index("ix_crops_expected_harvest_date", table_name="crops")
+    op.drop_index("ix_crops_actual_harvest_date", table_name="crops")
+    op.drop_index("ix_flowers_plant_date", table_name="flowers")
+
+    for column in CROP_SORT_COLUMNS:
+        op.create_index(f"ix_crops_{column}_id", "crops", [column, "id"])
+    op.create_index("ix_animals_acquire_date_id", "animals", ["acquire_date", "id"])
+    op.create_index("ix_flowers_plant_date_id", "flowers", ["plant_date", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_flowers_plant_date_id", table_name="flowers")
+    op.drop_index("ix_animals_acquire_date_id", table_name="animals")
+    for column in reversed(CROP_SORT_COLUMNS):
+        op.drop_index(f"ix_crops_{column}_id", table_name="crops")
+
+    op.create_index("ix_flowers_plant_date", "flowers", ["plant_date"])
+    op.create_index("ix_crops_actual_harvest_date", "crops", ["actual_harvest_date"])
+    op.create_index("ix_crops_expected_harvest_date", "crops", ["expected_harvest_date"])
+    op.create_index("ix_crops_plant_date", "crops", ["plant_date"])
@@ -0,0 +1,42 @@
+"""pg_trgm GIN indexes on name, variety and notes for substring search
+
+Revision ID: 0008_trigram_search
+Revises: 0007_keyset_indexes
+Create Date: 2026-10-18 16:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_trigram_search"
+down_revision: Union[str, None] = "0007_keyset_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_COLUMNS = {
+    "crops": ("name", "variety", "notes"),
+    "animals": ("name", "variety", "notes"),
+    "flowers": ("name", "variety", "notes"),
+}
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table, columns in SEARCH_COLUMNS.items():
+        for column in columns:
+            op.create_index(
+                f"ix_{table}_{column}_trgm",
+                table,
+                [column],
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+            )
+
+
+def downgrade() -> None:
+    for table, columns in SEARCH_COLUMNS.items():
+        for column in reversed(columns):
+            op.drop_index(f"ix_{table}_{column}_trgm", table_name=table)
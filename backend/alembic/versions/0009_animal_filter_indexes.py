@@ -0,0 +1,32 @@
+"""composite (filter column, acquire_date, id) indexes for animal list filters
+
+Revision ID: 0009_animal_filter_indexes
+Revises: 0008_trigram_search
+Create Date: 2026-10-18 17:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009_animal_filter_indexes"
+down_revision: Union[str, None] = "0008_trigram_search"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_animals_product_type_acquire_date_id", "animals", ["product_type", "acquire_date", "id"]
+    )
+    # 单列品种索引是新复合索引的前缀，直接替换
+    op.drop_index("ix_animals_variety", table_name="animals")
+    op.create_index("ix_animals_variety_acquire_date_id", "animals", ["variety", "acquire_date", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_animals_variety_acquire_date_id", table_name="animals")
+    op.create_index("ix_animals_variety", "animals", ["variety"])
+    op.drop_index("ix_animals_product_type_acquire_date_id", table_name="animals")
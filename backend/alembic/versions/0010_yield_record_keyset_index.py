@@ -0,0 +1,27 @@
+"""(crop_id, record_date, id) index for paginating a crop's yield records
+
+Revision ID: 0010_yield_record_keyset_index
+Revises: 0009_animal_filter_indexes
+Create Date: 2026-10-18 19:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010_yield_record_keyset_index"
+down_revision: Union[str, None] = "0009_animal_filter_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_yield_records_crop_id_record_date_id", "yield_records", ["crop_id", "record_date", "id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_yield_records_crop_id_record_date_id", table_name="yield_records")
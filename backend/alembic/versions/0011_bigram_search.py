@@ -0,0 +1,43 @@
+"""search_grams GIN expression indexes for short and CJK substring search
+
+Revision ID: 0011_bigram_search
+Revises: 0010_yield_record_keyset_index
+Create Date: 2026-10-19 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0011_bigram_search"
+down_revision: Union[str, None] = "0010_yield_record_keyset_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("crops", "animals", "flowers")
+
+SEARCH_GRAMS_FUNCTION = """
+CREATE OR REPLACE FUNCTION search_grams(value text) RETURNS text[]
+LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS $$
+    SELECT coalesce(array_agg(DISTINCT gram), '{}')
+    FROM generate_series(1, char_length(value)) AS i,
+         LATERAL (VALUES (substr(lower(value), i, 1)), (substr(lower(value), i, 2))) AS grams(gram)
+$$
+"""
+
+
+def upgrade() -> None:
+    op.execute(SEARCH_GRAMS_FUNCTION)
+    for table in TABLES:
+        op.execute(
+            f"CREATE INDEX ix_{table}_search_grams ON {table} "
+            "USING gin (search_grams(name || ' ' || variety || ' ' || coalesce(notes, '')))"
+        )
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        op.drop_index(f"ix_{table}_search_grams", table_name=table)
+    op.execute("DROP FUNCTION IF EXISTS search_grams(text)")
@@ -0,0 +1,67 @@
+"""
+异步会话适配
+只读路由（列表、详情、统计、搜索）写成 async def，以 await execute(db, select(...)) 读库：
+- ASYNC_DB_ENABLED 开启时换用 AsyncSession，查询由异步驱动在事件循环上等待，请求不占用线程池；
+- 关闭时仍注入同步 Session，这些 await 不会挂起，整个协程在线程池中一次同步跑完。
+写路由仍按同步 Session 编写（写入与汇总、事件、版本号等维护在同一事务中），
+异步模式下整体放进 AsyncSession.run_sync 执行
+"""
+import inspect
+from functools import wraps
+from typing import Callable
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import get_async_db, get_async_read_db, get_db, get_read_db, run_to_completion
+
+# 同步会话依赖 -> 对应的异步会话依赖
+ASYNC_DEPENDENCIES = {
+    get_db: get_async_db,
+    get_read_db: get_async_read_db,
+}
+
+
+def _async_signature(func: Callable) -> inspect.Signature:
+    """参数 db 的依赖换成对应的异步依赖（get_db -> get_async_db，get_read_db -> get_async_read_db）"""
+    signature = inspect.signature(func)
+    return signature.replace(parameters=[
+        param.replace(default=Depends(ASYNC_DEPENDENCIES[param.default.dependency]), annotation=AsyncSession)
+        if name == "db" else param
+        for name, param in signature.parameters.items()
+    ])
+
+
+def async_db(func: Callable) -> Callable:
+    """
+    路由/依赖装饰器
+
+    async def（只读）：异步模式下换用异步会话依赖；同步模式下包装为普通函数，
+    由 FastAPI 放到线程池中以 run_to_completion 执行。
+    def（写操作）：异步模式下函数体在 run_sync 中以同步 Session 执行；同步模式下原样返回
+    """
+    if inspect.iscoroutinefunction(func):
+        if not settings.ASYNC_DB_ENABLED:
+            @wraps(func)
+            def run_in_threadpool(*args, **kwargs):
+                return run_to_completion(func(*args, **kwargs))
+
+            return run_in_threadpool
+
+        @wraps(func)
+        async def native(*args, **kwargs):
+            return await func(*args, **kwargs)
+
+        native.__signature__ = _async_signature(func)
+        return native
+
+    if not settings.ASYNC_DB_ENABLED:
+        return func
+
+    @wraps(func)
+    async def wrapper(*args, db: AsyncSession, **kwargs):
+        return await db.run_sync(lambda session: func(*args, db=session, **kwargs))
+
+    wrapper.__signature__ = _async_signature(func)
+    return wrapper
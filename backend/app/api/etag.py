@@ -0,0 +1,80 @@
+"""
+条件请求（ETag / If-None-Match）支持
+命中时以 304 直接返回，不再构建响应体
+"""
+import hashlib
+from datetime import datetime
+from typing import Iterable, Optional
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy.orm import Session
+
+from app.api.async_session import async_db
+from app.db.session import get_read_db
+from app.services import data_versions
+
+
+def make_etag(*parts) -> str:
+    """由若干组成部分生成强 ETag"""
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+    return f'"{digest}"'
+
+
+def entity_etag(category: str, entity_id: int, updated_at: Optional[datetime]) -> str:
+    """单条记录的 ETag：分类 + ID + 更新时间"""
+    return make_etag(category, entity_id, updated_at.isoformat() if updated_at else "")
+
+
+def list_etag(request: Request, category: str, items: Iterable, total, has_more: bool, next_cursor: Optional[str]) -> str:
+    """
+    列表页的 ETag：分页内每条记录的 ID 与更新时间 + 总数与分页信息
+
+    同时纳入全部查询参数（fields、排序、游标、total 方式、include 等），
+    不同参数返回的不同响应体不会共用同一个 ETag
+    """
+    return make_etag(
+        category,
+        sorted(request.query_params.multi_items()),
+        total,
+        has_more,
+        next_cursor,
+        *(f"{item.id}@{item.updated_at.isoformat() if item.updated_at else ''}" for item in items),
+    )
+
+
+def _matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match 使用弱比较：忽略 W/ 前缀
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return etag in candidates
+
+
+def check_etag(request: Request, response: Response, etag: str) -> None:
+    """ETag 命中时抛出 304，否则在响应头中写入 ETag"""
+    if _matches(request, etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
+
+def stats_etag(*categories: str):
+    """
+    统计接口的条件请求依赖
+
+    ETag 由请求路径、查询参数与相关分类的数据版本号生成，
+    命中时在执行任何聚合查询之前返回 304
+    """
+    @async_db
+    async def dependency(request: Request, response: Response, db: Session = Depends(get_read_db)) -> None:
+        versions = await data_versions.session_versions(db, categories)
+        etag = make_etag(
+            request.url.path,
+            sorted(request.query_params.multi_items()),
+            sorted(versions.items()),
+        )
+        check_etag(request, response, etag)
+
+    return dependency
@@ -0,0 +1,89 @@
+"""
+键集（游标）分页
+游标对客户端不透明，编码了排序字段、排序方向以及最后一条记录的 (排序值, id)，
+下一页以 WHERE (sort_col, id) < (...) 直接定位，不随页数加深而变慢
+"""
+import base64
+import enum
+import json
+from datetime import date, datetime
+from typing import Any, Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, tuple_
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _decode_value(column, raw: Any) -> Any:
+    if raw is None:
+        return None
+    python_type = column.type.python_type
+    if python_type in (date, datetime):
+        return python_type.fromisoformat(raw)
+    return python_type(raw)
+
+
+def encode_cursor(sort_by: str, sort_order: str, value: Any, item_id: int) -> str:
+    payload = json.dumps([sort_by, sort_order, _encode_value(value), item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, sort_order: str, column) -> tuple[Any, int]:
+    """解析游标，游标无效或与当前排序不一致时返回 400"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort_by, cursor_order, raw_value, item_id = json.loads(base64.urlsafe_b64decode(padded))
+        value = _decode_value(column, raw_value)
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="无效的分页游标")
+
+    if cursor_sort_by != sort_by or cursor_order != sort_order or not isinstance(item_id, int):
+        raise HTTPException(status_code=400, detail="分页游标与当前排序条件不一致")
+    return value, item_id
+
+
+def order_by_keyset(query, column, id_column, sort_order: str):
+    """
+    按 (排序列, id) 排序，空值统一排在最后，保证翻页顺序稳定
+
+    非空列不加 NULLS LAST：PostgreSQL 只有排序与 (排序列, id) 索引的空值位置一致时才能用索引，
+    倒序扫描升序索引得到的是 DESC NULLS FIRST，加上 NULLS LAST 会退化为全表排序
+    """
+    if sort_order == "desc":
+        order = column.desc().nulls_last() if column.nullable else column.desc()
+        return query.order_by(order, id_column.desc())
+    order = column.asc().nulls_last() if column.nullable else column.asc()
+    return query.order_by(order, id_column.asc())
+
+
+def seek(query, column, id_column, sort_order: str, value: Any, item_id: int):
+    """定位到游标之后的记录（与 order_by_keyset 的顺序一致）"""
+    if value is None:
+        # 已进入排序列为空的尾部，只按 id 继续
+        id_predicate = id_column < item_id if sort_order == "desc" else id_column > item_id
+        return query.filter(and_(column.is_(None), id_predicate))
+
+    key = tuple_(column, id_column)
+    predicate = key < (value, item_id) if sort_order == "desc" else key > (value, item_id)
+    if column.nullable:
+        predicate = or_(predicate, column.is_(None))
+    return query.filter(predicate)
+
+
+def next_cursor(items: Sequence, limit: int, sort_by: str, sort_order: str) -> Optional[str]:
+    """
+    生成下一页游标
+
+    items 应按 limit + 1 条查询：多出的一条仅用于判断是否还有下一页
+    """
+    if len(items) <= limit:
+        return None
+    last = items[limit - 1]
+    return encode_cursor(sort_by, sort_order, getattr(last, sort_by), last.id)
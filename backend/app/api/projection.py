@@ -0,0 +1,57 @@
+"""
+稀疏字段（fields=）支持
+列表接口只查询请求的列：用 Core select() 取回轻量行元组，
+不创建 ORM 实例、不进入会话标识映射，也不经过响应模型的逐条校验
+"""
+from typing import Iterable, Optional, Sequence
+
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from sqlalchemy import Select
+
+from app.api.serialization import JSON_RESPONSE_CLASS
+
+
+def parse_fields(raw: Optional[str], schema: type[BaseModel]) -> Optional[list[str]]:
+    """
+    解析逗号分隔的字段列表，未指定时返回 None
+
+    字段必须是响应模型中的字段，结果始终以 id 开头；含未知字段时返回 400
+    """
+    if not raw:
+        return None
+    names = list(dict.fromkeys(name.strip() for name in raw.split(",") if name.strip()))
+    unknown = [name for name in names if name not in schema.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"未知字段: {', '.join(unknown)}")
+    return ["id", *(name for name in names if name != "id")]
+
+
+def project(statement: Select, model, names: Sequence[str], extra: Iterable[str] = ()) -> Select:
+    """
+    把 select(model) 换成只选指定列，保留原有筛选条件
+
+    extra 为分页游标与 ETag 需要、但不返回给客户端的列
+    """
+    columns = [getattr(model, name) for name in dict.fromkeys([*names, *extra])]
+    return statement.with_only_columns(*columns)
+
+
+def sparse_response(
+    payload: dict,
+    names: Sequence[str],
+    response: Response,
+    extra: Optional[dict[str, dict]] = None,
+) -> Response:
+    """
+    把 payload["items"] 中的行元组按字段名序列化，并带上已设置的响应头（如 ETag）
+
+    extra 为按 id 附加到每条记录的额外字段：字段名 -> {id: 值}
+    """
+    items = [{name: getattr(row, name) for name in names} for row in payload["items"]]
+    for key, values in (extra or {}).items():
+        for item in items:
+            item[key] = values.get(item["id"])
+    payload["items"] = items
+    return JSON_RESPONSE_CLASS(content=jsonable_encoder(payload), headers=dict(response.headers))
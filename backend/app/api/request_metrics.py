@@ -0,0 +1,282 @@
+"""
+请求监控
+ASGI 中间件按路由模板记录请求耗时、响应体大小、进行中请求数与每个请求的数据库查询次数/耗时，
+以 Prometheus 文本格式在 /metrics 输出（单进程内累计，多 worker 部署时按进程分别抓取）；
+同时在响应头 Server-Timing 中拆分出数据库耗时与响应序列化耗时
+"""
+import asyncio
+import functools
+import time
+from bisect import bisect_left
+from typing import Callable, Optional
+
+from fastapi.routing import APIRoute
+
+from app.api import serialization
+from app.core.config import settings
+from app.db import pool_metrics, query_detector, query_metrics
+
+# 直方图桶上界
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)  # 秒
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)  # 字节
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# 未匹配任何路由的请求（404 等）统一归到一个标签下，避免标签数量随路径无限增长
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict = {}
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def expose(self) -> list[str]:
+        lines = self.header()
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_format(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: tuple = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+
+    def observe(self, labels: tuple, value: float) -> None:
+        series = self._values.get(labels)
+        if series is None:
+            # [各桶计数（最后一个为 +Inf）, 总和, 次数]
+            series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def expose(self) -> list[str]:
+        lines = self.header()
+        for labels, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip([*self.buckets, "+Inf"], counts):
+                cumulative += bucket_count
+                le = _labels(self.labelnames, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_format(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+# 只在事件循环线程中更新与读取，无需加锁
+REQUESTS = Counter("http_requests_total", "请求数", ("method", "route", "status"))
+IN_FLIGHT = Gauge("http_requests_in_flight", "进行中的请求数")
+LATENCY = Histogram("http_request_duration_seconds", "请求耗时（至响应体发送完毕）", ("method", "route"))
+RESPONSE_SIZE = Histogram("http_response_size_bytes", "响应体大小", ("method", "route"), SIZE_BUCKETS)
+DB_TIME = Histogram("http_request_db_duration_seconds", "单个请求的数据库执行耗时", ("method", "route"))
+DB_QUERIES = Histogram("http_request_db_queries", "单个请求的数据库查询次数", ("method", "route"), QUERY_COUNT_BUCKETS)
+SERIALIZE_TIME = Histogram(
+    "http_request_serialize_duration_seconds", "路由函数返回后的响应模型校验与序列化耗时", ("method", "route"),
+)
+
+METRICS = (REQUESTS, IN_FLIGHT, LATENCY, RESPONSE_SIZE, DB_TIME, DB_QUERIES, SERIALIZE_TIME)
+
+
+def _pool_lines() -> list[str]:
+    """连接池状态（与 /metrics/db-pool 同源），等待耗时直方图换算为秒"""
+    pools = pool_metrics.snapshot()
+    gauges = {
+        "db_pool_checked_out": ("checked_out", "借出的连接数"),
+        "db_pool_idle": ("idle", "空闲连接数"),
+        "db_pool_overflow_in_use": ("overflow_in_use", "使用中的溢出连接数"),
+    }
+    counters = {
+        "db_pool_checkouts_total": ("checkouts", "取连接次数"),
+        "db_pool_timeouts_total": ("timeouts", "等待连接超时次数"),
+    }
+    lines = []
+    for kind, metrics in (("gauge", gauges), ("counter", counters)):
+        for name, (key, documentation) in metrics.items():
+            lines += [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+            lines += [f'{name}{{pool="{_escape(p["name"])}"}} {p[key]}' for p in pools if key in p]
+
+    name = "db_pool_wait_seconds"
+    lines += [f"# HELP {name} 取连接的等待耗时", f"# TYPE {name} histogram"]
+    for p in pools:
+        if "wait_ms_histogram" not in p:
+            continue
+        pool = _escape(p["name"])
+        for bucket in p["wait_ms_histogram"]:
+            le = bucket["le"] if bucket["le"] == "+Inf" else str(int(bucket["le"]) / 1000)
+            lines.append(f'{name}_bucket{{pool="{pool}",le="{le}"}} {bucket["count"]}')
+        lines.append(f'{name}_sum{{pool="{pool}"}} {p["wait_ms_sum"] / 1000}')
+        lines.append(f'{name}_count{{pool="{pool}"}} {p["checkouts"]}')
+    return lines
+
+
+def render() -> str:
+    """Prometheus 文本格式（version 0.0.4）"""
+    lines = []
+    for metric in METRICS:
+        lines += metric.expose()
+    lines += _pool_lines()
+    return "\n".join(lines) + "\n"
+
+
+# ============================================
+# 路由与中间件
+# ============================================
+
+def _mark_endpoint_done(call: Callable) -> Callable:
+    """包装路由函数：返回时记下时间点，之后的耗时即响应模型校验与序列化"""
+    if asyncio.iscoroutinefunction(call):
+        @functools.wraps(call)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                _endpoint_done()
+    else:
+        @functools.wraps(call)
+        def wrapper(*args, **kwargs):
+            try:
+                return call(*args, **kwargs)
+            finally:
+                _endpoint_done()
+    return wrapper
+
+
+def _endpoint_done() -> None:
+    timings = query_metrics.current()
+    if timings is not None:
+        timings.endpoint_done = time.perf_counter()
+
+
+class TimedRoute(APIRoute):
+    """
+    在请求统计上记录路由模板与路由函数的返回时间（各 APIRouter 以 route_class 使用）
+
+    开启查询检测时，在响应发送前报告 N+1 嫌疑并检查路由声明的查询预算；
+    开启快速序列化时由 serialization.fast_json 直接生成 JSON 响应（计入 serialize 耗时）
+    """
+
+    def get_route_handler(self) -> Callable:
+        self.dependant.call = serialization.fast_json(self, _mark_endpoint_done(self.dependant.call))
+        handler = super().get_route_handler()
+        route = self.path_format
+        budget = getattr(self.endpoint, "query_budget", None)
+
+        async def timed_handler(request):
+            timings = query_metrics.current()
+            if timings is not None:
+                timings.route = route
+            response = await handler(request)
+            if timings is not None and timings.tracker is not None:
+                query_detector.check_request(route, timings.queries, timings.tracker, budget)
+            return response
+
+        return timed_handler
+
+
+def server_timing(timings: query_metrics.RequestTimings, now: float) -> str:
+    """
+    Server-Timing 响应头（毫秒）
+
+    db: 数据库执行；serialize: 路由函数返回后的响应模型校验与 JSON 序列化；
+    app: 其余的 Python 处理时间；total: 收到请求到开始发送响应
+    """
+    total = now - timings.started
+    serialize = now - timings.endpoint_done if timings.endpoint_done is not None else 0.0
+    app_time = max(total - timings.db_seconds - serialize, 0.0)
+    return ", ".join([
+        f'db;dur={timings.db_seconds * 1000:.2f};desc="{timings.queries} queries"',
+        f"serialize;dur={serialize * 1000:.2f}",
+        f"app;dur={app_time * 1000:.2f}",
+        f"total;dur={total * 1000:.2f}",
+    ])
+
+
+class RequestMetricsMiddleware:
+    """纯 ASGI 中间件（不缓冲响应体，流式导出也能按块计数）"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = query_metrics.start_request()
+        if settings.QUERY_DETECTOR_ENABLED:
+            timings.tracker = query_detector.QueryTracker()
+        status: Optional[int] = None
+        size = 0
+        serialize: Optional[float] = None
+
+        async def send_wrapper(message):
+            nonlocal status, size, serialize
+            if message["type"] == "http.response.start":
+                now = time.perf_counter()
+                status = message["status"]
+                if timings.endpoint_done is not None:
+                    serialize = now - timings.endpoint_done
+                if settings.SERVER_TIMING_ENABLED:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", server_timing(timings, now).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException:
+            status = 500
+            raise
+        finally:
+            IN_FLIGHT.dec()
+            route = timings.route or (scope["path"] if "endpoint" in scope else UNMATCHED_ROUTE)
+            labels = (scope["method"], route)
+            REQUESTS.inc((*labels, status or 500))
+            LATENCY.observe(labels, time.perf_counter() - timings.started)
+            RESPONSE_SIZE.observe(labels, size)
+            DB_TIME.observe(labels, timings.db_seconds)
+            DB_QUERIES.observe(labels, timings.queries)
+            if serialize is not None:
+                SERIALIZE_TIME.observe(labels, serialize)
@@ -0,0 +1,102 @@
+"""
+响应快速序列化（FAST_JSON_ENABLED）
+FastAPI 默认先把返回值（已是模型实例时先 model_dump 成字典）按 response_model 再校验一遍，
+转换为 Python 基础类型后交给标准库 json 编码；
+快速路径为每个路由预编译 TypeAdapter，返回值只校验一次（已是响应模型实例时跳过），
+由 pydantic-core 直接输出 JSON 字节；没有响应模型的路由使用 orjson 编码
+"""
+import inspect
+from functools import wraps
+from typing import Callable, Optional
+
+from fastapi import Response
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.exceptions import ResponseValidationError
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import APIRoute
+from fastapi.utils import is_body_allowed_for_status_code
+from pydantic import TypeAdapter, ValidationError
+
+from app.core.config import settings
+
+# 没有响应模型的路由（及手工构造 JSON 响应处）使用的响应类
+JSON_RESPONSE_CLASS = ORJSONResponse if settings.FAST_JSON_ENABLED else JSONResponse
+
+# 路由函数未声明 Response 参数时，注入子响应（依赖写入的 ETag 等响应头）使用的参数名
+_INJECTED_RESPONSE = "_fast_json_response"
+
+
+class ResponseSerializer:
+    """按路由的 response_model 及 response_model_* 选项预编译的序列化器"""
+
+    def __init__(self, route: APIRoute):
+        self.schema = route.response_model
+        self.adapter = TypeAdapter(route.response_model)
+        self.status_code = route.status_code
+        self.options = {
+            "include": route.response_model_include,
+            "exclude": route.response_model_exclude,
+            "by_alias": route.response_model_by_alias,
+            "exclude_unset": route.response_model_exclude_unset,
+            "exclude_defaults": route.response_model_exclude_defaults,
+            "exclude_none": route.response_model_exclude_none,
+        }
+
+    def dump(self, content) -> bytes:
+        """校验（ORM 对象按属性读取）并序列化为 JSON；已是响应模型实例时直接序列化"""
+        if not (isinstance(self.schema, type) and isinstance(content, self.schema)):
+            try:
+                content = self.adapter.validate_python(content, from_attributes=True)
+            except ValidationError as exc:
+                raise ResponseValidationError(errors=exc.errors(), body=content) from exc
+        return self.adapter.dump_json(content, **self.options)
+
+    def response(self, content, sub_response: Response) -> Response:
+        """与 FastAPI 的处理一致：状态码以依赖/路由函数设置的为准，并带上子响应的响应头"""
+        status_code = sub_response.status_code or self.status_code or 200
+        body = self.dump(content) if is_body_allowed_for_status_code(status_code) else b""
+        response = Response(body, status_code=status_code, media_type="application/json")
+        response.headers.raw.extend(sub_response.headers.raw)
+        return response
+
+
+def _uses_json_response(route: APIRoute) -> bool:
+    response_class = route.response_class
+    if isinstance(response_class, DefaultPlaceholder):
+        response_class = response_class.value
+    return issubclass(response_class, JSONResponse)
+
+
+def fast_json(route: APIRoute, call: Callable) -> Callable:
+    """
+    包装路由函数：返回值不是 Response 时由预编译的序列化器直接生成 JSON 响应，
+    FastAPI 随之跳过自身的响应模型校验与编码
+
+    未开启、没有响应模型或使用了非 JSON 响应类的路由原样返回
+    """
+    if not settings.FAST_JSON_ENABLED or route.response_field is None or not _uses_json_response(route):
+        return call
+
+    serializer = ResponseSerializer(route)
+    dependant = route.dependant
+    injected = dependant.response_param_name is None
+    if injected:
+        dependant.response_param_name = _INJECTED_RESPONSE
+    response_param = dependant.response_param_name
+
+    def take_response(kwargs: dict) -> Response:
+        return kwargs.pop(response_param) if injected else kwargs[response_param]
+
+    if inspect.iscoroutinefunction(call):
+        @wraps(call)
+        async def wrapper(*args, **kwargs):
+            sub_response = take_response(kwargs)
+            content = await call(*args, **kwargs)
+            return content if isinstance(content, Response) else serializer.response(content, sub_response)
+    else:
+        @wraps(call)
+        def wrapper(*args, **kwargs):
+            sub_response = take_response(kwargs)
+            content = call(*args, **kwargs)
+            return content if isinstance(content, Response) else serializer.response(content, sub_response)
+    return wrapper
@@ -1,35 +1,111 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-
-from app.db.session import get_db
+from typing import Optional
+from datetime import date
+
+from app.api import pagination, projection
+from app.api.async_session import async_db
+from app.api.etag import check_etag, entity_etag, list_etag
+from app.api.request_metrics import TimedRoute
+from app.db.query_detector import query_budget
+from app.db.session import execute, get_db, get_read_db
 from app.schemas.animal import (
-    AnimalCreate, AnimalUpdate, AnimalResponse, AnimalListResponse
+    AnimalCreate, AnimalUpdate, AnimalResponse, AnimalListResponse, ProductType
 )
+from app.schemas.bulk import BulkRequest, BulkResponse
 from app.models import Animal
+from app.services import bulk, data_versions, farm_summary, row_counts, search
+from app.services.cache import stats_cache
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.get("/", response_model=AnimalListResponse)
-def get_animals(
+@query_budget(2)
+@async_db
+async def get_animals(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0, description="跳过记录数"),
     limit: int = Query(20, ge=1, le=100, description="每页记录数"),
-    db: Session = Depends(get_db)
+    product_type: Optional[ProductType] = Query(None, description="产品类型筛选"),
+    variety: Optional[str] = Query(None, max_length=100, description="品种筛选"),
+    acquire_date_from: Optional[date] = Query(None, description="购入/出生日期起（含）"),
+    acquire_date_to: Optional[date] = Query(None, description="购入/出生日期止（含）"),
+    min_quantity: Optional[int] = Query(None, ge=0, description="最小数量"),
+    has_yield: Optional[bool] = Query(None, description="是否填写了预估日产产量"),
+    cursor: Optional[str] = Query(None, description="分页游标（使用时忽略 skip）"),
+    total_mode: str = Query(
+        "exact", alias="total", pattern="^(exact|estimate|none)$", description="总数统计方式: exact, estimate, none"
+    ),
+    fields: Optional[str] = Query(None, description="只返回指定字段（逗号分隔，如 id,name,status）"),
+    q: Optional[str] = Query(None, min_length=1, max_length=100, description="按名称、品种、备注模糊搜索（结果按相关度排序）"),
+    db: Session = Depends(get_read_db)
 ):
     """获取动物列表"""
-    query = db.query(Animal).order_by(Animal.acquire_date.desc())
-    total = query.count()
-    items = query.offset(skip).limit(limit).all()
-
-    return {
+    if acquire_date_from and acquire_date_to and acquire_date_to < acquire_date_from:
+        raise HTTPException(status_code=422, detail="acquire_date_to 不能早于 acquire_date_from")
+    field_names = projection.parse_fields(fields, AnimalResponse)
+    query = select(Animal)
+
+    # 筛选（产品类型、品种走 (筛选列, acquire_date, id) 复合索引）
+    if product_type:
+        query = query.filter(Animal.product_type == product_type)
+    if variety:
+        query = query.filter(Animal.variety == variety)
+    if acquire_date_from:
+        query = query.filter(Animal.acquire_date >= acquire_date_from)
+    if acquire_date_to:
+        query = query.filter(Animal.acquire_date <= acquire_date_to)
+    if min_quantity is not None:
+        query = query.filter(Animal.quantity >= min_quantity)
+    if has_yield is not None:
+        yield_column = Animal.estimated_daily_yield
+        query = query.filter(yield_column.isnot(None) if has_yield else yield_column.is_(None))
+    if q:
+        query = query.filter(search.matches(db, Animal, q))
+
+    total = await row_counts.count_rows(db, query, total_mode)
+
+    # 稀疏字段：只查询所需列（另取排序列与 updated_at 供游标和 ETag 使用）
+    if field_names:
+        query = projection.project(query, Animal, field_names, extra=("acquire_date", "updated_at"))
+    if q:
+        # 搜索结果按相关度排序，只支持 skip/limit 分页
+        query = query.order_by(*search.order_by_rank(db, Animal, q))
+    else:
+        query = pagination.order_by_keyset(query, Animal.acquire_date, Animal.id, "desc")
+
+    # 分页：有游标时按键集定位，否则兼容 skip/limit
+    if cursor and not q:
+        value, last_id = pagination.decode_cursor(cursor, "acquire_date", "desc", Animal.acquire_date)
+        query = pagination.seek(query, Animal.acquire_date, Animal.id, "desc", value, last_id)
+    else:
+        query = query.offset(skip)
+    result = await execute(db, query.limit(limit + 1))
+    rows = result.all() if field_names else result.scalars().all()
+    items = rows[:limit]
+    has_more = len(rows) > limit
+    next_cursor = None if q else pagination.next_cursor(rows, limit, "acquire_date", "desc")
+    check_etag(request, response, list_etag(request, "animal", items, total, has_more, next_cursor))
+
+    payload = {
         "items": items,
         "total": total,
         "skip": skip,
-        "limit": limit
+        "limit": limit,
+        "total_mode": total_mode,
+        "has_more": has_more,
+        "next_cursor": next_cursor,
     }
+    if field_names:
+        return projection.sparse_response(payload, field_names, response)
+    return payload
 
 
 @router.post("/", response_model=AnimalResponse, status_code=status.HTTP_201_CREATED)
+@async_db
 def create_animal(
     animal_data: AnimalCreate,
     db: Session = Depends(get_db)
@@ -37,21 +113,39 @@ def create_animal(
     """创建新的动物记录"""
     db_animal = Animal(**animal_data.model_dump())
     db.add(db_animal)
+    db.flush()
+    farm_summary.record_animal_change(db, None, farm_summary.snapshot(db_animal))
+    data_versions.bump(db, "animal")
     db.commit()
+    stats_cache.invalidate("animal")
     db.refresh(db_animal)
     return db_animal
 
 
+@router.post("/bulk", response_model=BulkResponse)
+@async_db
+def bulk_animals(payload: BulkRequest, db: Session = Depends(get_db)):
+    """批量新增、更新、删除动物记录（同一事务内执行，逐条返回结果）"""
+    results = bulk.apply_operations(db, "animal", payload.operations)
+    db.commit()
+    stats_cache.invalidate("animal")
+    return bulk.summarize(results)
+
+
 @router.get("/{animal_id}", response_model=AnimalResponse)
-def get_animal(animal_id: int, db: Session = Depends(get_db)):
+@query_budget(1)
+@async_db
+async def get_animal(animal_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
     """获取单个动物详情"""
-    animal = db.query(Animal).filter(Animal.id == animal_id).first()
+    animal = (await execute(db, select(Animal).where(Animal.id == animal_id).limit(1))).scalar()
     if not animal:
         raise HTTPException(status_code=404, detail="动物记录不存在")
+    check_etag(request, response, entity_etag("animal", animal.id, animal.updated_at))
     return animal
 
 
 @router.put("/{animal_id}", response_model=AnimalResponse)
+@async_db
 def update_animal(
     animal_id: int,
     animal_data: AnimalUpdate,
@@ -62,22 +156,33 @@ def update_animal(
     if not animal:
         raise HTTPException(status_code=404, detail="动物记录不存在")
 
+    before = farm_summary.snapshot(animal)
     update_data = animal_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(animal, field, value)
 
+    db.flush()
+    farm_summary.record_animal_change(db, before, farm_summary.snapshot(animal))
+    data_versions.bump(db, "animal")
     db.commit()
+    stats_cache.invalidate("animal")
     db.refresh(animal)
     return animal
 
 
 @router.delete("/{animal_id}", status_code=status.HTTP_204_NO_CONTENT)
+@async_db
 def delete_animal(animal_id: int, db: Session = Depends(get_db)):
     """删除动物记录"""
     animal = db.query(Animal).filter(Animal.id == animal_id).first()
     if not animal:
         raise HTTPException(status_code=404, detail="动物记录不存在")
 
+    before = farm_summary.snapshot(animal)
     db.delete(animal)
+    db.flush()
+    farm_summary.record_animal_change(db, before, None)
+    data_versions.bump(db, "animal")
     db.commit()
+    stats_cache.invalidate("animal")
     return None
@@ -1,28 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from datetime import date
 from typing import Optional
 
-from app.db.session import get_db
+from app.api import pagination, projection
+from app.api.async_session import async_db
+from app.api.etag import check_etag, entity_etag, list_etag
+from app.api.request_metrics import TimedRoute
+from app.db.query_detector import query_budget
+from app.db.session import execute, get_db, get_read_db
 from app.schemas.crop import (
-    CropCreate, CropUpdate, CropResponse, CropListResponse,
-    CropHarvestUpdate, CropStatus
+    CropCreate, CropUpdate, CropResponse, CropWithYieldResponse, CropListResponse,
+    YieldRecordListResponse, CropHarvestUpdate, CropHarvestBatch, CropHarvestBatchResponse, CropStatus
+)
+from app.schemas.bulk import BulkRequest, BulkResponse
+from app.models import Crop, YieldRecord
+from app.services import (
+    bulk, data_versions, farm_events, farm_summary, harvests, row_counts, search, yield_rollups
+)
+from app.services.cache import stats_cache
+
+router = APIRouter(route_class=TimedRoute)
+
+# 允许排序的字段（每个字段都有对应的 (字段, id) 复合索引）
+CROP_SORT_COLUMNS = (
+    "plant_date", "expected_harvest_date", "actual_harvest_date",
+    "name", "variety", "area", "total_yield", "status",
+    "created_at", "updated_at",
 )
-from app.models import Crop
 
-router = APIRouter()
+# include= 可选的附加数据
+INCLUDE_PATTERN = "^yield_summary$"
 
 
-@router.get("/", response_model=CropListResponse)
-def get_crops(
+@router.get("/", response_model=CropListResponse, response_model_exclude_unset=True)
+@query_budget(3)
+@async_db
+async def get_crops(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0, description="跳过记录数"),
     limit: int = Query(20, ge=1, le=100, description="每页记录数"),
     status_filter: Optional[str] = Query(None, alias="status", description="状态筛选"),
     sort_by: Optional[str] = Query("plant_date", description="排序字段"),
     sort_order: Optional[str] = Query("desc", description="排序方向: asc, desc"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="分页游标（使用时忽略 skip）"),
+    total_mode: str = Query(
+        "exact", alias="total", pattern="^(exact|estimate|none)$", description="总数统计方式: exact, estimate, none"
+    ),
+    fields: Optional[str] = Query(None, description="只返回指定字段（逗号分隔，如 id,name,status）"),
+    q: Optional[str] = Query(None, min_length=1, max_length=100, description="按名称、品种、备注模糊搜索（结果按相关度排序）"),
+    include: Optional[str] = Query(None, pattern=INCLUDE_PATTERN, description="附加数据: yield_summary（产量摘要）"),
+    db: Session = Depends(get_read_db)
 ):
     """获取粮食列表"""
-    query = db.query(Crop)
+    field_names = projection.parse_fields(fields, CropResponse)
+    query = select(Crop)
 
     # 筛选
     if status_filter:
@@ -32,26 +66,62 @@ def get_crops(
         except ValueError:
             pass
 
-    # 排序
-    order_column = getattr(Crop, sort_by, Crop.plant_date)
-    if sort_order == "desc":
-        query = query.order_by(order_column.desc())
+    if q:
+        query = query.filter(search.matches(db, Crop, q))
+
+    total = await row_counts.count_rows(db, query, total_mode)
+
+    # 排序（仅允许白名单字段，以 id 作为次排序保证顺序稳定）
+    if sort_by not in CROP_SORT_COLUMNS:
+        sort_by = "plant_date"
+    sort_order = "desc" if sort_order == "desc" else "asc"
+    order_column = getattr(Crop, sort_by)
+
+    # 稀疏字段：只查询所需列（另取排序列与 updated_at 供游标和 ETag 使用）
+    if field_names:
+        query = projection.project(query, Crop, field_names, extra=(sort_by, "updated_at"))
+    if q:
+        # 搜索结果按相关度排序，只支持 skip/limit 分页
+        query = query.order_by(*search.order_by_rank(db, Crop, q))
     else:
-        query = query.order_by(order_column.asc())
+        query = pagination.order_by_keyset(query, order_column, Crop.id, sort_order)
 
-    # 分页
-    total = query.count()
-    items = query.offset(skip).limit(limit).all()
+    # 分页：有游标时按键集定位，否则兼容 skip/limit
+    if cursor and not q:
+        value, last_id = pagination.decode_cursor(cursor, sort_by, sort_order, order_column)
+        query = pagination.seek(query, order_column, Crop.id, sort_order, value, last_id)
+    else:
+        query = query.offset(skip)
+    result = await execute(db, query.limit(limit + 1))
+    rows = result.all() if field_names else result.scalars().all()
+    items = rows[:limit]
+    has_more = len(rows) > limit
+    next_cursor = None if q else pagination.next_cursor(rows, limit, sort_by, sort_order)
+    check_etag(request, response, list_etag(request, "crop", items, total, has_more, next_cursor))
 
-    return {
+    # 附加产量摘要：整页一次聚合查询，不逐条加载产量记录
+    summaries = await yield_rollups.crop_yield_summaries(db, [item.id for item in items]) if include else None
+    if summaries is not None and not field_names:
+        for item in items:
+            item.yield_summary = summaries[item.id]
+
+    payload = {
         "items": items,
         "total": total,
         "skip": skip,
-        "limit": limit
+        "limit": limit,
+        "total_mode": total_mode,
+        "has_more": has_more,
+        "next_cursor": next_cursor,
     }
+    if field_names:
+        extra = {"yield_summary": summaries} if summaries is not None else None
+        return projection.sparse_response(payload, field_names, response, extra)
+    return payload
 
 
 @router.post("/", response_model=CropResponse, status_code=status.HTTP_201_CREATED)
+@async_db
 def create_crop(
     crop_data: CropCreate,
     db: Session = Depends(get_db)
@@ -59,21 +129,94 @@ def create_crop(
     """创建新的粮食记录"""
     db_crop = Crop(**crop_data.model_dump())
     db.add(db_crop)
+    db.flush()
+    farm_summary.record_crop_change(db, None, farm_summary.snapshot(db_crop))
+    farm_events.sync_entity_events(db, db_crop)
+    data_versions.bump(db, "crop")
     db.commit()
+    stats_cache.invalidate("crop")
     db.refresh(db_crop)
     return db_crop
 
 
-@router.get("/{crop_id}", response_model=CropResponse)
-def get_crop(crop_id: int, db: Session = Depends(get_db)):
+@router.post("/bulk", response_model=BulkResponse)
+@async_db
+def bulk_crops(payload: BulkRequest, db: Session = Depends(get_db)):
+    """批量新增、更新、删除粮食记录（同一事务内执行，逐条返回结果）"""
+    results = bulk.apply_operations(db, "crop", payload.operations)
+    db.commit()
+    stats_cache.invalidate("crop")
+    return bulk.summarize(results)
+
+
+@router.get("/{crop_id}", response_model=CropWithYieldResponse, response_model_exclude_unset=True)
+@query_budget(2)
+@async_db
+async def get_crop(
+    crop_id: int,
+    request: Request,
+    response: Response,
+    include: Optional[str] = Query(None, pattern=INCLUDE_PATTERN, description="附加数据: yield_summary（产量摘要）"),
+    db: Session = Depends(get_read_db)
+):
     """获取单个粮食详情"""
-    crop = db.query(Crop).filter(Crop.id == crop_id).first()
+    crop = (await execute(db, select(Crop).where(Crop.id == crop_id).limit(1))).scalar()
     if not crop:
         raise HTTPException(status_code=404, detail="粮食记录不存在")
+    check_etag(request, response, entity_etag(f"crop+{include}" if include else "crop", crop.id, crop.updated_at))
+    if include:
+        crop.yield_summary = (await yield_rollups.crop_yield_summaries(db, [crop.id]))[crop.id]
     return crop
 
 
+@router.get("/{crop_id}/yield-records", response_model=YieldRecordListResponse)
+@query_budget(2)
+@async_db
+async def get_crop_yield_records(
+    crop_id: int,
+    skip: int = Query(0, ge=0, description="跳过记录数"),
+    limit: int = Query(20, ge=1, le=100, description="每页记录数"),
+    start: Optional[date] = Query(None, description="起始日期（含）"),
+    end: Optional[date] = Query(None, description="结束日期（含）"),
+    sort_order: Optional[str] = Query("desc", description="按记录日期排序方向: asc, desc"),
+    cursor: Optional[str] = Query(None, description="分页游标（使用时忽略 skip）"),
+    db: Session = Depends(get_read_db)
+):
+    """获取粮食的产量记录（走 (crop_id, record_date, id) 索引的键集分页）"""
+    if (await execute(db, select(Crop.id).where(Crop.id == crop_id).limit(1))).first() is None:
+        raise HTTPException(status_code=404, detail="粮食记录不存在")
+
+    query = select(YieldRecord).where(YieldRecord.crop_id == crop_id)
+    if start:
+        query = query.filter(YieldRecord.record_date >= start)
+    if end:
+        query = query.filter(YieldRecord.record_date <= end)
+
+    # record_date 非空，直接按 (record_date, id) 排序即可与索引顺序一致
+    sort_order = "desc" if sort_order == "desc" else "asc"
+    if sort_order == "desc":
+        query = query.order_by(YieldRecord.record_date.desc(), YieldRecord.id.desc())
+    else:
+        query = query.order_by(YieldRecord.record_date.asc(), YieldRecord.id.asc())
+
+    if cursor:
+        value, last_id = pagination.decode_cursor(cursor, "record_date", sort_order, YieldRecord.record_date)
+        query = pagination.seek(query, YieldRecord.record_date, YieldRecord.id, sort_order, value, last_id)
+    else:
+        query = query.offset(skip)
+    rows = (await execute(db, query.limit(limit + 1))).scalars().all()
+
+    return {
+        "items": rows[:limit],
+        "skip": skip,
+        "limit": limit,
+        "has_more": len(rows) > limit,
+        "next_cursor": pagination.next_cursor(rows, limit, "record_date", sort_order),
+    }
+
+
 @router.put("/{crop_id}", response_model=CropResponse)
+@async_db
 def update_crop(
     crop_id: int,
     crop_data: CropUpdate,
@@ -84,45 +227,68 @@ def update_crop(
     if not crop:
         raise HTTPException(status_code=404, detail="粮食记录不存在")
 
+    before = farm_summary.snapshot(crop)
     update_data = crop_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(crop, field, value)
 
+    db.flush()
+    farm_summary.record_crop_change(db, before, farm_summary.snapshot(crop))
+    farm_events.sync_entity_events(db, crop)
+    data_versions.bump(db, "crop")
     db.commit()
+    stats_cache.invalidate("crop")
     db.refresh(crop)
     return crop
 
 
 @router.delete("/{crop_id}", status_code=status.HTTP_204_NO_CONTENT)
+@async_db
 def delete_crop(crop_id: int, db: Session = Depends(get_db)):
     """删除粮食记录"""
     crop = db.query(Crop).filter(Crop.id == crop_id).first()
     if not crop:
         raise HTTPException(status_code=404, detail="粮食记录不存在")
 
+    before = farm_summary.snapshot(crop)
     db.delete(crop)
+    db.flush()
+    farm_summary.record_crop_change(db, before, None)
+    farm_events.delete_entity_events(db, "crop", crop_id)
+    yield_rollups.delete_crop_rollups(db, crop_id)
+    data_versions.bump(db, "crop")
     db.commit()
+    stats_cache.invalidate("crop")
     return None
 
 
 @router.patch("/{crop_id}/harvest", response_model=CropResponse)
+@async_db
 def mark_as_harvested(
     crop_id: int,
     harvest_data: CropHarvestUpdate,
     db: Session = Depends(get_db)
 ):
-    """标记粮食为已收获，并记录产量"""
-    crop = db.query(Crop).filter(Crop.id == crop_id).first()
-    if not crop:
+    """记录一次收获：追加产量记录并累加总产量，非部分收获时标记为已收获"""
+    try:
+        harvests.record_harvests(db, [(crop_id, harvest_data)])
+    except harvests.CropNotFoundError:
         raise HTTPException(status_code=404, detail="粮食记录不存在")
 
-    crop.actual_harvest_date = harvest_data.actual_harvest_date
-    crop.total_yield = harvest_data.yield_quantity
-    crop.status = CropStatus.HARVESTED
+    db.commit()
+    stats_cache.invalidate("crop")
+    return db.get(Crop, crop_id)
+
 
-    if harvest_data.yield_unit:
-        crop.unit = harvest_data.yield_unit
+@router.post("/harvests", response_model=CropHarvestBatchResponse, status_code=status.HTTP_201_CREATED)
+@async_db
+def record_harvest_batch(payload: CropHarvestBatch, db: Session = Depends(get_db)):
+    """批量记录收获（同一事务内写入，任一粮食不存在则整批不写入）"""
+    try:
+        records = harvests.record_harvests(db, [(item.crop_id, item) for item in payload.harvests])
+    except harvests.CropNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
 
     db.commit()
-    db.refresh(crop)
-    return crop
+    stats_cache.invalidate("crop")
+    return {"records": records, "crops_updated": len({item.crop_id for item in payload.harvests})}
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, HTTPException, Path, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from datetime import date
+
+from app.api.request_metrics import TimedRoute
+from app.db.session import read_session
+from app.services import export
+
+router = APIRouter(route_class=TimedRoute)
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+@router.get("/{entity}")
+def export_entity(
+    request: Request,
+    entity: str = Path(..., pattern="^(crops|animals|flowers|yield-records)$", description="导出实体"),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="导出格式: ndjson, csv"),
+    start: Optional[date] = Query(None, description="起始日期（含），按种植/购入/记录日期筛选"),
+    end: Optional[date] = Query(None, description="结束日期（含）"),
+):
+    """流式导出整表数据"""
+    if start and end and end < start:
+        raise HTTPException(status_code=422, detail="end 不能早于 start")
+
+    serialize = export.csv_chunks if format == "csv" else export.ndjson_chunks
+
+    def body():
+        # 依赖注入的会话在响应开始发送前就已关闭，流式响应自行管理会话（整表扫描走只读副本）
+        with read_session(request) as db:
+            yield from serialize(entity, export.iter_batches(db, entity, start, end))
+
+    filename = f"{entity}-{date.today():%Y%m%d}.{format}"
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
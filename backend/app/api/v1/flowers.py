@@ -1,35 +1,96 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-
-from app.db.session import get_db
+from typing import Optional
+
+from app.api import pagination, projection
+from app.api.async_session import async_db
+from app.api.etag import check_etag, entity_etag, list_etag
+from app.api.request_metrics import TimedRoute
+from app.db.query_detector import query_budget
+from app.db.session import execute, get_db, get_read_db
 from app.schemas.flower import (
     FlowerCreate, FlowerUpdate, FlowerResponse, FlowerListResponse
 )
+from app.schemas.bulk import BulkRequest, BulkResponse
 from app.models import Flower
+from app.services import bulk, data_versions, farm_events, farm_summary, flower_tags, row_counts, search
+from app.services.cache import stats_cache
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.get("/", response_model=FlowerListResponse)
-def get_flowers(
+@query_budget(2)
+@async_db
+async def get_flowers(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0, description="跳过记录数"),
     limit: int = Query(20, ge=1, le=100, description="每页记录数"),
-    db: Session = Depends(get_db)
+    color: Optional[str] = Query(None, max_length=50, description="颜色筛选"),
+    season: Optional[str] = Query(None, pattern="^(spring|summer|autumn|winter)$", description="开花季节筛选"),
+    cursor: Optional[str] = Query(None, description="分页游标（使用时忽略 skip）"),
+    total_mode: str = Query(
+        "exact", alias="total", pattern="^(exact|estimate|none)$", description="总数统计方式: exact, estimate, none"
+    ),
+    fields: Optional[str] = Query(None, description="只返回指定字段（逗号分隔，如 id,name,status）"),
+    q: Optional[str] = Query(None, min_length=1, max_length=100, description="按名称、品种、备注模糊搜索（结果按相关度排序）"),
+    db: Session = Depends(get_read_db)
 ):
     """获取花卉列表"""
-    query = db.query(Flower).order_by(Flower.plant_date.desc())
-    total = query.count()
-    items = query.offset(skip).limit(limit).all()
-
-    return {
+    field_names = projection.parse_fields(fields, FlowerResponse)
+    query = select(Flower)
+
+    # 筛选（走关联表索引）
+    if color:
+        query = query.filter(flower_tags.color_filter(color))
+    if season:
+        query = query.filter(flower_tags.season_filter(season))
+
+    if q:
+        query = query.filter(search.matches(db, Flower, q))
+
+    total = await row_counts.count_rows(db, query, total_mode)
+
+    # 稀疏字段：只查询所需列（另取排序列与 updated_at 供游标和 ETag 使用）
+    if field_names:
+        query = projection.project(query, Flower, field_names, extra=("plant_date", "updated_at"))
+    if q:
+        # 搜索结果按相关度排序，只支持 skip/limit 分页
+        query = query.order_by(*search.order_by_rank(db, Flower, q))
+    else:
+        query = pagination.order_by_keyset(query, Flower.plant_date, Flower.id, "desc")
+
+    # 分页：有游标时按键集定位，否则兼容 skip/limit
+    if cursor and not q:
+        value, last_id = pagination.decode_cursor(cursor, "plant_date", "desc", Flower.plant_date)
+        query = pagination.seek(query, Flower.plant_date, Flower.id, "desc", value, last_id)
+    else:
+        query = query.offset(skip)
+    result = await execute(db, query.limit(limit + 1))
+    rows = result.all() if field_names else result.scalars().all()
+    items = rows[:limit]
+    has_more = len(rows) > limit
+    next_cursor = None if q else pagination.next_cursor(rows, limit, "plant_date", "desc")
+    check_etag(request, response, list_etag(request, "flower", items, total, has_more, next_cursor))
+
+    payload = {
         "items": items,
         "total": total,
         "skip": skip,
-        "limit": limit
+        "limit": limit,
+        "total_mode": total_mode,
+        "has_more": has_more,
+        "next_cursor": next_cursor,
     }
+    if field_names:
+        return projection.sparse_response(payload, field_names, response)
+    return payload
 
 
 @router.post("/", response_model=FlowerResponse, status_code=status.HTTP_201_CREATED)
+@async_db
 def create_flower(
     flower_data: FlowerCreate,
     db: Session = Depends(get_db)
@@ -37,21 +98,41 @@ def create_flower(
     """创建新的花卉记录"""
     db_flower = Flower(**flower_data.model_dump())
     db.add(db_flower)
+    db.flush()
+    farm_summary.record_flower_change(db, None, farm_summary.snapshot(db_flower))
+    farm_events.sync_entity_events(db, db_flower)
+    flower_tags.sync_flower_tags(db, db_flower)
+    data_versions.bump(db, "flower")
     db.commit()
+    stats_cache.invalidate("flower")
     db.refresh(db_flower)
     return db_flower
 
 
+@router.post("/bulk", response_model=BulkResponse)
+@async_db
+def bulk_flowers(payload: BulkRequest, db: Session = Depends(get_db)):
+    """批量新增、更新、删除花卉记录（同一事务内执行，逐条返回结果）"""
+    results = bulk.apply_operations(db, "flower", payload.operations)
+    db.commit()
+    stats_cache.invalidate("flower")
+    return bulk.summarize(results)
+
+
 @router.get("/{flower_id}", response_model=FlowerResponse)
-def get_flower(flower_id: int, db: Session = Depends(get_db)):
+@query_budget(1)
+@async_db
+async def get_flower(flower_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
     """获取单个花卉详情"""
-    flower = db.query(Flower).filter(Flower.id == flower_id).first()
+    flower = (await execute(db, select(Flower).where(Flower.id == flower_id).limit(1))).scalar()
     if not flower:
         raise HTTPException(status_code=404, detail="花卉记录不存在")
+    check_etag(request, response, entity_etag("flower", flower.id, flower.updated_at))
     return flower
 
 
 @router.put("/{flower_id}", response_model=FlowerResponse)
+@async_db
 def update_flower(
     flower_id: int,
     flower_data: FlowerUpdate,
@@ -62,22 +143,37 @@ def update_flower(
     if not flower:
         raise HTTPException(status_code=404, detail="花卉记录不存在")
 
+    before = farm_summary.snapshot(flower)
     update_data = flower_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(flower, field, value)
 
+    db.flush()
+    farm_summary.record_flower_change(db, before, farm_summary.snapshot(flower))
+    farm_events.sync_entity_events(db, flower)
+    flower_tags.sync_flower_tags(db, flower)
+    data_versions.bump(db, "flower")
     db.commit()
+    stats_cache.invalidate("flower")
     db.refresh(flower)
     return flower
 
 
 @router.delete("/{flower_id}", status_code=status.HTTP_204_NO_CONTENT)
+@async_db
 def delete_flower(flower_id: int, db: Session = Depends(get_db)):
     """删除花卉记录"""
     flower = db.query(Flower).filter(Flower.id == flower_id).first()
     if not flower:
         raise HTTPException(status_code=404, detail="花卉记录不存在")
 
+    before = farm_summary.snapshot(flower)
     db.delete(flower)
+    db.flush()
+    farm_summary.record_flower_change(db, before, None)
+    farm_events.delete_entity_events(db, "flower", flower_id)
+    flower_tags.delete_flower_tags(db, flower_id)
+    data_versions.bump(db, "flower")
     db.commit()
+    stats_cache.invalidate("flower")
     return None
@@ -0,0 +1,46 @@
+import secrets
+from typing import Optional
+
+from anyio import to_thread
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from app.api import request_metrics
+from app.api.request_metrics import TimedRoute
+from app.core.config import settings
+from app.db import pool_metrics, session
+from app.schemas.metrics import DbPoolMetrics
+
+
+async def require_metrics_token(authorization: Optional[str] = Header(None)) -> None:
+    """配置了 METRICS_TOKEN 时校验 Authorization: Bearer <令牌>"""
+    if not settings.METRICS_TOKEN:
+        return
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="需要监控令牌",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+router = APIRouter(route_class=TimedRoute, dependencies=[Depends(require_metrics_token)])
+
+
+@router.get("", response_class=PlainTextResponse)
+async def get_prometheus_metrics():
+    """Prometheus 抓取接口：按路由的请求耗时、响应大小、进行中请求数、每请求数据库查询次数/耗时与连接池状态"""
+    return PlainTextResponse(request_metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/db-pool", response_model=DbPoolMetrics)
+async def get_db_pool_metrics():
+    """连接池状态：借出/空闲/溢出连接数、取连接等待耗时分布与超时次数、同步路由线程池占用，以及只读副本健康状态"""
+    limiter = to_thread.current_default_thread_limiter()
+    replicas = session.async_replicas if settings.ASYNC_DB_ENABLED else session.replicas
+    return {
+        "pools": pool_metrics.snapshot(),
+        "threadpool": {"total": int(limiter.total_tokens), "busy": limiter.borrowed_tokens},
+        "replicas": replicas.status(),
+    }
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from app.api.async_session import async_db
+from app.api.etag import stats_etag
+from app.api.request_metrics import TimedRoute
+from app.db.query_detector import query_budget
+from app.db.session import get_read_db
+from app.schemas.search import SearchResponse
+from app.services import search
+
+router = APIRouter(route_class=TimedRoute)
+
+
+@router.get("/", response_model=SearchResponse, dependencies=[Depends(stats_etag("crop", "animal", "flower"))])
+@query_budget(2)
+@async_db
+async def search_entities(
+    q: str = Query(..., min_length=1, max_length=100, description="搜索关键词（匹配名称、品种、备注）"),
+    category: Optional[str] = Query(None, pattern="^(crop|animal|flower)$", description="分类筛选: crop, animal, flower"),
+    skip: int = Query(0, ge=0, description="跳过记录数"),
+    limit: int = Query(20, ge=1, le=100, description="每页记录数"),
+    db: Session = Depends(get_read_db)
+):
+    """跨粮食、动物、花卉的统一搜索，结果按相关度排序"""
+    categories = [category] if category else list(search.SEARCH_MODELS)
+    rows = await search.search_all(db, q, categories, skip, limit)
+
+    return {
+        "items": rows[:limit],
+        "skip": skip,
+        "limit": limit,
+        "has_more": len(rows) > limit,
+    }
@@ -1,213 +1,206 @@
-from fastapi import APIRouter, Depends
+from calendar import monthrange
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 
-from app.db.session import get_db
+from app.api.async_session import async_db
+from app.api.etag import stats_etag
+from app.api.request_metrics import TimedRoute
+from app.db.query_detector import query_budget
+from app.db.session import execute, get_read_db
 from app.schemas.statistics import (
     OverviewStats, CropStats, AnimalStats, FlowerStats,
-    ChartDataResponse, CalendarData
+    ChartDataResponse, CalendarData, YieldTimeseries, CacheStats
 )
-from app.models import Crop, Animal, Flower, CropStatus
-
-router = APIRouter()
-
+from app.models import FarmEvent
+from app.services import aggregates, farm_events, farm_summary, yield_rollups
+from app.services.cache import cached, stats_cache
 
-@router.get("/overview", response_model=OverviewStats)
-def get_overview_stats(db: Session = Depends(get_db)):
-    """获取总览统计数据"""
-    # 粮食统计
-    total_crops = db.query(func.count(Crop.id)).scalar()
-    growing_crops = db.query(func.count(Crop.id)).filter(Crop.status == CropStatus.GROWING).scalar()
-    harvested_crops = db.query(func.count(Crop.id)).filter(Crop.status == CropStatus.HARVESTED).scalar()
-    total_crop_yield = db.query(func.sum(Crop.total_yield)).scalar() or 0
+router = APIRouter(route_class=TimedRoute)
 
-    # 动物统计
-    total_animal_varieties = db.query(func.count(func.distinct(Animal.variety))).scalar()
-    total_animals = db.query(func.sum(Animal.quantity)).scalar() or 0
-    estimated_daily_yield = db.query(func.sum(Animal.estimated_daily_yield)).scalar() or 0
 
-    # 花卉统计
-    total_flower_varieties = db.query(func.count(func.distinct(Flower.variety))).scalar()
-    total_flowers = db.query(func.sum(Flower.quantity)).scalar() or 0
+@router.get("/overview", response_model=OverviewStats, dependencies=[Depends(stats_etag("crop", "animal", "flower"))])
+@query_budget(3)
+@async_db
+@cached("crop", "animal", "flower")
+async def get_overview_stats(db: Session = Depends(get_read_db)):
+    """
+    获取总览统计数据（读取增量维护的汇总行）
 
-    return {
-        "total_crops": total_crops or 0,
-        "growing_crops": growing_crops or 0,
-        "harvested_crops": harvested_crops or 0,
-        "total_crop_yield": float(total_crop_yield),
-        "total_animal_varieties": total_animal_varieties or 0,
-        "total_animals": int(total_animals),
-        "estimated_daily_yield": float(estimated_daily_yield),
-        "total_flower_varieties": total_flower_varieties or 0,
-        "total_flowers": int(total_flowers),
-    }
+    查询：数据版本、汇总行；汇总行尚未建立时再加一条现算汇总的语句，共 3 条
+    """
+    return OverviewStats.model_validate(await farm_summary.get_farm_summary(db))
 
 
-@router.get("/crops", response_model=CropStats)
-def get_crop_statistics(db: Session = Depends(get_db)):
+@router.get("/crops", response_model=CropStats, dependencies=[Depends(stats_etag("crop"))])
+@query_budget(2)
+@async_db
+@cached("crop")
+async def get_crop_statistics(db: Session = Depends(get_read_db)):
     """获取粮食统计数据"""
-    # 按品种分组产量
-    by_variety = dict(
-        db.query(Crop.variety, func.sum(Crop.total_yield))
-        .group_by(Crop.variety)
-        .all()
-    )
-
-    # 按状态分组数量
-    by_status = dict(
-        db.query(Crop.status, func.count(Crop.id))
-        .group_by(Crop.status)
-        .all()
-    )
-    # 转换枚举为字符串
-    by_status = {s.value if hasattr(s, 'value') else str(s): c for s, c in by_status.items()}
-
+    data = await aggregates.compute_datasets(db, ["crop_yield_by_variety", "crop_count_by_status"])
     return {
-        "by_variety": {k: float(v) for k, v in by_variety.items()},
-        "by_status": by_status,
+        "by_variety": data["crop_yield_by_variety"],
+        "by_status": data["crop_count_by_status"],
     }
 
 
-@router.get("/animals", response_model=AnimalStats)
-def get_animal_statistics(db: Session = Depends(get_db)):
+@router.get("/animals", response_model=AnimalStats, dependencies=[Depends(stats_etag("animal"))])
+@query_budget(2)
+@async_db
+@cached("animal")
+async def get_animal_statistics(db: Session = Depends(get_read_db)):
     """获取动物统计数据"""
-    # 按产品类型分组数量
-    by_product_type = dict(
-        db.query(Animal.product_type, func.sum(Animal.quantity))
-        .group_by(Animal.product_type)
-        .all()
-    )
-    by_product_type = {str(k): int(v) for k, v in by_product_type.items() if k is not None}
-
-    # 按品种分组数量
-    by_variety = dict(
-        db.query(Animal.variety, func.sum(Animal.quantity))
-        .group_by(Animal.variety)
-        .all()
-    )
-
+    data = await aggregates.compute_datasets(db, ["animal_quantity_by_product_type", "animal_quantity_by_variety"])
     return {
-        "by_product_type": by_product_type,
-        "by_variety": {k: int(v) for k, v in by_variety.items()},
+        "by_product_type": data["animal_quantity_by_product_type"],
+        "by_variety": data["animal_quantity_by_variety"],
     }
 
 
-@router.get("/flowers", response_model=FlowerStats)
-def get_flower_statistics(db: Session = Depends(get_db)):
+@router.get("/flowers", response_model=FlowerStats, dependencies=[Depends(stats_etag("flower"))])
+@query_budget(2)
+@async_db
+@cached("flower")
+async def get_flower_statistics(db: Session = Depends(get_read_db)):
     """获取花卉统计数据"""
-    # 按季节分组数量
-    by_season = dict(
-        db.query(Flower.bloom_season, func.sum(Flower.quantity))
-        .group_by(Flower.bloom_season)
-        .all()
-    )
-    by_season = {str(k): int(v) for k, v in by_season.items() if k is not None}
-
-    # 按用途分组数量
-    by_purpose = dict(
-        db.query(Flower.purpose, func.sum(Flower.quantity))
-        .group_by(Flower.purpose)
-        .all()
-    )
-    by_purpose = {str(k): int(v) for k, v in by_purpose.items() if k is not None}
-
+    data = await aggregates.compute_datasets(db, ["flower_quantity_by_season", "flower_quantity_by_purpose"])
     return {
-        "by_season": by_season,
-        "by_purpose": by_purpose,
+        "by_season": data["flower_quantity_by_season"],
+        "by_purpose": data["flower_quantity_by_purpose"],
     }
 
 
-@router.get("/charts", response_model=ChartDataResponse)
-def get_chart_data(db: Session = Depends(get_db)):
-    """获取图表数据汇总"""
-    # 粮食按品种产量
-    crop_variety_data = db.query(Crop.variety, func.sum(Crop.total_yield)).group_by(Crop.variety).all()
-    crop_yield_by_variety = {
-        "title": "各品种粮食产量",
-        "type": "bar",
-        "labels": [v for v, _ in crop_variety_data],
-        "datasets": [{"data": [float(y) for _, y in crop_variety_data]}]
+def _chart(title: str, chart_type: str, values: dict) -> dict:
+    """把 {标签: 数值} 转换为图表数据格式"""
+    return {
+        "title": title,
+        "type": chart_type,
+        "labels": list(values.keys()),
+        "datasets": [{"data": list(values.values())}]
     }
 
-    # 粮食状态饼图
-    crop_status_data = db.query(Crop.status, func.count(Crop.id)).group_by(Crop.status).all()
-    crop_status_pie = {
-        "title": "粮食状态分布",
-        "type": "pie",
-        "labels": [str(s) for s, _ in crop_status_data],
-        "datasets": [{"data": [c for _, c in crop_status_data]}]
-    }
 
-    # 动物按产品类型
-    animal_type_data = db.query(Animal.product_type, func.sum(Animal.quantity)).group_by(Animal.product_type).all()
-    animal_by_product = {
-        "title": "动物按产品类型分布",
-        "type": "pie",
-        "labels": [str(t) for t, _ in animal_type_data if t is not None],
-        "datasets": [{"data": [int(q) for _, q in animal_type_data if _ is not None]}]
-    }
-
-    # 花卉按季节
-    flower_season_data = db.query(Flower.bloom_season, func.sum(Flower.quantity)).group_by(Flower.bloom_season).all()
-    flower_by_season = {
-        "title": "花卉按开花季节分布",
-        "type": "bar",
-        "labels": [str(s) for s, _ in flower_season_data if s is not None],
-        "datasets": [{"data": [int(q) for _, q in flower_season_data if _ is not None]}]
-    }
+@router.get("/charts", response_model=ChartDataResponse, dependencies=[Depends(stats_etag("crop", "animal", "flower"))])
+@query_budget(2)
+@async_db
+@cached("crop", "animal", "flower")
+async def get_chart_data(db: Session = Depends(get_read_db)):
+    """获取图表数据汇总（一次查询取回全部数据集）"""
+    data = await aggregates.compute_datasets(db, [
+        "crop_yield_by_variety",
+        "crop_count_by_status",
+        "animal_quantity_by_product_type",
+        "flower_quantity_by_season",
+    ])
 
     return {
-        "crop_yield_by_variety": crop_yield_by_variety,
-        "crop_status_pie": crop_status_pie,
-        "animal_by_product": animal_by_product,
-        "flower_by_season": flower_by_season,
+        "crop_yield_by_variety": _chart("各品种粮食产量", "bar", data["crop_yield_by_variety"]),
+        "crop_status_pie": _chart("粮食状态分布", "pie", data["crop_count_by_status"]),
+        "animal_by_product": _chart("动物按产品类型分布", "pie", data["animal_quantity_by_product_type"]),
+        "flower_by_season": _chart("花卉按开花季节分布", "bar", data["flower_quantity_by_season"]),
     }
 
 
-@router.get("/calendar", response_model=CalendarData)
-def get_calendar_data(
-    year: int = 2024,
-    db: Session = Depends(get_db)
+def _calendar_window(
+    year: Optional[int], month: Optional[int], start: Optional[date], end: Optional[date]
+) -> tuple[date, date]:
+    """解析日历查询的日期窗口：优先使用 start/end，否则按 year(+month) 计算"""
+    if start or end:
+        if not (start and end):
+            raise HTTPException(status_code=422, detail="start 和 end 需同时提供")
+        if end < start:
+            raise HTTPException(status_code=422, detail="end 不能早于 start")
+        return start, end
+
+    year = year or date.today().year
+    if month:
+        return date(year, month, 1), date(year, month, monthrange(year, month)[1])
+    return date(year, 1, 1), date(year, 12, 31)
+
+
+@router.get("/calendar", response_model=CalendarData, dependencies=[Depends(stats_etag("crop", "flower"))])
+@query_budget(2)
+@async_db
+@cached("crop", "flower")
+async def get_calendar_data(
+    year: Optional[int] = Query(None, ge=1900, le=9999, description="年份，默认当前年"),
+    month: Optional[int] = Query(None, ge=1, le=12, description="月份，与 year 组合使用"),
+    start: Optional[date] = Query(None, description="起始日期（含），与 end 同时使用"),
+    end: Optional[date] = Query(None, description="结束日期（含），与 start 同时使用"),
+    category: Optional[str] = Query(None, pattern="^(crop|flower)$", description="分类筛选: crop, flower"),
+    rollup: bool = Query(False, description="按天汇总为计数事件（月视图使用）"),
+    skip: int = Query(0, ge=0, description="跳过事件数"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="最多返回事件数"),
+    db: Session = Depends(get_read_db)
 ):
-    """获取日历数据"""
-    events = []
+    """获取日历数据（在 farm_events 的 (date, category) 索引上做范围扫描）"""
+    window_start, window_end = _calendar_window(year, month, start, end)
+
+    filters = [FarmEvent.date >= window_start, FarmEvent.date <= window_end]
+    if category:
+        filters.append(FarmEvent.category == category)
+
+    if rollup:
+        stmt = (
+            select(FarmEvent.date, FarmEvent.type, FarmEvent.kind, FarmEvent.category, func.count(FarmEvent.id))
+            .where(*filters)
+            .group_by(FarmEvent.date, FarmEvent.type, FarmEvent.kind, FarmEvent.category)
+            .order_by(FarmEvent.date, FarmEvent.kind, FarmEvent.category)
+        )
+    else:
+        stmt = (
+            select(FarmEvent.date, FarmEvent.type, FarmEvent.category, FarmEvent.title)
+            .where(*filters)
+            .order_by(FarmEvent.date, FarmEvent.id)
+        )
+    stmt = stmt.offset(skip)
+    if limit:
+        stmt = stmt.limit(limit)
 
-    # 粮食种植和收获事件
-    crops = db.query(Crop).all()
-    for crop in crops:
-        events.append({
-            "date": crop.plant_date.isoformat(),
-            "title": f"种植 {crop.name}",
-            "type": "plant",
-            "category": "crop",
-            "count": 1
-        })
-        if crop.expected_harvest_date:
-            events.append({
-                "date": crop.expected_harvest_date.isoformat(),
-                "title": f"预计收获 {crop.name}",
-                "type": "harvest",
-                "category": "crop",
-                "count": 1
-            })
-        if crop.actual_harvest_date:
-            events.append({
-                "date": crop.actual_harvest_date.isoformat(),
-                "title": f"收获 {crop.name}",
-                "type": "harvest",
-                "category": "crop",
-                "count": 1
-            })
-
-    # 花卉种植事件
-    flowers_data = db.query(Flower).all()
-    for flower in flowers_data:
+    events = []
+    for row in await execute(db, stmt):
+        if rollup:
+            event_date, event_type, kind, event_category, count = row
+            title = f"{farm_events.EVENT_KINDS[kind][1]} {count} 项"
+        else:
+            event_date, event_type, event_category, title = row
+            count = 1
         events.append({
-            "date": flower.plant_date.isoformat(),
-            "title": f"种植 {flower.name}",
-            "type": "plant",
-            "category": "flower",
-            "count": 1
+            "date": event_date.isoformat(),
+            "title": title,
+            "type": event_type,
+            "category": event_category,
+            "count": count
         })
 
     return {"events": events}
+
+
+@router.get("/yield-timeseries", response_model=YieldTimeseries, dependencies=[Depends(stats_etag("crop"))])
+@query_budget(2)
+@async_db
+@cached("crop")
+async def get_yield_timeseries(
+    bucket: str = Query("month", pattern="^(day|week|month|year)$", description="时间粒度: day, week, month, year"),
+    start: Optional[date] = Query(None, description="起始日期（含）"),
+    end: Optional[date] = Query(None, description="结束日期（含）"),
+    crop_id: Optional[int] = Query(None, description="粮食ID筛选"),
+    variety: Optional[str] = Query(None, description="品种筛选"),
+    db: Session = Depends(get_read_db)
+):
+    """获取产量时间序列（读取预聚合的日/月汇总表）"""
+    if start and end and end < start:
+        raise HTTPException(status_code=422, detail="end 不能早于 start")
+
+    points = await yield_rollups.query_timeseries(db, bucket, start, end, crop_id, variety)
+    return {"bucket": bucket, "points": points}
+
+
+@router.get("/cache", response_model=CacheStats)
+async def get_cache_stats():
+    """获取统计缓存命中情况"""
+    return stats_cache.stats()
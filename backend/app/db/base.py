@@ -1,9 +1,62 @@
 from datetime import datetime
-from sqlalchemy import Column, DateTime
+from sqlalchemy import DDL, Column, DateTime, Index, Text, event, func, literal_column
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
 
+# 文本小写后的全部单字与相邻两字（去重），供短关键词与中日韩关键词的 bigram 搜索使用；
+# pg_trgm 无法为不足 3 个字符的关键词提取 trigram，也不能按中文词语评估相似度
+SEARCH_GRAMS_FUNCTION = """
+CREATE OR REPLACE FUNCTION search_grams(value text) RETURNS text[]
+LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS $$
+    SELECT coalesce(array_agg(DISTINCT gram), '{}')
+    FROM generate_series(1, char_length(value)) AS i,
+         LATERAL (VALUES (substr(lower(value), i, 1)), (substr(lower(value), i, 2))) AS grams(gram)
+$$
+"""
+
+# 模糊搜索使用的 trigram 索引依赖 pg_trgm 扩展，bigram 索引依赖 search_grams 函数，建表前自动创建
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+event.listen(Base.metadata, "before_create", DDL(SEARCH_GRAMS_FUNCTION).execute_if(dialect="postgresql"))
+
+
+def trigram_indexes(table: str, *columns: str) -> tuple[Index, ...]:
+    """为文本列生成 pg_trgm GIN 索引（仅在 PostgreSQL 上创建），支撑 ILIKE '%关键词%' 子串搜索"""
+    return tuple(
+        Index(
+            f"ix_{table}_{column}_trgm",
+            column,
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql")
+        for column in columns
+    )
+
+
+def search_grams(name, variety, notes):
+    """
+    名称、品种、备注拼接后的 search_grams 表达式
+
+    表达式索引与查询条件须完全一致才能用上索引，分隔符以 SQL 字面量写出（不作为绑定参数）
+    """
+    space, empty = literal_column("' '"), literal_column("''")
+    document = name.concat(space).concat(variety).concat(space).concat(func.coalesce(notes, empty))
+    return func.search_grams(document, type_=ARRAY(Text))
+
+
+def bigram_index(table: str, name, variety, notes) -> Index:
+    """search_grams 表达式上的 GIN 索引（仅在 PostgreSQL 上创建），支撑短关键词与中日韩关键词的子串搜索"""
+    return Index(
+        f"ix_{table}_search_grams",
+        search_grams(name, variety, notes),
+        postgresql_using="gin",
+    ).ddl_if(dialect="postgresql")
+
 
 class TimestampMixin:
     """时间戳混入类"""
@@ -8,7 +8,14 @@
     python -m app.db.cli seed           # 插入种子数据
     python -m app.db.cli reseed         # 清除并重新插入种子数据
     python -m app.db.cli init-all       # 初始化全部（表+种子数据）
+    python -m app.db.cli rebuild-summary  # 从业务表重建农场汇总表
+    python -m app.db.cli rebuild-events   # 从业务表重建日历事件表
+    python -m app.db.cli rebuild-yield-rollups  # 从产量记录重建日/月汇总表
+    python -m app.db.cli rebuild-flower-tags    # 从花卉表重建颜色/季节关联表
+    python -m app.db.cli import <文件> [--entity crops|animals|flowers] [--workers N]
+                                        # 批量导入 CSV / NDJSON
 """
+import argparse
 import sys
 from pathlib import Path
 
@@ -20,6 +27,11 @@ from sqlalchemy.orm import Session
 from app.db.session import SessionLocal
 from app.db.init_db import init_db, drop_all_tables, recreate_all_tables
 from app.db.seed import seed_all, clear_seed_data
+from app.services.farm_summary import rebuild_farm_summary
+from app.services.farm_events import rebuild_farm_events
+from app.services.yield_rollups import rebuild_yield_rollups
+from app.services.flower_tags import rebuild_flower_tags
+from app.services import importer
 
 
 def init_tables() -> None:
@@ -84,6 +96,81 @@ def init_all() -> None:
         db.close()
 
 
+def rebuild_summary() -> None:
+    """从业务表重建农场汇总表"""
+    print("[CLI] 正在重建农场汇总表...")
+    db: Session = SessionLocal()
+    try:
+        summary = rebuild_farm_summary(db)
+        db.commit()
+        print(f"[CLI] 汇总表已重建: {summary}")
+    finally:
+        db.close()
+
+
+def rebuild_events() -> None:
+    """从业务表重建日历事件表"""
+    print("[CLI] 正在重建日历事件表...")
+    db: Session = SessionLocal()
+    try:
+        count = rebuild_farm_events(db)
+        db.commit()
+        print(f"[CLI] 事件表已重建，共 {count} 条事件")
+    finally:
+        db.close()
+
+
+def rebuild_rollups() -> None:
+    """从产量记录重建日/月汇总表"""
+    print("[CLI] 正在重建产量汇总表...")
+    db: Session = SessionLocal()
+    try:
+        count = rebuild_yield_rollups(db)
+        db.commit()
+        print(f"[CLI] 产量汇总表已重建，共 {count} 条日汇总")
+    finally:
+        db.close()
+
+
+def rebuild_tags() -> None:
+    """从花卉表重建颜色/季节关联表"""
+    print("[CLI] 正在重建花卉关联表...")
+    db: Session = SessionLocal()
+    try:
+        count = rebuild_flower_tags(db)
+        db.commit()
+        print(f"[CLI] 花卉关联表已重建，共处理 {count} 条花卉")
+    finally:
+        db.close()
+
+
+def import_data() -> None:
+    """批量导入 CSV / NDJSON 文件"""
+    parser = argparse.ArgumentParser(prog="python -m app.db.cli import")
+    parser.add_argument("file", type=Path, help="CSV 或 NDJSON 文件")
+    parser.add_argument("--entity", choices=list(importer.IMPORT_TARGETS), help="导入实体，默认按文件名前缀推断")
+    parser.add_argument("--workers", type=int, default=None, help="校验进程数，默认为 CPU 核数")
+    parser.add_argument("--chunk-size", type=int, default=importer.CHUNK_SIZE, help="每块行数")
+    args = parser.parse_args(sys.argv[2:])
+
+    entity = args.entity or importer.detect_entity(args.file)
+    if entity is None:
+        parser.error("无法从文件名推断实体，请使用 --entity 指定")
+
+    print(f"[CLI] 正在导入 {args.file}（{entity}）...")
+    db: Session = SessionLocal()
+    try:
+        report = importer.import_file(db, args.file, entity, args.workers, args.chunk_size)
+        db.commit()
+    finally:
+        db.close()
+
+    print(f"[CLI] 导入完成: 读取 {report.read} 行，写入 {report.loaded} 行，拒绝 {report.rejected} 行，"
+          f"耗时 {report.elapsed:.2f}s（{report.rows_per_second:,.0f} 行/秒）")
+    if report.reject_path:
+        print(f"[CLI] 被拒绝的行已写入 {report.reject_path}")
+
+
 if __name__ == "__main__":
     commands = {
         "init-tables": init_tables,
@@ -92,6 +179,11 @@ if __name__ == "__main__":
         "seed": seed,
         "reseed": reseed,
         "init-all": init_all,
+        "rebuild-summary": rebuild_summary,
+        "rebuild-events": rebuild_events,
+        "rebuild-yield-rollups": rebuild_rollups,
+        "rebuild-flower-tags": rebuild_tags,
+        "import": import_data,
     }
 
     if len(sys.argv) < 2:
@@ -0,0 +1,34 @@
+"""
+EXPLAIN 语句构造
+以 SQLAlchemy 语句对象为输入生成 EXPLAIN，绑定参数按正常流程处理
+"""
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN <statement>，options 如 ("ANALYZE", "BUFFERS")，输出固定为 JSON 格式"""
+
+    inherit_cache = False
+
+    def __init__(self, statement, options: tuple[str, ...] = ()):
+        self.statement = statement
+        self.options = options
+
+
+def _process_statement(element: Explain, compiler, **kw) -> str:
+    sql = compiler.process(element.statement, **kw)
+    # 结果是计划而不是语句本身的列，不能沿用内层语句的结果列类型处理
+    compiler._result_columns = []
+    return sql
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain_postgresql(element: Explain, compiler, **kw) -> str:
+    options = ", ".join((*element.options, "FORMAT JSON"))
+    return f"EXPLAIN ({options}) " + _process_statement(element, compiler, **kw)
+
+
+@compiles(Explain)
+def _compile_explain_default(element: Explain, compiler, **kw) -> str:
+    return "EXPLAIN QUERY PLAN " + _process_statement(element, compiler, **kw)
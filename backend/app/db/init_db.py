@@ -2,18 +2,30 @@
 数据库初始化模块
 用于开发环境自动创建表结构
 """
-from sqlalchemy import inspect
-from app.db.base import Base
+from sqlalchemy import Index, inspect, text
+from app.db.base import SEARCH_GRAMS_FUNCTION, Base
 from app.db.session import engine
 
 
+def _applies_to_dialect(index: Index) -> bool:
+    """仅限特定数据库的索引（如 pg_trgm GIN 索引）在其他数据库上跳过"""
+    ddl_if = index._ddl_if
+    return ddl_if is None or ddl_if.dialect in (None, engine.dialect.name)
+
+
 def init_db() -> None:
     """
     创建所有数据库表
 
-    开发环境使用：只创建不存在的表，不修改已有表结构
+    开发环境使用：只创建不存在的表和索引，不修改已有表结构
     生产环境请使用 Alembic 迁移
     """
+    if engine.dialect.name == "postgresql":
+        # 搜索索引依赖的扩展与函数（补建索引时也需要）
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            conn.execute(text(SEARCH_GRAMS_FUNCTION))
+
     inspector = inspect(engine)
     existing_tables = inspector.get_table_names()
 
@@ -29,6 +41,20 @@ def init_db() -> None:
     else:
         print("[DB] 所有表已存在，跳过创建")
 
+    # 为已存在的表补建新增的索引
+    indexes_to_create = []
+    for table_name in model_tables:
+        if table_name not in existing_tables:
+            continue
+        existing_indexes = {ix["name"] for ix in inspector.get_indexes(table_name)}
+        for index in Base.metadata.tables[table_name].indexes:
+            if index.name not in existing_indexes and _applies_to_dialect(index):
+                index.create(bind=engine)
+                indexes_to_create.append(index.name)
+
+    if indexes_to_create:
+        print(f"[DB] 已创建索引: {', '.join(indexes_to_create)}")
+
 
 def drop_all_tables() -> None:
     """
@@ -0,0 +1,116 @@
+"""
+连接池监控
+在 QueuePool 的取连接路径上计时：记录等待连接的耗时分布与超时次数，
+并汇总当前借出、空闲、溢出连接数，供 /metrics/db-pool 查看请求是否在连接池上排队
+"""
+import threading
+import time
+from bisect import bisect_left
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# 等待耗时直方图的桶上界（毫秒），最后一个桶为 +Inf
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class PoolStats:
+    """单个连接池的取连接统计（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_sum_ms = 0.0
+        self.wait_max_ms = 0.0
+
+    def record_wait(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self._buckets[bisect_left(WAIT_BUCKETS_MS, elapsed_ms)] += 1
+            self.checkouts += 1
+            self.wait_sum_ms += elapsed_ms
+            self.wait_max_ms = max(self.wait_max_ms, elapsed_ms)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def histogram(self) -> list[dict]:
+        """累计直方图：每个桶为耗时不超过上界的次数"""
+        with self._lock:
+            counts = list(self._buckets)
+        result, total = [], 0
+        for bound, count in zip([*WAIT_BUCKETS_MS, None], counts):
+            total += count
+            result.append({"le": "+Inf" if bound is None else str(bound), "count": total})
+        return result
+
+
+class _TimedPoolMixin:
+    """对取连接（含等待空闲连接与新建连接）计时，超时单独计数"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record_timeout()
+            raise
+        self.stats.record_wait((time.perf_counter() - started) * 1000)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() 会换成新建的连接池，累计统计随之保留
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+# 名称 -> 引擎（读取时取 engine.pool，dispose 后也能拿到当前的连接池）
+_engines: dict = {}
+
+
+def register(name: str, engine) -> None:
+    """登记需要监控的引擎（异步引擎传入其 sync_engine），由 session 模块在创建引擎后调用"""
+    _engines[name] = engine
+
+
+def snapshot() -> list[dict]:
+    """各连接池的当前状态与累计的取连接统计"""
+    result = []
+    for name, engine in _engines.items():
+        pool = engine.pool
+        item = {"name": name, "pool_class": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            item.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow_in_use": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+                "timeout_seconds": pool.timeout(),
+            })
+        if isinstance(pool, _TimedPoolMixin):
+            stats = pool.stats
+            item.update({
+                "checkouts": stats.checkouts,
+                "timeouts": stats.timeouts,
+                "wait_ms_sum": round(stats.wait_sum_ms, 3),
+                "wait_ms_max": round(stats.wait_max_ms, 3),
+                "wait_ms_histogram": stats.histogram(),
+            })
+        result.append(item)
+    return result
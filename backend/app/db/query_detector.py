@@ -0,0 +1,125 @@
+"""
+N+1 与慢查询检测（开发 / 预发环境使用，QUERY_DETECTOR_ENABLED 开启）
+按请求对执行的 SQL 做形状指纹（去掉字面量与占位符、折叠 IN 列表与多行 VALUES），
+同一形状重复执行达到阈值时报告 N+1 嫌疑；超过 SLOW_QUERY_MS 的语句连同绑定参数与调用位置写入日志；
+路由可用 query_budget 声明查询预算，超出时告警，严格模式下使请求失败（供测试断言）
+"""
+import logging
+import re
+import sys
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = Path(__file__).resolve().parent.parent
+BACKEND_DIR = APP_DIR.parent
+
+# 计时与会话包装所在的模块，定位调用位置时跳过
+_SKIP_FILES = {
+    str(APP_DIR / "db" / "query_detector.py"),
+    str(APP_DIR / "db" / "query_metrics.py"),
+    str(APP_DIR / "api" / "async_session.py"),
+    str(APP_DIR / "api" / "request_metrics.py"),
+}
+
+_NORMALIZE = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),  # 字符串字面量
+    (re.compile(r"%\(\w+\)s|%s|\$\d+|(?<![:\w]):\w+|\?"), "?"),  # 各驱动的占位符
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),  # 数字字面量
+    (re.compile(r"\s+"), " "),
+    (re.compile(r"\(\?(?:, \?)*\)"), "(...)"),  # IN 列表、VALUES 行
+    (re.compile(r"\(\.\.\.\)(?:, \(\.\.\.\))+"), "(...)"),  # 多行 VALUES
+]
+
+_PARAMS_PREVIEW = 500
+
+
+class QueryBudgetExceeded(Exception):
+    """路由的查询次数超出声明的预算（QUERY_BUDGET_STRICT 开启时抛出）"""
+
+    def __init__(self, route: str, budget: int, queries: int):
+        super().__init__(f"{route} 执行了 {queries} 条查询，超出预算 {budget}")
+        self.route = route
+        self.budget = budget
+        self.queries = queries
+
+
+def query_budget(max_queries: int) -> Callable:
+    """
+    声明路由的查询预算（含 ETag 等依赖中的查询），放在 @router.xxx 之下
+
+    只在开启检测器时检查，生产环境没有额外开销
+    """
+    def decorator(func):
+        func.query_budget = max_queries
+        return func
+    return decorator
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """SQL 形状：只保留结构，参数取值与 IN 列表长度不同的语句指纹相同"""
+    for pattern, replacement in _NORMALIZE:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip()
+
+
+def call_site() -> str:
+    """触发查询的应用代码位置（跳过 SQLAlchemy 与计时包装，取最内层的 app 下的帧）"""
+    frame = sys._getframe(1)
+    app_dir = str(APP_DIR)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(app_dir) and filename not in _SKIP_FILES:
+            location = Path(filename).relative_to(BACKEND_DIR)
+            return f"{location}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "<unknown>"
+
+
+def _preview(parameters) -> str:
+    text = repr(parameters)
+    return text if len(text) <= _PARAMS_PREVIEW else text[:_PARAMS_PREVIEW] + "..."
+
+
+class QueryTracker:
+    """单个请求内按 SQL 形状统计执行次数，记录首次达到重复阈值时的调用位置"""
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self.sites: dict[str, str] = {}
+
+    def record(self, statement: str, parameters, elapsed: float) -> None:
+        shape = fingerprint(statement)
+        self.counts[shape] += 1
+        if self.counts[shape] == settings.QUERY_REPEAT_THRESHOLD:
+            self.sites[shape] = call_site()
+        if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+            logger.warning(
+                "慢查询 %.1f ms（%s）: %s | 参数: %s",
+                elapsed * 1000, call_site(), " ".join(statement.split()), _preview(parameters),
+            )
+
+    def repeated(self) -> list[tuple[str, int, str]]:
+        """达到重复阈值的 (SQL 形状, 次数, 调用位置)，按次数降序"""
+        return [
+            (shape, count, self.sites.get(shape, "<unknown>"))
+            for shape, count in self.counts.most_common()
+            if count >= settings.QUERY_REPEAT_THRESHOLD
+        ]
+
+
+def check_request(route: str, queries: int, tracker: QueryTracker, budget: Optional[int]) -> None:
+    """请求处理完成后报告 N+1 嫌疑与预算超出"""
+    for shape, count, site in tracker.repeated():
+        logger.warning("N+1 嫌疑: %s 中同一形状的 SQL 执行了 %d 次（%s）: %s", route, count, site, shape)
+
+    if budget is not None and queries > budget:
+        if settings.QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(route, budget, queries)
+        logger.error("%s 执行了 %d 条查询，超出预算 %d", route, queries, budget)
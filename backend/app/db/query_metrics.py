@@ -0,0 +1,58 @@
+"""
+请求级数据库查询统计
+在所有引擎（含异步引擎底层的同步引擎与只读副本）的游标执行前后计时，
+把查询次数与耗时累加到当前请求的 RequestTimings 上（由请求监控中间件创建）
+"""
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@dataclass
+class RequestTimings:
+    """单个请求的耗时拆分（秒，perf_counter 时间点）"""
+    started: float
+    route: Optional[str] = None  # 路由模板，如 /api/v1/crops/{crop_id}
+    queries: int = 0
+    db_seconds: float = 0.0
+    endpoint_done: Optional[float] = None  # 路由函数返回的时间点，之后为响应模型校验与 JSON 序列化
+    tracker: Optional[object] = None  # 开启 N+1 检测时为 query_detector.QueryTracker
+
+
+# 同步路由在线程池中执行、异步会话在 greenlet 中执行时都会继承请求的上下文，
+# 对象本身可变，因此各处累加的是同一份统计
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def start_request() -> RequestTimings:
+    timings = RequestTimings(started=time.perf_counter())
+    _current.set(timings)
+    return timings
+
+
+def current() -> Optional[RequestTimings]:
+    """当前请求的统计，不在请求中（如命令行脚本）时为 None"""
+    return _current.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        context.query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timings = _current.get()
+    started = getattr(context, "query_started", None)
+    if timings is None or started is None:
+        return
+    elapsed = time.perf_counter() - started
+    timings.queries += 1
+    timings.db_seconds += elapsed
+    if timings.tracker is not None:
+        timings.tracker.record(statement, parameters, elapsed)
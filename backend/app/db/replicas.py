@@ -0,0 +1,42 @@
+"""
+只读副本路由
+只读会话按轮询顺序选择副本；连接副本失败时把它标记为不可用并尝试下一个，
+全部不可用时回退到主库，不可用的副本在 REPLICA_RETRY_SECONDS 秒后重新参与轮询
+"""
+import itertools
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaSet:
+    """一组副本引擎（同步或异步）的轮询与健康状态"""
+
+    def __init__(self, engines: list, retry_seconds: float):
+        self.engines = engines
+        self.retry_seconds = retry_seconds
+        self._counter = itertools.count()
+        self._down_until: dict[int, float] = {}
+
+    def candidates(self) -> list:
+        """本次请求依次尝试的副本：从轮询位置开始，跳过仍处于不可用期的副本"""
+        count = len(self.engines)
+        if not count:
+            return []
+        start = next(self._counter)
+        now = time.monotonic()
+        ordered = [self.engines[(start + i) % count] for i in range(count)]
+        return [engine for engine in ordered if self._down_until.get(id(engine), 0) <= now]
+
+    def mark_down(self, engine, exc: BaseException) -> None:
+        self._down_until[id(engine)] = time.monotonic() + self.retry_seconds
+        logger.warning("只读副本 %s 不可用，%s 秒内改用其他副本或主库: %s",
+                       engine.url.render_as_string(), self.retry_seconds, exc)
+
+    def status(self) -> list[dict]:
+        now = time.monotonic()
+        return [
+            {"url": engine.url.render_as_string(), "healthy": self._down_until.get(id(engine), 0) <= now}
+            for engine in self.engines
+        ]
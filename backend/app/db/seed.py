@@ -9,6 +9,11 @@ from app.models.crop import Crop, CropStatus, CropUnit
 from app.models.animal import Animal, ProductType
 from app.models.flower import Flower, FlowerPurpose, BloomSeason
 from app.models.yield_record import YieldRecord
+from app.services.farm_summary import rebuild_farm_summary
+from app.services.farm_events import rebuild_farm_events
+from app.services.yield_rollups import rebuild_yield_rollups
+from app.services.flower_tags import rebuild_flower_tags
+from app.services import data_versions
 
 
 # ============================================
@@ -313,6 +318,12 @@ def seed_all(db: Session) -> None:
     seed_animals(db)
     seed_flowers(db)
     seed_yield_records(db)
+    rebuild_farm_summary(db)
+    rebuild_farm_events(db)
+    rebuild_yield_rollups(db)
+    rebuild_flower_tags(db)
+    data_versions.bump(db, "crop", "animal", "flower")
+    db.commit()
     print("[Seed] 种子数据初始化完成")
 
 
@@ -322,5 +333,10 @@ def clear_seed_data(db: Session) -> None:
     db.query(Crop).delete()
     db.query(Animal).delete()
     db.query(Flower).delete()
+    rebuild_farm_summary(db)
+    rebuild_farm_events(db)
+    rebuild_yield_rollups(db)
+    rebuild_flower_tags(db)
+    data_versions.bump(db, "crop", "animal", "flower")
     db.commit()
     print("[Seed] 已清除所有种子数据")
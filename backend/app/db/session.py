@@ -1,11 +1,91 @@
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Coroutine, Iterator, Optional, TypeVar, Union
+
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Result, make_url
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 
 from app.core.config import settings
+from app.db import pool_metrics
+from app.db.replicas import ReplicaSet
+
+
+def pool_options(url: str, poolclass) -> dict:
+    """按配置创建带监控的连接池；内存 SQLite 必须共用单个连接，保留方言默认的连接池"""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+
+engine = create_engine(
+    settings.DATABASE_URL,
+    pool_pre_ping=True,
+    **pool_options(settings.DATABASE_URL, pool_metrics.TimedQueuePool),
+)
+pool_metrics.register("sync", engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 同步驱动 -> 对应的异步驱动
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """由同步连接串推导异步连接串（替换驱动，其余部分不变）"""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"不支持异步访问的数据库: {parsed.get_backend_name()}，请设置 ASYNC_DATABASE_URL")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+REPLICA_URLS = [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+
+replicas = ReplicaSet(
+    [
+        create_engine(url, pool_pre_ping=True, **pool_options(url, pool_metrics.TimedQueuePool))
+        for url in REPLICA_URLS
+    ],
+    settings.REPLICA_RETRY_SECONDS,
+)
+for index, replica in enumerate(replicas.engines, start=1):
+    pool_metrics.register(f"replica-{index}", replica)
+
+async_engine: Optional[AsyncEngine] = None
+AsyncSessionLocal: Optional[async_sessionmaker[AsyncSession]] = None
+if settings.ASYNC_DB_ENABLED:
+    async_url = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+    async_engine = create_async_engine(
+        async_url,
+        pool_pre_ping=True,
+        **pool_options(async_url, pool_metrics.TimedAsyncQueuePool),
+    )
+    pool_metrics.register("async", async_engine.sync_engine)
+    # 提交后不过期实例：响应序列化发生在会话之外，不能再触发隐式加载
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+async_replicas = ReplicaSet([], settings.REPLICA_RETRY_SECONDS)
+if settings.ASYNC_DB_ENABLED:
+    for url in REPLICA_URLS:
+        url = async_database_url(url)
+        async_replicas.engines.append(
+            create_async_engine(url, pool_pre_ping=True, **pool_options(url, pool_metrics.TimedAsyncQueuePool))
+        )
+    for index, replica in enumerate(async_replicas.engines, start=1):
+        pool_metrics.register(f"async-replica-{index}", replica.sync_engine)
+
 
 def get_db() -> Session:
     """获取数据库会话"""
@@ -14,3 +94,103 @@ def get_db() -> Session:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """获取异步数据库会话"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def _wants_primary(request: Optional[Request]) -> bool:
+    """客户端刚写入后需要立即读到结果时，可带 X-Read-Primary: 1 强制读主库"""
+    return request is not None and request.headers.get("x-read-primary", "").lower() in ("1", "true")
+
+
+def _connect_replica():
+    for replica in replicas.candidates():
+        try:
+            return replica.connect()
+        except (SQLAlchemyError, OSError) as exc:
+            replicas.mark_down(replica, exc)
+    return None
+
+
+@contextmanager
+def read_session(request: Optional[Request] = None) -> Iterator[Session]:
+    """只读会话：轮询使用只读副本，副本全部不可用（或未配置）时使用主库"""
+    connection = None if _wants_primary(request) else _connect_replica()
+    if connection is None:
+        with SessionLocal() as db:
+            yield db
+        return
+    try:
+        with SessionLocal(bind=connection) as db:
+            yield db
+    finally:
+        connection.close()
+
+
+def get_read_db(request: Request) -> Session:
+    """获取只读数据库会话（列表、详情、统计等只读接口使用）"""
+    with read_session(request) as db:
+        yield db
+
+
+async def _connect_async_replica():
+    for replica in async_replicas.candidates():
+        try:
+            return await replica.connect()
+        except (SQLAlchemyError, OSError) as exc:
+            async_replicas.mark_down(replica, exc)
+    return None
+
+
+async def get_async_read_db(request: Request) -> AsyncIterator[AsyncSession]:
+    """获取只读异步数据库会话（选择副本的规则同 read_session）"""
+    connection = None if _wants_primary(request) else await _connect_async_replica()
+    if connection is None:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+    try:
+        async with AsyncSessionLocal(bind=connection) as db:
+            yield db
+    finally:
+        await connection.close()
+
+
+# ============================================
+# 同步 / 异步会话共用的读取接口
+# ============================================
+
+T = TypeVar("T")
+
+
+async def execute(db: Union[Session, AsyncSession], statement, params: Optional[dict] = None) -> Result:
+    """
+    执行语句，读路由与读服务以 await execute(db, ...) 同时支持两种会话
+
+    AsyncSession 上等待异步驱动完成 IO；同步 Session 上直接执行、不会挂起，
+    整个协程可由 run_to_completion 在线程池中同步跑完
+    """
+    if isinstance(db, AsyncSession):
+        return await db.execute(statement, params)
+    return db.execute(statement, params)
+
+
+async def get(db: Union[Session, AsyncSession], model: type[T], ident: Any) -> Optional[T]:
+    """按主键读取（先查会话的标识映射），同 execute 支持两种会话"""
+    if isinstance(db, AsyncSession):
+        return await db.get(model, ident)
+    return db.get(model, ident)
+
+
+def run_to_completion(coroutine: Coroutine[Any, Any, T]) -> T:
+    """同步跑完只在同步会话上 await execute / get 的协程（这些 await 都不会挂起）"""
+    try:
+        coroutine.send(None)
+    except StopIteration as done:
+        return done.value
+    coroutine.close()
+    raise RuntimeError("协程在同步会话上挂起：只能 await 同步会话上的 execute / get")
@@ -2,7 +2,9 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
-from app.api.v1 import crops, animals, flowers, statistics
+from app.api.request_metrics import RequestMetricsMiddleware, TimedRoute
+from app.api.serialization import JSON_RESPONSE_CLASS
+from app.api.v1 import crops, animals, flowers, statistics, search, export, metrics
 
 # 数据库初始化（开发环境）
 if settings.AUTO_CREATE_TABLES:
@@ -14,7 +16,12 @@ app = FastAPI(
     description="大噜农场展示系统 API",
     version="1.0.0",
     openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
+    default_response_class=JSON_RESPONSE_CLASS,
 )
+app.router.route_class = TimedRoute
+
+# 请求监控：耗时/响应大小/数据库查询统计，输出到 /metrics 与 Server-Timing 响应头
+app.add_middleware(RequestMetricsMiddleware)
 
 # CORS配置
 app.add_middleware(
@@ -30,6 +37,12 @@ app.include_router(crops.router, prefix=f"{settings.API_V1_PREFIX}/crops", tags=
 app.include_router(animals.router, prefix=f"{settings.API_V1_PREFIX}/animals", tags=["动物管理"])
 app.include_router(flowers.router, prefix=f"{settings.API_V1_PREFIX}/flowers", tags=["花卉管理"])
 app.include_router(statistics.router, prefix=f"{settings.API_V1_PREFIX}/statistics", tags=["统计数据"])
+app.include_router(search.router, prefix=f"{settings.API_V1_PREFIX}/search", tags=["搜索"])
+app.include_router(export.router, prefix=f"{settings.API_V1_PREFIX}/export", tags=["数据导出"])
+
+# 内部监控（不在 API 版本前缀下；默认不注册，开启后可用 METRICS_TOKEN 限制访问）
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router, prefix="/metrics", tags=["内部监控"])
 
 
 @app.get("/")
@@ -2,8 +2,12 @@
 from app.db.base import Base
 from app.models.crop import Crop, CropStatus, CropUnit
 from app.models.animal import Animal, ProductType
-from app.models.flower import Flower, FlowerPurpose, BloomSeason
+from app.models.flower import Flower, FlowerPurpose, BloomSeason, FlowerColor, FlowerBloomSeason
 from app.models.yield_record import YieldRecord
+from app.models.farm_summary import FarmSummary
+from app.models.farm_event import FarmEvent
+from app.models.yield_rollup import YieldDailyRollup, YieldMonthlyRollup
+from app.models.data_version import DataVersion
 
 __all__ = [
     "Base",
@@ -15,5 +19,12 @@ __all__ = [
     "Flower",
     "FlowerPurpose",
     "BloomSeason",
+    "FlowerColor",
+    "FlowerBloomSeason",
     "YieldRecord",
+    "FarmSummary",
+    "FarmEvent",
+    "YieldDailyRollup",
+    "YieldMonthlyRollup",
+    "DataVersion",
 ]
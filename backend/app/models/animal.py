@@ -1,8 +1,8 @@
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Enum as SQLEnum, Index
 from datetime import datetime
 import enum
 
-from app.db.base import Base
+from app.db.base import Base, bigram_index, trigram_indexes
 
 
 class ProductType(str, enum.Enum):
@@ -31,5 +31,15 @@ class Animal(Base):
     created_at = Column(DateTime, default=datetime.utcnow, comment="创建时间")
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, comment="更新时间")
 
+    # 列表排序/键集分页使用的复合索引（按产品类型、品种筛选时以筛选列为前缀），
+    # 以及名称、品种、备注的模糊搜索索引
+    __table_args__ = (
+        Index("ix_animals_acquire_date_id", "acquire_date", "id"),
+        Index("ix_animals_product_type_acquire_date_id", "product_type", "acquire_date", "id"),
+        Index("ix_animals_variety_acquire_date_id", "variety", "acquire_date", "id"),
+        *trigram_indexes("animals", "name", "variety", "notes"),
+        bigram_index("animals", name, variety, notes),
+    )
+
     def __repr__(self):
         return f"<Animal {self.name} ({self.variety}) - {self.quantity}>"
@@ -1,9 +1,9 @@
-from sqlalchemy import Column, Integer, String, Float, Date, Enum as SQLEnum, DateTime
+from sqlalchemy import Column, Integer, String, Float, Date, Enum as SQLEnum, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
 
-from app.db.base import Base
+from app.db.base import Base, bigram_index, trigram_indexes
 
 
 class CropStatus(str, enum.Enum):
@@ -38,12 +38,29 @@ class Crop(Base):
     created_at = Column(DateTime, default=datetime.utcnow, comment="创建时间")
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, comment="更新时间")
 
+    # 列表排序/键集分页使用的 (排序字段, id) 复合索引，以及名称、品种、备注的模糊搜索索引
+    __table_args__ = (
+        Index("ix_crops_plant_date_id", "plant_date", "id"),
+        Index("ix_crops_expected_harvest_date_id", "expected_harvest_date", "id"),
+        Index("ix_crops_actual_harvest_date_id", "actual_harvest_date", "id"),
+        Index("ix_crops_name_id", "name", "id"),
+        Index("ix_crops_variety_id", "variety", "id"),
+        Index("ix_crops_area_id", "area", "id"),
+        Index("ix_crops_total_yield_id", "total_yield", "id"),
+        Index("ix_crops_status_id", "status", "id"),
+        Index("ix_crops_created_at_id", "created_at", "id"),
+        Index("ix_crops_updated_at_id", "updated_at", "id"),
+        *trigram_indexes("crops", "name", "variety", "notes"),
+        bigram_index("crops", name, variety, notes),
+    )
+
     # 关联产量记录
     yield_records = relationship(
         "YieldRecord",
         back_populates="crop",
         cascade="all, delete-orphan",
-        order_by="YieldRecord.record_date.desc()"
+        order_by="YieldRecord.record_date.desc()",
+        lazy="raise_on_sql",
     )
 
     def __repr__(self):
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+
+from app.db.base import Base
+
+
+class DataVersion(Base):
+    """数据版本模型 - 每个数据分类一行，写操作时递增，用于统计接口的条件请求"""
+    __tablename__ = "data_versions"
+
+    category = Column(String(20), primary_key=True, comment="数据分类（crop/animal/flower）")
+    version = Column(Integer, nullable=False, default=0, comment="版本号")
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, comment="更新时间")
+
+    def __repr__(self):
+        return f"<DataVersion {self.category} v{self.version}>"
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, Index
+from datetime import datetime
+
+from app.db.base import Base
+
+
+class FarmEvent(Base):
+    """农场事件模型 - 由粮食/花卉记录派生的日历事件，随写操作同步维护"""
+    __tablename__ = "farm_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    date = Column(Date, nullable=False, comment="事件日期")
+    type = Column(String(20), nullable=False, comment="事件类型（plant/harvest）")
+    kind = Column(String(30), nullable=False, comment="事件细分（plant/expected_harvest/harvest）")
+    category = Column(String(20), nullable=False, comment="数据分类（crop/flower）")
+    entity_id = Column(Integer, nullable=False, comment="来源记录ID")
+    title = Column(String(200), nullable=False, comment="事件标题")
+    created_at = Column(DateTime, default=datetime.utcnow, comment="创建时间")
+
+    __table_args__ = (
+        Index("ix_farm_events_date_category", "date", "category"),
+        Index("ix_farm_events_category_entity", "category", "entity_id"),
+    )
+
+    def __repr__(self):
+        return f"<FarmEvent {self.date} {self.category}:{self.entity_id} {self.title}>"
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, Float, DateTime
+from datetime import datetime
+
+from app.db.base import Base
+
+
+class FarmSummary(Base):
+    """农场汇总模型 - 单行表，随写操作增量维护，供总览统计直接读取"""
+    __tablename__ = "farm_summary"
+
+    id = Column(Integer, primary_key=True, comment="固定为1")
+
+    # 粮食统计
+    total_crops = Column(Integer, nullable=False, default=0, comment="粮食记录数")
+    growing_crops = Column(Integer, nullable=False, default=0, comment="生长中数量")
+    harvested_crops = Column(Integer, nullable=False, default=0, comment="已收获数量")
+    total_crop_yield = Column(Float, nullable=False, default=0.0, comment="粮食总产量")
+
+    # 动物统计
+    total_animal_varieties = Column(Integer, nullable=False, default=0, comment="动物品种数")
+    total_animals = Column(Integer, nullable=False, default=0, comment="动物总数量")
+    estimated_daily_yield = Column(Float, nullable=False, default=0.0, comment="预估日产量合计")
+
+    # 花卉统计
+    total_flower_varieties = Column(Integer, nullable=False, default=0, comment="花卉品种数")
+    total_flowers = Column(Integer, nullable=False, default=0, comment="花卉总数量")
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, comment="更新时间")
+
+    def __repr__(self):
+        return f"<FarmSummary crops={self.total_crops} animals={self.total_animals} flowers={self.total_flowers}>"
@@ -1,8 +1,8 @@
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Enum as SQLEnum, JSON
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Enum as SQLEnum, JSON, ForeignKey, Index
 from datetime import datetime
 import enum
 
-from app.db.base import Base
+from app.db.base import Base, bigram_index, trigram_indexes
 
 
 class FlowerPurpose(str, enum.Enum):
@@ -30,7 +30,7 @@ class Flower(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False, comment="花卉名称")
-    variety = Column(String(100), nullable=False, comment="品种")
+    variety = Column(String(100), nullable=False, index=True, comment="品种")
     quantity = Column(Integer, nullable=False, default=0, comment="数量")
     plant_date = Column(Date, nullable=False, comment="种植日期")
     bloom_season = Column(SQLEnum(BloomSeason), comment="开花季节")
@@ -43,5 +43,42 @@ class Flower(Base):
     created_at = Column(DateTime, default=datetime.utcnow, comment="创建时间")
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, comment="更新时间")
 
+    # 列表排序/键集分页使用的复合索引，以及名称、品种、备注的模糊搜索索引
+    __table_args__ = (
+        Index("ix_flowers_plant_date_id", "plant_date", "id"),
+        *trigram_indexes("flowers", "name", "variety", "notes"),
+        bigram_index("flowers", name, variety, notes),
+    )
+
     def __repr__(self):
         return f"<Flower {self.name} ({self.variety}) - {self.quantity}>"
+
+
+class FlowerColor(Base):
+    """花卉颜色关联表 - colors 的规范化索引，用于按颜色筛选"""
+    __tablename__ = "flower_colors"
+
+    flower_id = Column(Integer, ForeignKey("flowers.id", ondelete="CASCADE"), primary_key=True, comment="关联花卉ID")
+    color = Column(String(50), primary_key=True, comment="颜色")
+
+    __table_args__ = (
+        Index("ix_flower_colors_color_flower", "color", "flower_id"),
+    )
+
+    def __repr__(self):
+        return f"<FlowerColor {self.flower_id} - {self.color}>"
+
+
+class FlowerBloomSeason(Base):
+    """花卉开花季节关联表 - 每个花卉实际开花的季节（多季花卉对应多行）"""
+    __tablename__ = "flower_bloom_seasons"
+
+    flower_id = Column(Integer, ForeignKey("flowers.id", ondelete="CASCADE"), primary_key=True, comment="关联花卉ID")
+    season = Column(String(20), primary_key=True, comment="季节（spring/summer/autumn/winter）")
+
+    __table_args__ = (
+        Index("ix_flower_bloom_seasons_season_flower", "season", "flower_id"),
+    )
+
+    def __repr__(self):
+        return f"<FlowerBloomSeason {self.flower_id} - {self.season}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, Date, DateTime, ForeignKey, String
+from sqlalchemy import Column, Integer, Float, Date, DateTime, ForeignKey, String, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -18,6 +18,11 @@ class YieldRecord(Base):
     notes = Column(String(500), comment="备注")
     created_at = Column(DateTime, default=datetime.utcnow, comment="创建时间")
 
+    # 单个粮食的产量记录按 (日期, id) 键集分页
+    __table_args__ = (
+        Index("ix_yield_records_crop_id_record_date_id", "crop_id", "record_date", "id"),
+    )
+
     # 关联
     crop = relationship("Crop", back_populates="yield_records")
 
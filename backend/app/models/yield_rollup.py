@@ -0,0 +1,48 @@
+from sqlalchemy import Column, Integer, Float, Date, DateTime, ForeignKey, String, UniqueConstraint
+from datetime import datetime
+
+from app.db.base import Base
+
+
+class YieldDailyRollup(Base):
+    """产量日汇总 - 按 (粮食, 日期, 单位) 预聚合 yield_records，供日/周粒度时间序列使用"""
+    __tablename__ = "yield_daily_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    crop_id = Column(Integer, ForeignKey("crops.id", ondelete="CASCADE"), nullable=False, comment="关联粮食ID")
+    record_date = Column(Date, nullable=False, index=True, comment="记录日期")
+    week_start = Column(Date, nullable=False, index=True, comment="所在周的周一")
+    unit = Column(String(20), nullable=False, default="", comment="单位（无单位为空串）")
+    total_quantity = Column(Float, nullable=False, default=0.0, comment="产量合计")
+    total_area = Column(Float, nullable=False, default=0.0, comment="收获面积合计")
+    record_count = Column(Integer, nullable=False, default=0, comment="记录条数")
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, comment="更新时间")
+
+    __table_args__ = (
+        UniqueConstraint("crop_id", "record_date", "unit", name="uq_yield_daily_rollups_crop_date_unit"),
+    )
+
+    def __repr__(self):
+        return f"<YieldDailyRollup {self.crop_id} {self.record_date} - {self.total_quantity}{self.unit}>"
+
+
+class YieldMonthlyRollup(Base):
+    """产量月汇总 - 按 (粮食, 月份, 单位) 预聚合 yield_records，供月/年粒度时间序列使用"""
+    __tablename__ = "yield_monthly_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    crop_id = Column(Integer, ForeignKey("crops.id", ondelete="CASCADE"), nullable=False, comment="关联粮食ID")
+    month_start = Column(Date, nullable=False, index=True, comment="月份第一天")
+    year = Column(Integer, nullable=False, index=True, comment="年份")
+    unit = Column(String(20), nullable=False, default="", comment="单位（无单位为空串）")
+    total_quantity = Column(Float, nullable=False, default=0.0, comment="产量合计")
+    total_area = Column(Float, nullable=False, default=0.0, comment="收获面积合计")
+    record_count = Column(Integer, nullable=False, default=0, comment="记录条数")
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, comment="更新时间")
+
+    __table_args__ = (
+        UniqueConstraint("crop_id", "month_start", "unit", name="uq_yield_monthly_rollups_crop_month_unit"),
+    )
+
+    def __repr__(self):
+        return f"<YieldMonthlyRollup {self.crop_id} {self.month_start} - {self.total_quantity}{self.unit}>"
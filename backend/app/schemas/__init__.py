@@ -1,7 +1,9 @@
 # Schemas package
 from app.schemas.crop import (
     CropCreate, CropUpdate, CropResponse, CropListResponse,
-    CropHarvestUpdate, CropStatus, CropUnit
+    CropHarvestUpdate, CropHarvestItem, CropHarvestBatch, CropHarvestBatchResponse,
+    CropWithYieldResponse, YieldSummary, YieldRecordResponse, YieldRecordListResponse,
+    CropStatus, CropUnit
 )
 from app.schemas.animal import (
     AnimalCreate, AnimalUpdate, AnimalResponse, AnimalListResponse,
@@ -13,5 +15,9 @@ from app.schemas.flower import (
 )
 from app.schemas.statistics import (
     OverviewStats, CropStats, AnimalStats, FlowerStats,
-    ChartData, ChartDataResponse, CalendarEvent, CalendarData
+    ChartData, ChartDataResponse, CalendarEvent, CalendarData,
+    YieldTimeseriesPoint, YieldTimeseries, CacheStats
 )
+from app.schemas.search import SearchHit, SearchResponse
+from app.schemas.bulk import BulkOperation, BulkRequest, BulkItemResult, BulkResponse
+from app.schemas.metrics import WaitBucket, DbPoolStats, ThreadpoolStats, ReplicaStatus, DbPoolMetrics
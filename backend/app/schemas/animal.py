@@ -55,6 +55,9 @@ class AnimalResponse(AnimalBase):
 class AnimalListResponse(BaseModel):
     """动物列表响应"""
     items: list[AnimalResponse]
-    total: int
+    total: Optional[int] = None  # total=none 时为空；total=estimate 时为估算值
+    total_mode: str = "exact"  # exact, estimate, none
     skip: int
     limit: int
+    has_more: bool = False
+    next_cursor: Optional[str] = None  # 下一页游标，无更多数据时为空
@@ -0,0 +1,34 @@
+from pydantic import BaseModel, Field
+from typing import Any, Literal, Optional
+
+from app.core.config import settings
+
+
+class BulkOperation(BaseModel):
+    """批量接口中的单个操作"""
+    op: Literal["create", "update", "delete"]
+    id: Optional[int] = Field(None, description="更新、删除时必填")
+    data: Optional[dict[str, Any]] = Field(None, description="新增、更新时的字段，按对应的创建/更新 Schema 校验")
+
+
+class BulkRequest(BaseModel):
+    """批量请求：所有操作在同一个事务中执行"""
+    operations: list[BulkOperation] = Field(..., min_length=1, max_length=settings.BULK_MAX_OPERATIONS)
+
+
+class BulkItemResult(BaseModel):
+    """单个操作的执行结果"""
+    index: int  # 操作在请求中的位置
+    op: str
+    status: str  # created, updated, deleted, invalid, not_found
+    id: Optional[int] = None
+    errors: Optional[list[str]] = None
+
+
+class BulkResponse(BaseModel):
+    """批量响应"""
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    failed: int = 0
+    results: list[BulkItemResult]
@@ -3,6 +3,8 @@ from typing import Optional
 from datetime import date, datetime
 from enum import Enum
 
+from app.core.config import settings
+
 
 class CropStatus(str, Enum):
     GROWING = "growing"
@@ -47,13 +49,25 @@ class CropUpdate(BaseModel):
 
 
 class CropHarvestUpdate(BaseModel):
-    """收获Schema"""
+    """收获Schema（每次收获追加一条产量记录）"""
     actual_harvest_date: date = Field(..., description="实际收获日期")
-    yield_quantity: float = Field(..., gt=0, description="产量")
-    yield_unit: Optional[CropUnit] = None
+    yield_quantity: float = Field(..., gt=0, description="本次产量（累加到总产量）")
+    yield_unit: Optional[CropUnit] = Field(None, description="本次产量的单位（与粮食单位不同时换算后累加）")
+    area_harvested: Optional[float] = Field(None, gt=0, description="本次收获面积（亩）")
+    partial: bool = Field(False, description="部分收获：只记录产量，不标记为已收获")
     notes: Optional[str] = Field(None, max_length=500)
 
 
+class CropHarvestItem(CropHarvestUpdate):
+    """批量收获中的单条收获"""
+    crop_id: int
+
+
+class CropHarvestBatch(BaseModel):
+    """批量收获Schema（同一事务内写入）"""
+    harvests: list[CropHarvestItem] = Field(..., min_length=1, max_length=settings.BULK_MAX_OPERATIONS)
+
+
 class CropResponse(CropBase):
     """粮食响应Schema"""
     id: int
@@ -67,9 +81,24 @@ class CropResponse(CropBase):
         from_attributes = True
 
 
+class YieldSummary(BaseModel):
+    """产量摘要（include=yield_summary 时返回）"""
+    record_count: int
+    quantity_by_unit: dict[str, float]  # 单位 -> 产量合计，无单位的记录对应空串
+    total_area: float
+    first_record_date: Optional[date] = None
+    last_record_date: Optional[date] = None
+
+
+class CropWithYieldResponse(CropResponse):
+    """粮食响应，可附带产量摘要（未请求时不输出该字段）"""
+    yield_summary: Optional[YieldSummary] = None
+
+
 class YieldRecordResponse(BaseModel):
     """产量记录响应Schema"""
     id: int
+    crop_id: int
     record_date: date
     quantity: float
     unit: Optional[str] = None
@@ -80,9 +109,27 @@ class YieldRecordResponse(BaseModel):
         from_attributes = True
 
 
+class CropHarvestBatchResponse(BaseModel):
+    """批量收获响应"""
+    records: list[YieldRecordResponse]
+    crops_updated: int
+
+
+class YieldRecordListResponse(BaseModel):
+    """产量记录列表响应"""
+    items: list[YieldRecordResponse]
+    skip: int
+    limit: int
+    has_more: bool = False
+    next_cursor: Optional[str] = None
+
+
 class CropListResponse(BaseModel):
     """粮食列表响应"""
-    items: list[CropResponse]
-    total: int
+    items: list[CropWithYieldResponse]
+    total: Optional[int] = None  # total=none 时为空；total=estimate 时为估算值
+    total_mode: str = "exact"  # exact, estimate, none
     skip: int
     limit: int
+    has_more: bool = False
+    next_cursor: Optional[str] = None  # 下一页游标，无更多数据时为空
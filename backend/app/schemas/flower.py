@@ -28,6 +28,7 @@ class FlowerBase(BaseModel):
     quantity: int = Field(..., ge=0, description="数量")
     plant_date: date = Field(..., description="种植日期")
     bloom_season: Optional[BloomSeason] = Field(None, description="开花季节")
+    bloom_seasons: Optional[list[BloomSeason]] = Field(None, description="多季开花明细")
     colors: Optional[list[str]] = Field(None, description="颜色列表")
     purpose: Optional[FlowerPurpose] = Field(None, description="主要用途")
     estimated_yield: Optional[float] = Field(None, ge=0, description="预估产量")
@@ -47,6 +48,7 @@ class FlowerUpdate(BaseModel):
     quantity: Optional[int] = Field(None, ge=0)
     plant_date: Optional[date] = None
     bloom_season: Optional[BloomSeason] = None
+    bloom_seasons: Optional[list[BloomSeason]] = None
     colors: Optional[list[str]] = None
     purpose: Optional[FlowerPurpose] = None
     estimated_yield: Optional[float] = Field(None, ge=0)
@@ -67,6 +69,9 @@ class FlowerResponse(FlowerBase):
 class FlowerListResponse(BaseModel):
     """花卉列表响应"""
     items: list[FlowerResponse]
-    total: int
+    total: Optional[int] = None  # total=none 时为空；total=estimate 时为估算值
+    total_mode: str = "exact"  # exact, estimate, none
     skip: int
     limit: int
+    has_more: bool = False
+    next_cursor: Optional[str] = None  # 下一页游标，无更多数据时为空
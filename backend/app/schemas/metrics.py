@@ -0,0 +1,44 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class WaitBucket(BaseModel):
+    """等待耗时直方图的一个桶（累计计数）"""
+    le: str  # 桶上界（毫秒），最后一个桶为 +Inf
+    count: int
+
+
+class DbPoolStats(BaseModel):
+    """单个连接池的状态"""
+    name: str  # sync, async
+    pool_class: str
+    size: Optional[int] = None  # 常驻连接数上限
+    checked_out: Optional[int] = None  # 已借出的连接
+    idle: Optional[int] = None  # 池中空闲的连接
+    overflow_in_use: Optional[int] = None  # 正在使用的溢出连接
+    max_overflow: Optional[int] = None
+    timeout_seconds: Optional[float] = None
+    checkouts: Optional[int] = None  # 累计取连接次数
+    timeouts: Optional[int] = None  # 累计等待超时次数
+    wait_ms_sum: Optional[float] = None
+    wait_ms_max: Optional[float] = None
+    wait_ms_histogram: Optional[list[WaitBucket]] = None
+
+
+class ThreadpoolStats(BaseModel):
+    """同步路由使用的线程池"""
+    total: int  # 可同时运行的同步请求数
+    busy: int  # 正在占用的线程数
+
+
+class ReplicaStatus(BaseModel):
+    """只读副本的健康状态"""
+    url: str  # 已隐藏密码
+    healthy: bool
+
+
+class DbPoolMetrics(BaseModel):
+    """连接池监控响应"""
+    pools: list[DbPoolStats]
+    threadpool: ThreadpoolStats
+    replicas: list[ReplicaStatus] = []
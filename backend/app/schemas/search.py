@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class SearchHit(BaseModel):
+    """搜索结果条目"""
+    category: str  # crop, animal, flower
+    id: int
+    name: str
+    variety: Optional[str] = None
+    score: float  # 相关度，越大越相关
+
+
+class SearchResponse(BaseModel):
+    """统一搜索响应"""
+    items: list[SearchHit]
+    skip: int
+    limit: int
+    has_more: bool = False
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import Dict, List, Optional
+from datetime import date
 
 
 class OverviewStats(BaseModel):
@@ -19,6 +20,9 @@ class OverviewStats(BaseModel):
     total_flower_varieties: int
     total_flowers: int
 
+    class Config:
+        from_attributes = True
+
 
 class CropStats(BaseModel):
     """粮食统计"""
@@ -66,3 +70,30 @@ class CalendarEvent(BaseModel):
 class CalendarData(BaseModel):
     """日历数据响应"""
     events: List[CalendarEvent]
+
+
+class YieldTimeseriesPoint(BaseModel):
+    """产量时间序列数据点"""
+    period: date  # 时间桶起始日期
+    unit: Optional[str] = None
+    quantity: float
+    area_harvested: float
+    record_count: int
+
+
+class YieldTimeseries(BaseModel):
+    """产量时间序列响应"""
+    bucket: str  # day, week, month, year
+    points: List[YieldTimeseriesPoint]
+
+
+class CacheStats(BaseModel):
+    """统计缓存状态"""
+    hits: int
+    misses: int
+    hit_rate: float
+    evictions: int
+    invalidations: int
+    size: int
+    maxsize: int
+    ttl_seconds: float
@@ -0,0 +1,72 @@
+"""
+统计聚合服务
+把各统计接口与图表所需的分组聚合合并为一条 UNION ALL 语句，
+一次数据库往返即可取回全部数据集
+"""
+from typing import Iterable, Optional, Union
+
+from sqlalchemy import Float, String, cast, func, join, literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.session import execute
+from app.models import (
+    Crop, Animal, Flower, FlowerBloomSeason, CropStatus, ProductType, FlowerPurpose
+)
+
+# 数据集名 -> (分组列, 聚合表达式, 分组列对应的枚举类, 结果数值类型)
+DATASETS = {
+    "crop_yield_by_variety": (Crop.variety, func.sum(Crop.total_yield), None, float),
+    "crop_count_by_status": (Crop.status, func.count(Crop.id), CropStatus, int),
+    "animal_quantity_by_product_type": (Animal.product_type, func.sum(Animal.quantity), ProductType, int),
+    "animal_quantity_by_variety": (Animal.variety, func.sum(Animal.quantity), None, int),
+    "flower_quantity_by_season": (FlowerBloomSeason.season, func.sum(Flower.quantity), None, int),
+    "flower_quantity_by_purpose": (Flower.purpose, func.sum(Flower.quantity), FlowerPurpose, int),
+}
+
+# 需要显式关联的数据集：多季花卉在季节关联表中有多行，按每个开花季节分别计数
+DATASET_SOURCES = {
+    "flower_quantity_by_season": join(FlowerBloomSeason, Flower, FlowerBloomSeason.flower_id == Flower.id),
+}
+
+
+def _dataset_select(name: str):
+    key_column, aggregate, _, _ = DATASETS[name]
+    stmt = select(
+        literal(name).label("dataset"),
+        cast(key_column, String).label("label"),
+        cast(aggregate, Float).label("value"),
+    )
+    if name in DATASET_SOURCES:
+        stmt = stmt.select_from(DATASET_SOURCES[name])
+    return stmt.group_by(key_column)
+
+
+def _normalize_label(label: str, enum_cls) -> str:
+    """枚举列在库中存的是成员名，统一转换为对外使用的枚举值"""
+    if enum_cls is None:
+        return label
+    try:
+        return enum_cls[label].value
+    except KeyError:
+        return label
+
+
+async def compute_datasets(
+    db: Union[Session, AsyncSession], names: Optional[Iterable[str]] = None
+) -> dict[str, dict]:
+    """
+    一次查询计算多个分组聚合数据集
+
+    返回 {数据集名: {标签: 数值}}，分组值为 NULL 的行会被忽略
+    """
+    names = list(names or DATASETS)
+    stmt = union_all(*[_dataset_select(name) for name in names])
+
+    results: dict[str, dict] = {name: {} for name in names}
+    for dataset, label, value in await execute(db, stmt):
+        if label is None:
+            continue
+        _, _, enum_cls, value_type = DATASETS[dataset]
+        results[dataset][_normalize_label(label, enum_cls)] = value_type(value or 0)
+    return results
@@ -0,0 +1,161 @@
+"""
+批量写入服务
+一次请求中的新增、更新、删除在同一事务内按操作类型合并执行：
+新增为一条 executemany 的 INSERT ... RETURNING，更新为按主键的 executemany UPDATE，删除为一条 DELETE ... IN；
+汇总、日历事件与花卉关联表同样按整批维护，语句数与批大小无关
+"""
+from collections import Counter
+from typing import Iterable
+
+from pydantic import ValidationError
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models import Crop, Animal, Flower, YieldRecord
+from app.schemas import (
+    CropCreate, CropUpdate, AnimalCreate, AnimalUpdate, FlowerCreate, FlowerUpdate, BulkOperation
+)
+from app.services import data_versions, farm_events, farm_summary, flower_tags, yield_rollups
+
+# 分类 -> (模型, 创建 Schema, 更新 Schema)
+BULK_TARGETS = {
+    "crop": (Crop, CropCreate, CropUpdate),
+    "animal": (Animal, AnimalCreate, AnimalUpdate),
+    "flower": (Flower, FlowerCreate, FlowerUpdate),
+}
+
+
+def _errors(exc: ValidationError) -> list[str]:
+    return [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in exc.errors()]
+
+
+def _fail(result: dict, status: str, errors: list[str]) -> None:
+    result["status"] = status
+    result["errors"] = errors
+
+
+def _load_states(db: Session, model, ids: Iterable[int]) -> dict[int, dict]:
+    """一次查询取回多条记录参与汇总的字段：id -> snapshot"""
+    ids = list(ids)
+    if not ids:
+        return {}
+    columns = [getattr(model, field) for field in farm_summary.TRACKED_FIELDS[model]]
+    rows = db.execute(select(*columns).where(model.id.in_(ids)))
+    return {row.id: farm_summary.snapshot(row, model) for row in rows}
+
+
+def _parse(operations: list[BulkOperation], create_schema, update_schema, results: list[dict]):
+    """逐条校验操作，返回 (新增, 更新, 删除) 三组待执行项，无效操作直接记入结果"""
+    creates, updates, deletes = [], [], []
+    seen_ids = set()
+    for index, operation in enumerate(operations):
+        result = {"index": index, "op": operation.op, "id": operation.id, "status": None, "errors": None}
+        results.append(result)
+
+        if operation.op != "create":
+            if operation.id is None:
+                _fail(result, "invalid", ["id: 更新、删除操作必须提供 id"])
+                continue
+            if operation.id in seen_ids:
+                _fail(result, "invalid", ["id: 同一批次中每条记录只能出现一次"])
+                continue
+            seen_ids.add(operation.id)
+
+        if operation.op == "delete":
+            deletes.append((result, None))
+            continue
+        if operation.data is None:
+            _fail(result, "invalid", ["data: 新增、更新操作必须提供 data"])
+            continue
+        try:
+            if operation.op == "create":
+                creates.append((result, create_schema.model_validate(operation.data).model_dump()))
+            else:
+                updates.append((result, update_schema.model_validate(operation.data).model_dump(exclude_unset=True)))
+        except ValidationError as exc:
+            _fail(result, "invalid", _errors(exc))
+    return creates, updates, deletes
+
+
+def apply_operations(db: Session, category: str, operations: list[BulkOperation]) -> list[dict]:
+    """
+    在当前事务中执行一批操作（调用方负责提交），按请求顺序返回每个操作的结果
+
+    校验失败的操作记为 invalid，更新、删除不存在的记录记为 not_found，均不影响其他操作
+    """
+    model, create_schema, update_schema = BULK_TARGETS[category]
+    results = []
+    creates, updates, deletes = _parse(operations, create_schema, update_schema, results)
+
+    before = _load_states(db, model, (result["id"] for result, _ in [*updates, *deletes]))
+    for result, _ in [*updates, *deletes]:
+        if result["id"] not in before:
+            _fail(result, "not_found", ["记录不存在"])
+    updates = [(result, data) for result, data in updates if result["id"] in before]
+    deletes = [(result, data) for result, data in deletes if result["id"] in before]
+    if not (creates or updates or deletes):
+        return results
+
+    varieties = set()
+    varieties_before = None
+    if "variety" in farm_summary.TRACKED_FIELDS[model]:
+        varieties.update(state["variety"] for state in before.values())
+        varieties.update(data["variety"] for _, data in [*creates, *updates] if data.get("variety"))
+        farm_summary.lock_summary(db)
+        varieties_before = farm_summary.varieties_in_use(db, model, varieties)
+
+    if creates:
+        new_ids = db.scalars(
+            insert(model).returning(model.id, sort_by_parameter_order=True),
+            [data for _, data in creates],
+        ).all()
+        for (result, _), new_id in zip(creates, new_ids):
+            result["id"] = new_id
+            result["status"] = "created"
+    update_rows = [{"id": result["id"], **data} for result, data in updates if data]
+    if update_rows:
+        db.execute(update(model), update_rows)
+    for result, _ in updates:
+        result["status"] = "updated"
+    deleted_ids = [result["id"] for result, _ in deletes]
+    if deleted_ids:
+        if model is Crop:
+            # 不依赖数据库的级联删除（SQLite 默认不启用外键约束）
+            db.execute(
+                delete(YieldRecord)
+                .where(YieldRecord.crop_id.in_(deleted_ids))
+                .execution_options(synchronize_session=False)
+            )
+            yield_rollups.delete_crops_rollups(db, deleted_ids)
+        db.execute(
+            delete(model)
+            .where(model.id.in_(deleted_ids))
+            .execution_options(synchronize_session=False)
+        )
+        for result, _ in deletes:
+            result["status"] = "deleted"
+
+    written_ids = [result["id"] for result, _ in [*creates, *updates]]
+    after = _load_states(db, model, written_ids)
+    changes = [(before.get(record_id), after[record_id]) for record_id in written_ids]
+    changes.extend((before[record_id], None) for record_id in deleted_ids)
+    farm_summary.record_bulk_change(db, model, changes, varieties, varieties_before)
+
+    if model in farm_events.CATEGORY_BY_MODEL:
+        farm_events.sync_bulk_events(db, model, written_ids, deleted_ids)
+    if model is Flower:
+        flower_tags.sync_bulk_flower_tags(db, written_ids, deleted_ids)
+    data_versions.bump(db, category)
+    return results
+
+
+def summarize(results: list[dict]) -> dict:
+    """按状态计数，组装批量响应"""
+    counts = Counter(result["status"] for result in results)
+    return {
+        "created": counts["created"],
+        "updated": counts["updated"],
+        "deleted": counts["deleted"],
+        "failed": counts["invalid"] + counts["not_found"],
+        "results": results,
+    }
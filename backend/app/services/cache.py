@@ -0,0 +1,131 @@
+"""
+统计结果缓存
+进程内 TTL + LRU 缓存，按接口名、查询参数与相关分类的数据版本号作为键，
+按数据分类（crop/animal/flower）打标签，写操作只失效本进程中相关分类的条目；
+其他进程或导入命令写入后版本号变化，旧条目不再命中，响应体与 ETag 保持一致
+"""
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Hashable, Iterable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services import data_versions
+
+_MISSING = object()
+
+
+class TTLCache:
+    """带过期时间和容量上限的 LRU 缓存（线程安全）"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, frozenset, Any]]" = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Any:
+        """读取缓存，未命中或已过期返回 _MISSING"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return _MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def generation(self, tags: Iterable[str]) -> tuple:
+        """当前各标签的失效代数，用于丢弃计算期间已被失效的结果"""
+        with self._lock:
+            return tuple(self._generations.get(tag, 0) for tag in tags)
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[str], generation: tuple = None) -> None:
+        """写入缓存；若传入的代数已过期（期间发生过写操作）则放弃写入"""
+        tags = tuple(tags)
+        with self._lock:
+            if generation is not None and generation != tuple(self._generations.get(t, 0) for t in tags):
+                return
+            self._data[key] = (time.monotonic() + self.ttl, frozenset(tags), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *tags: str) -> None:
+        """失效带有任一指定标签的条目"""
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+            stale = [k for k, (_, entry_tags, _) in self._data.items() if entry_tags.intersection(tags)]
+            for key in stale:
+                del self._data[key]
+            self.invalidations += len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+            }
+
+
+stats_cache = TTLCache(maxsize=settings.STATS_CACHE_MAXSIZE, ttl=settings.STATS_CACHE_TTL_SECONDS)
+
+
+def cached(*categories: str) -> Callable:
+    """
+    统计接口缓存装饰器
+
+    以接口函数名 + 查询参数（忽略数据库会话）+ categories 的当前数据版本号为键，
+    categories 为该结果依赖的数据分类。版本号与 stats_etag 依赖在同一会话中读取（只查询一次）。
+    被装饰的接口为 async def（见 app.api.async_session）
+    """
+    sessions = (Session, AsyncSession)
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not settings.STATS_CACHE_ENABLED:
+                return await func(*args, **kwargs)
+
+            params = tuple(sorted(
+                (k, v) for k, v in kwargs.items() if not isinstance(v, sessions)
+            ))
+            db = next((v for v in kwargs.values() if isinstance(v, sessions)), None)
+            versions = tuple((await data_versions.session_versions(db, categories)).values()) if db is not None else ()
+            key = (func.__name__, params, versions)
+            value = stats_cache.get(key)
+            if value is not _MISSING:
+                return value
+
+            generation = stats_cache.generation(categories)
+            value = await func(*args, **kwargs)
+            stats_cache.set(key, value, categories, generation)
+            return value
+
+        return wrapper
+
+    return decorator
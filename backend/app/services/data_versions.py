@@ -0,0 +1,61 @@
+"""
+数据版本服务
+每个数据分类维护一个递增版本号，与写操作在同一事务中更新；
+统计接口据此生成 ETag，无需执行聚合查询即可判断数据是否变化
+"""
+from typing import Iterable, Union
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.session import execute
+from app.models import DataVersion
+
+# session.info 中缓存本会话已读取的版本号的键
+_SESSION_KEY = "data_versions"
+
+
+def bump(db: Session, *categories: str) -> None:
+    """递增指定分类的版本号（调用方负责提交事务）"""
+    db.info.pop(_SESSION_KEY, None)
+    for category in categories:
+        stmt = (
+            update(DataVersion)
+            .where(DataVersion.category == category)
+            .values(version=DataVersion.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if db.execute(stmt).rowcount == 0:
+            try:
+                with db.begin_nested():
+                    db.execute(insert(DataVersion).values(category=category, version=1))
+            except IntegrityError:
+                db.execute(stmt)
+
+
+async def get_versions(db: Union[Session, AsyncSession], categories: Iterable[str]) -> dict[str, int]:
+    """读取指定分类的当前版本号，从未写入过的分类为 0"""
+    categories = list(categories)
+    rows = await execute(
+        db,
+        select(DataVersion.category, DataVersion.version)
+        .where(DataVersion.category.in_(categories)),
+    )
+    versions = dict.fromkeys(categories, 0)
+    versions.update(dict(rows.all()))
+    return versions
+
+
+async def session_versions(db: Union[Session, AsyncSession], categories: Iterable[str]) -> dict[str, int]:
+    """
+    读取版本号并记在 session.info 中，同一会话内再次读取不再查询
+
+    请求内的 ETag 依赖与统计缓存共用同一会话，因而使用同一份版本号：缓存的响应体与 ETag 始终对应
+    """
+    known = db.info.setdefault(_SESSION_KEY, {})
+    missing = [category for category in categories if category not in known]
+    if missing:
+        known.update(await get_versions(db, missing))
+    return {category: known[category] for category in categories}
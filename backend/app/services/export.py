@@ -0,0 +1,102 @@
+"""
+数据导出服务
+以服务端游标（stream_results + yield_per）分批读取整表，逐批序列化为 NDJSON 或 CSV，
+内存占用只与批大小有关，与表的行数无关
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Iterable, Iterator, Optional, Sequence
+
+from sqlalchemy import JSON, DateTime, Enum, select
+from sqlalchemy.orm import Session
+
+from app.models import Crop, Animal, Flower, YieldRecord
+
+# 导出实体 -> (模型, 日期筛选列)
+EXPORT_SOURCES = {
+    "crops": (Crop, Crop.plant_date),
+    "animals": (Animal, Animal.acquire_date),
+    "flowers": (Flower, Flower.plant_date),
+    "yield-records": (YieldRecord, YieldRecord.record_date),
+}
+
+BATCH_SIZE = 2000
+
+
+def export_columns(entity: str) -> list[str]:
+    """导出的列名（即表的全部列）"""
+    model, _ = EXPORT_SOURCES[entity]
+    return [column.key for column in model.__table__.columns]
+
+
+def iter_batches(
+    db: Session,
+    entity: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    batch_size: int = BATCH_SIZE,
+) -> Iterator[Sequence]:
+    """按 id 顺序分批读取行元组，start/end 按实体的日期列筛选（含端点）"""
+    model, date_column = EXPORT_SOURCES[entity]
+    stmt = select(*model.__table__.columns).order_by(model.id)
+    if start:
+        stmt = stmt.where(date_column >= start)
+    if end:
+        stmt = stmt.where(date_column <= end)
+
+    result = db.execute(stmt.execution_options(stream_results=True, yield_per=batch_size))
+    yield from result.partitions()
+
+
+def _default(value):
+    """JSON 编码器的兜底：日期时间转 ISO 格式（枚举均为 str 子类，编码器直接输出其值）"""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"无法序列化的类型: {type(value).__name__}")
+
+
+_json_encoder = json.JSONEncoder(ensure_ascii=False, default=_default)
+
+
+def ndjson_chunks(entity: str, batches: Iterable[Sequence]) -> Iterator[str]:
+    """每行一个 JSON 对象，每批输出一个数据块"""
+    columns = export_columns(entity)
+    encode = _json_encoder.encode
+    for batch in batches:
+        yield "".join([encode(dict(zip(columns, row))) + "\n" for row in batch])
+
+
+def _csv_converters(entity: str) -> list:
+    """按列类型预先确定单元格转换函数：枚举取值，JSON 列写 JSON 文本，日期时间用 ISO 格式"""
+    model, _ = EXPORT_SOURCES[entity]
+    converters = []
+    for column in model.__table__.columns:
+        if isinstance(column.type, Enum):
+            converters.append(lambda value: value.value)
+        elif isinstance(column.type, JSON):
+            converters.append(lambda value: json.dumps(value, ensure_ascii=False))
+        elif isinstance(column.type, DateTime):
+            converters.append(datetime.isoformat)
+        else:
+            converters.append(None)
+    return converters
+
+
+def csv_chunks(entity: str, batches: Iterable[Sequence]) -> Iterator[str]:
+    """首行为列名，每批输出一个数据块"""
+    converters = _csv_converters(entity)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(export_columns(entity))
+    for batch in batches:
+        writer.writerows([
+            [value if convert is None or value is None else convert(value) for convert, value in zip(converters, row)]
+            for row in batch
+        ])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -0,0 +1,120 @@
+"""
+农场事件服务
+维护反范式的 farm_events 表，日历查询只需在 (date, category) 索引上做一次范围扫描
+"""
+from sqlalchemy import delete, func, insert, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.models import Crop, Flower, FarmEvent
+
+# 事件细分 -> (事件类型, 标题前缀)
+EVENT_KINDS = {
+    "plant": ("plant", "种植"),
+    "expected_harvest": ("harvest", "预计收获"),
+    "harvest": ("harvest", "收获"),
+}
+
+# 事件来源：(模型, 分类, 事件细分, 日期列)
+EVENT_SOURCES = [
+    (Crop, "crop", "plant", Crop.plant_date),
+    (Crop, "crop", "expected_harvest", Crop.expected_harvest_date),
+    (Crop, "crop", "harvest", Crop.actual_harvest_date),
+    (Flower, "flower", "plant", Flower.plant_date),
+]
+
+CATEGORY_BY_MODEL = {Crop: "crop", Flower: "flower"}
+
+
+def entity_events(obj) -> list[FarmEvent]:
+    """根据单条粮食/花卉记录生成其全部事件"""
+    events = []
+    for model, category, kind, date_column in EVENT_SOURCES:
+        if not isinstance(obj, model):
+            continue
+        event_date = getattr(obj, date_column.key)
+        if event_date is None:
+            continue
+        event_type, title_prefix = EVENT_KINDS[kind]
+        events.append(FarmEvent(
+            date=event_date,
+            type=event_type,
+            kind=kind,
+            category=category,
+            entity_id=obj.id,
+            title=f"{title_prefix} {obj.name}",
+        ))
+    return events
+
+
+def delete_entity_events(db: Session, category: str, entity_id: int) -> None:
+    """删除某条记录的全部事件"""
+    db.execute(
+        delete(FarmEvent)
+        .where(FarmEvent.category == category, FarmEvent.entity_id == entity_id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def sync_entity_events(db: Session, obj) -> None:
+    """
+    重写某条记录的事件（新增、更新、收获后调用）
+
+    需在 db.flush() 之后调用，以便新记录已分配 ID
+    """
+    delete_entity_events(db, CATEGORY_BY_MODEL[type(obj)], obj.id)
+    db.add_all(entity_events(obj))
+
+
+def _event_selects(model=None, entity_ids=None) -> list:
+    """按 EVENT_SOURCES 生成事件的 SELECT 分支，可限定模型与记录 ID"""
+    branches = []
+    for source_model, category, kind, date_column in EVENT_SOURCES:
+        if model is not None and source_model is not model:
+            continue
+        event_type, title_prefix = EVENT_KINDS[kind]
+        stmt = select(
+            date_column,
+            literal(event_type),
+            literal(kind),
+            literal(category),
+            source_model.id,
+            literal(f"{title_prefix} ") + source_model.name,
+            func.now(),
+        ).where(date_column.isnot(None))
+        if entity_ids is not None:
+            stmt = stmt.where(source_model.id.in_(entity_ids))
+        branches.append(stmt)
+    return branches
+
+
+def _insert_events(db: Session, branches: list) -> None:
+    db.execute(
+        insert(FarmEvent).from_select(
+            ["date", "type", "kind", "category", "entity_id", "title", "created_at"],
+            union_all(*branches),
+        )
+    )
+
+
+def sync_bulk_events(db: Session, model, entity_ids: list[int], deleted_ids: list[int] = ()) -> None:
+    """
+    批量写操作后重写事件：删除涉及记录的旧事件，再用一条 INSERT ... SELECT
+    为 entity_ids（新增、更新的记录）生成新事件
+    """
+    category = CATEGORY_BY_MODEL[model]
+    stale_ids = [*entity_ids, *deleted_ids]
+    if stale_ids:
+        db.execute(
+            delete(FarmEvent)
+            .where(FarmEvent.category == category, FarmEvent.entity_id.in_(stale_ids))
+            .execution_options(synchronize_session=False)
+        )
+    if entity_ids:
+        _insert_events(db, _event_selects(model, entity_ids))
+
+
+def rebuild_farm_events(db: Session) -> int:
+    """从业务表全量重建事件表（调用方负责提交事务），返回事件数"""
+    db.execute(delete(FarmEvent))
+    _insert_events(db, _event_selects())
+    return db.query(FarmEvent).count()
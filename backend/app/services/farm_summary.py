@@ -0,0 +1,257 @@
+"""
+农场汇总服务
+在写操作的同一事务中增量维护 farm_summary 单行表，
+使总览统计只需一次主键读取，而不是每次全表聚合
+"""
+from typing import Iterable, Optional, Union
+
+from sqlalchemy import func, select, true, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.session import execute, get
+from app.models import Crop, Animal, Flower, CropStatus, FarmSummary
+
+SUMMARY_ID = 1
+
+# 各实体参与汇总计算的字段
+TRACKED_FIELDS = {
+    Crop: ("id", "status", "total_yield"),
+    Animal: ("id", "variety", "quantity", "estimated_daily_yield"),
+    Flower: ("id", "variety", "quantity"),
+}
+
+
+def snapshot(obj, model=None) -> dict:
+    """记录实体当前参与汇总的字段值（用于更新/删除前后对比），对 Core 查询的行需传入 model"""
+    return {field: getattr(obj, field) for field in TRACKED_FIELDS[model or type(obj)]}
+
+
+def _summary_statement():
+    """从业务表全量计算汇总值的语句（一条语句，每张表一次扫描）"""
+    crops = select(
+        func.count(Crop.id).label("total_crops"),
+        func.count(Crop.id).filter(Crop.status == CropStatus.GROWING).label("growing_crops"),
+        func.count(Crop.id).filter(Crop.status == CropStatus.HARVESTED).label("harvested_crops"),
+        func.sum(Crop.total_yield).label("total_crop_yield"),
+    ).subquery()
+    animals = select(
+        func.count(func.distinct(Animal.variety)).label("total_animal_varieties"),
+        func.sum(Animal.quantity).label("total_animals"),
+        func.sum(Animal.estimated_daily_yield).label("estimated_daily_yield"),
+    ).subquery()
+    flowers = select(
+        func.count(func.distinct(Flower.variety)).label("total_flower_varieties"),
+        func.sum(Flower.quantity).label("total_flowers"),
+    ).subquery()
+    # 三个单行子查询按 ON TRUE 连接为一行
+    return select(crops, animals, flowers).select_from(crops.join(animals, true()).join(flowers, true()))
+
+
+def _summary_values(row) -> dict:
+    """汇总语句的结果行 -> 汇总值（空表的聚合结果为 NULL，按 0 计）"""
+    return {
+        "total_crops": row.total_crops or 0,
+        "growing_crops": row.growing_crops or 0,
+        "harvested_crops": row.harvested_crops or 0,
+        "total_crop_yield": float(row.total_crop_yield or 0),
+        "total_animal_varieties": row.total_animal_varieties or 0,
+        "total_animals": int(row.total_animals or 0),
+        "estimated_daily_yield": float(row.estimated_daily_yield or 0),
+        "total_flower_varieties": row.total_flower_varieties or 0,
+        "total_flowers": int(row.total_flowers or 0),
+    }
+
+
+def compute_summary(db: Session) -> dict:
+    """从业务表全量计算汇总值"""
+    return _summary_values(db.execute(_summary_statement()).one())
+
+
+def rebuild_farm_summary(db: Session) -> FarmSummary:
+    """从头重建汇总行（调用方负责提交事务）"""
+    summary = db.merge(FarmSummary(id=SUMMARY_ID, **compute_summary(db)))
+    db.flush()
+    return summary
+
+
+async def get_farm_summary(db: Union[Session, AsyncSession]) -> FarmSummary:
+    """
+    读取汇总行
+
+    汇总行不存在（尚未发生过写操作）时现算一个不入库的汇总对象：
+    读请求可能在只读副本上执行，不在这里写库；汇总行由第一次写操作或 rebuild-summary 命令建立
+    """
+    summary = await get(db, FarmSummary, SUMMARY_ID)
+    if summary is None:
+        row = (await execute(db, _summary_statement())).one()
+        summary = FarmSummary(id=SUMMARY_ID, **_summary_values(row))
+    return summary
+
+
+def _apply_deltas(db: Session, deltas: dict) -> None:
+    """以原子的 col = col + delta 方式更新汇总行"""
+    deltas = {k: v for k, v in deltas.items() if v}
+    if not deltas:
+        return
+
+    result = db.execute(
+        update(FarmSummary)
+        .where(FarmSummary.id == SUMMARY_ID)
+        .values({k: getattr(FarmSummary, k) + v for k, v in deltas.items()})
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        # 汇总行尚未建立：直接全量重建（此时已包含本次变更）
+        rebuild_farm_summary(db)
+
+
+def lock_summary(db: Session) -> None:
+    """
+    锁定汇总行（SELECT ... FOR UPDATE）直到事务结束
+
+    品种去重数按“是否还有其他记录使用该品种”增减，检查必须在锁内进行：
+    否则 READ COMMITTED 下两个并发事务可能都判定品种未被使用而各自 +1，计数发生漂移。
+    持锁后其他事务的检查要等本事务提交，届时能看到本事务写入的记录
+    """
+    db.execute(select(FarmSummary.id).where(FarmSummary.id == SUMMARY_ID).with_for_update())
+
+
+def _variety_in_use(db: Session, model, variety: str, exclude_id: Optional[int]) -> bool:
+    """除指定记录外，是否还有其他记录使用该品种"""
+    stmt = select(model.id).where(model.variety == variety)
+    if exclude_id is not None:
+        stmt = stmt.where(model.id != exclude_id)
+    return db.execute(stmt.limit(1)).first() is not None
+
+
+def _variety_delta(db: Session, model, before: Optional[dict], after: Optional[dict]) -> int:
+    """计算品种去重数的变化量"""
+    old_variety = before["variety"] if before else None
+    new_variety = after["variety"] if after else None
+    if old_variety == new_variety:
+        return 0
+
+    lock_summary(db)
+    record_id = (after or before)["id"]
+    delta = 0
+    if old_variety is not None and not _variety_in_use(db, model, old_variety, record_id):
+        delta -= 1
+    if new_variety is not None and not _variety_in_use(db, model, new_variety, record_id):
+        delta += 1
+    return delta
+
+
+def _crop_contribution(state: Optional[dict]) -> dict:
+    if not state:
+        return {"total_crops": 0, "growing_crops": 0, "harvested_crops": 0, "total_crop_yield": 0.0}
+    return {
+        "total_crops": 1,
+        "growing_crops": int(state["status"] == CropStatus.GROWING),
+        "harvested_crops": int(state["status"] == CropStatus.HARVESTED),
+        "total_crop_yield": float(state["total_yield"] or 0),
+    }
+
+
+def _animal_contribution(state: Optional[dict]) -> dict:
+    state = state or {}
+    return {
+        "total_animals": state.get("quantity") or 0,
+        "estimated_daily_yield": float(state.get("estimated_daily_yield") or 0),
+    }
+
+
+def _flower_contribution(state: Optional[dict]) -> dict:
+    return {"total_flowers": (state or {}).get("quantity") or 0}
+
+
+# 模型 -> (单条记录对汇总的贡献, 品种去重数字段)
+CONTRIBUTIONS = {
+    Crop: (_crop_contribution, None),
+    Animal: (_animal_contribution, "total_animal_varieties"),
+    Flower: (_flower_contribution, "total_flower_varieties"),
+}
+
+
+def record_crop_change(db: Session, before: Optional[dict], after: Optional[dict]) -> None:
+    """
+    记录一次粮食写操作对汇总的影响
+
+    before/after 为 snapshot() 结果，新增时 before 为 None，删除时 after 为 None。
+    需在 db.flush() 之后、db.commit() 之前调用。
+    """
+    old = _crop_contribution(before)
+    new = _crop_contribution(after)
+    _apply_deltas(db, {k: new[k] - old[k] for k in new})
+
+
+def record_animal_change(db: Session, before: Optional[dict], after: Optional[dict]) -> None:
+    """记录一次动物写操作对汇总的影响（调用时机同 record_crop_change）"""
+    old = _animal_contribution(before)
+    new = _animal_contribution(after)
+    deltas = {k: new[k] - old[k] for k in new}
+    deltas["total_animal_varieties"] = _variety_delta(db, Animal, before, after)
+    _apply_deltas(db, deltas)
+
+
+def record_flower_change(db: Session, before: Optional[dict], after: Optional[dict]) -> None:
+    """记录一次花卉写操作对汇总的影响（调用时机同 record_crop_change）"""
+    old = _flower_contribution(before)
+    new = _flower_contribution(after)
+    deltas = {k: new[k] - old[k] for k in new}
+    deltas["total_flower_varieties"] = _variety_delta(db, Flower, before, after)
+    _apply_deltas(db, deltas)
+
+
+def varieties_in_use(db: Session, model, varieties: Iterable[str]) -> set[str]:
+    """给定品种中当前仍有记录使用的品种（一次 IN 查询）"""
+    varieties = {v for v in varieties if v is not None}
+    if not varieties:
+        return set()
+    rows = db.execute(select(model.variety).where(model.variety.in_(varieties)).distinct())
+    return {variety for (variety,) in rows}
+
+
+def bulk_deltas(model, changes: Iterable[tuple[Optional[dict], Optional[dict]]]) -> dict:
+    """一批 (before, after) 快照对对各汇总字段的增量之和（不含品种去重数）"""
+    contribution, _ = CONTRIBUTIONS[model]
+    deltas = {}
+    for before, after in changes:
+        old, new = contribution(before), contribution(after)
+        for key in new:
+            deltas[key] = deltas.get(key, 0) + new[key] - old[key]
+    return deltas
+
+
+def record_bulk_deltas(
+    db: Session,
+    model,
+    deltas: dict,
+    varieties: Iterable[str] = (),
+    varieties_before: Optional[set[str]] = None,
+) -> None:
+    """按 bulk_deltas 的结果（可由多批累加）与品种去重数的变化更新一次汇总行，参数含义同 record_bulk_change"""
+    _, variety_field = CONTRIBUTIONS[model]
+    deltas = dict(deltas)
+    if variety_field:
+        in_use = varieties_in_use(db, model, varieties)
+        deltas[variety_field] = len(in_use) - len(varieties_before or set())
+    _apply_deltas(db, deltas)
+
+
+def record_bulk_change(
+    db: Session,
+    model,
+    changes: list[tuple[Optional[dict], Optional[dict]]],
+    varieties: Iterable[str] = (),
+    varieties_before: Optional[set[str]] = None,
+) -> None:
+    """
+    记录一批写操作对汇总的影响，全部增量累加后只更新一次汇总行
+
+    changes 为 (before, after) 快照对。对有品种的模型，varieties 为本批次涉及的全部品种
+    （写入前后），varieties_before 为写入前 varieties_in_use(db, model, varieties) 的结果
+    （须先调用 lock_summary，原因见该函数），写入后对同一批品种再查一次即可得到去重数的变化量。
+    调用时机同 record_crop_change。
+    """
+    record_bulk_deltas(db, model, bulk_deltas(model, changes), varieties, varieties_before)
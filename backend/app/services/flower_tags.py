@@ -0,0 +1,119 @@
+"""
+花卉标签服务
+把 Flower.colors / bloom_seasons 两个 JSON 列同步到规范化的关联表，
+按颜色、季节筛选和季节统计都走关联表上的索引，而不是逐行解析 JSON
+"""
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.models import Flower, FlowerColor, FlowerBloomSeason, BloomSeason
+
+# 全年开花等价于四季
+FOUR_SEASONS = [
+    BloomSeason.SPRING.value,
+    BloomSeason.SUMMER.value,
+    BloomSeason.AUTUMN.value,
+    BloomSeason.WINTER.value,
+]
+
+
+def _value(item) -> str:
+    return getattr(item, "value", item)
+
+
+def effective_seasons(bloom_season, bloom_seasons) -> list[str]:
+    """
+    计算花卉实际开花的季节列表
+
+    优先使用 bloom_seasons 明细；否则 all_year 展开为四季，其余取 bloom_season 本身
+    """
+    if bloom_seasons:
+        return list(dict.fromkeys(_value(s) for s in bloom_seasons))
+    if bloom_season is None:
+        return []
+    if _value(bloom_season) == BloomSeason.ALL_YEAR.value:
+        return list(FOUR_SEASONS)
+    return [_value(bloom_season)]
+
+
+def effective_colors(colors) -> list[str]:
+    return list(dict.fromkeys(c for c in (colors or []) if c))
+
+
+def delete_flower_tags(db: Session, flower_id: int) -> None:
+    """删除某个花卉的全部颜色/季节关联行"""
+    for model in (FlowerColor, FlowerBloomSeason):
+        db.execute(
+            delete(model)
+            .where(model.flower_id == flower_id)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def sync_flower_tags(db: Session, flower: Flower) -> None:
+    """
+    重写某个花卉的关联行（新增、更新后调用）
+
+    需在 db.flush() 之后调用，以便新记录已分配 ID
+    """
+    delete_flower_tags(db, flower.id)
+    colors = effective_colors(flower.colors)
+    seasons = effective_seasons(flower.bloom_season, flower.bloom_seasons)
+    if colors:
+        db.execute(insert(FlowerColor), [{"flower_id": flower.id, "color": c} for c in colors])
+    if seasons:
+        db.execute(insert(FlowerBloomSeason), [{"flower_id": flower.id, "season": s} for s in seasons])
+
+
+def _insert_tags(db: Session, rows) -> int:
+    """根据 (id, colors, bloom_season, bloom_seasons) 行批量写入关联行，返回处理的花卉数"""
+    color_rows, season_rows = [], []
+    count = 0
+    for flower_id, colors, bloom_season, bloom_seasons in rows:
+        count += 1
+        color_rows.extend({"flower_id": flower_id, "color": c} for c in effective_colors(colors))
+        season_rows.extend(
+            {"flower_id": flower_id, "season": s}
+            for s in effective_seasons(bloom_season, bloom_seasons)
+        )
+
+    if color_rows:
+        db.execute(insert(FlowerColor), color_rows)
+    if season_rows:
+        db.execute(insert(FlowerBloomSeason), season_rows)
+    return count
+
+
+def _tag_source():
+    return select(Flower.id, Flower.colors, Flower.bloom_season, Flower.bloom_seasons)
+
+
+def sync_bulk_flower_tags(db: Session, flower_ids: list[int], deleted_ids: list[int] = ()) -> None:
+    """批量写操作后重写关联行：一次删除涉及花卉的旧行，再按 flower_ids（新增、更新的花卉）批量写入"""
+    stale_ids = [*flower_ids, *deleted_ids]
+    if stale_ids:
+        for model in (FlowerColor, FlowerBloomSeason):
+            db.execute(
+                delete(model)
+                .where(model.flower_id.in_(stale_ids))
+                .execution_options(synchronize_session=False)
+            )
+    if flower_ids:
+        _insert_tags(db, db.execute(_tag_source().where(Flower.id.in_(flower_ids))))
+
+
+def rebuild_flower_tags(db: Session) -> int:
+    """从 flowers 表全量重建关联表（调用方负责提交事务），返回处理的花卉数"""
+    db.execute(delete(FlowerColor))
+    db.execute(delete(FlowerBloomSeason))
+    return _insert_tags(db, db.execute(_tag_source()))
+
+
+def color_filter(color: str):
+    """按颜色筛选的条件（走 (color, flower_id) 索引）"""
+    return Flower.id.in_(select(FlowerColor.flower_id).where(FlowerColor.color == color))
+
+
+def season_filter(season: str):
+    """按开花季节筛选的条件（走 (season, flower_id) 索引）"""
+    return Flower.id.in_(select(FlowerBloomSeason.flower_id).where(FlowerBloomSeason.season == season))
@@ -0,0 +1,112 @@
+"""
+收获服务
+每次收获追加一条 yield_records 记录（保留收获时的单位），粮食的 total_yield 以 total_yield + 产量 原子累加（不重新汇总），
+收获单位与粮食的产量单位不同时先换算为粮食的单位再累加；
+产量汇总表、农场汇总与日历事件在同一事务内增量维护；批量收获整批只执行固定条数的语句
+"""
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models import Crop, CropStatus, CropUnit, YieldRecord
+from app.schemas import CropHarvestUpdate
+from app.services import data_versions, farm_events, farm_summary, yield_rollups
+
+crops = Crop.__table__
+
+# 各单位折合千克的系数
+UNIT_TO_KG = {CropUnit.TON: 1000.0, CropUnit.KG: 1.0, CropUnit.GRAM: 0.001}
+
+# 累加产量（已换算为粮食的单位）；粮食尚无单位时采用本批收获的单位
+_ADD_YIELD = (
+    update(crops)
+    .where(crops.c.id == bindparam("crop_id"))
+    .values(
+        total_yield=func.coalesce(crops.c.total_yield, 0) + bindparam("quantity"),
+        unit=func.coalesce(crops.c.unit, bindparam("unit", type_=crops.c.unit.type)),
+    )
+)
+
+# 非部分收获：标记为已收获并记录实际收获日期
+_MARK_HARVESTED = (
+    update(crops)
+    .where(crops.c.id == bindparam("crop_id"))
+    .values(status=CropStatus.HARVESTED, actual_harvest_date=bindparam("harvest_date"))
+)
+
+
+class CropNotFoundError(LookupError):
+    """收获涉及的粮食不存在"""
+
+    def __init__(self, crop_ids: list[int]):
+        self.crop_ids = crop_ids
+        super().__init__(f"粮食记录不存在: {', '.join(map(str, crop_ids))}")
+
+
+def convert(quantity: float, unit: CropUnit, target: CropUnit) -> float:
+    """把产量从 unit 换算为 target 单位"""
+    if unit == target:
+        return quantity
+    return quantity * UNIT_TO_KG[unit] / UNIT_TO_KG[target]
+
+
+def _load_states(db: Session, crop_ids: set[int]) -> dict[int, dict]:
+    rows = db.execute(
+        select(Crop.id, Crop.status, Crop.total_yield, Crop.unit).where(Crop.id.in_(crop_ids))
+    )
+    return {row.id: {**farm_summary.snapshot(row, Crop), "unit": row.unit} for row in rows}
+
+
+def record_harvests(db: Session, harvests: list[tuple[int, CropHarvestUpdate]]) -> list[YieldRecord]:
+    """
+    记录一批收获（调用方负责提交），返回新增的产量记录
+
+    任一粮食不存在时抛出 CropNotFoundError，不写入任何数据。
+    同一粮食的多次收获按顺序累加；收获单位与粮食的产量单位不同时换算为粮食的单位后累加
+    （粮食的单位不随收获改变，尚无单位时采用第一次指定的收获单位），产量记录保留收获时的单位。
+    只要有一次不是部分收获，粮食即标记为已收获，实际收获日期取这些收获中最晚的日期。
+    """
+    crop_ids = {crop_id for crop_id, _ in harvests}
+    before = _load_states(db, crop_ids)
+    missing = sorted(crop_ids - before.keys())
+    if missing:
+        raise CropNotFoundError(missing)
+
+    units = {crop_id: state["unit"] for crop_id, state in before.items()}
+    increments = {}
+    harvest_dates = {}
+    record_rows = []
+    for crop_id, harvest in harvests:
+        crop_unit = units[crop_id] = units[crop_id] or harvest.yield_unit
+        unit = harvest.yield_unit or crop_unit
+        record_rows.append({
+            "crop_id": crop_id,
+            "record_date": harvest.actual_harvest_date,
+            "quantity": harvest.yield_quantity,
+            "unit": unit.value if unit else None,
+            "area_harvested": harvest.area_harvested,
+            "notes": harvest.notes,
+        })
+        increment = increments.setdefault(crop_id, {"crop_id": crop_id, "quantity": 0.0})
+        increment["quantity"] += convert(harvest.yield_quantity, unit, crop_unit) if unit else harvest.yield_quantity
+        increment["unit"] = crop_unit
+        if not harvest.partial:
+            harvest_dates[crop_id] = max(harvest.actual_harvest_date, harvest_dates.get(crop_id, harvest.actual_harvest_date))
+
+    records = db.scalars(
+        insert(YieldRecord).returning(YieldRecord, sort_by_parameter_order=True),
+        record_rows,
+    ).all()
+    yield_rollups.record_yield_batch(db, record_rows)
+
+    db.execute(_ADD_YIELD, list(increments.values()))
+    if harvest_dates:
+        db.execute(
+            _MARK_HARVESTED,
+            [{"crop_id": crop_id, "harvest_date": day} for crop_id, day in harvest_dates.items()],
+        )
+
+    after = _load_states(db, crop_ids)
+    farm_summary.record_bulk_change(db, Crop, [(before[crop_id], after[crop_id]) for crop_id in crop_ids])
+    farm_events.sync_bulk_events(db, Crop, list(crop_ids))
+    data_versions.bump(db, "crop")
+    return records
@@ -0,0 +1,353 @@
+"""
+批量导入服务
+流式读取 CSV / NDJSON，按块在进程池中用创建 Schema 校验，
+PostgreSQL 上以 COPY 写入临时暂存表后一条 INSERT ... SELECT 合并到业务表，
+其他数据库退化为批量 INSERT；校验失败的行写入拒绝文件。
+导入后只按新记录的 ID 增量维护该实体涉及的派生数据（汇总行、日历事件、花卉关联表）
+"""
+import csv
+import enum
+import io
+import json
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, TextIO
+
+from pydantic import ValidationError
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from app.models import Crop, Animal, Flower
+from app.schemas import CropCreate, AnimalCreate, FlowerCreate
+from app.services import data_versions, farm_events, farm_summary, flower_tags
+
+# 导入实体 -> (模型, 校验用的创建 Schema, 数据版本分类)
+IMPORT_TARGETS = {
+    "crops": (Crop, CropCreate, "crop"),
+    "animals": (Animal, AnimalCreate, "animal"),
+    "flowers": (Flower, FlowerCreate, "flower"),
+}
+
+CHUNK_SIZE = 5000
+
+# CSV 中以 JSON 文本保存的列（与导出格式一致）
+JSON_FIELDS = {"colors", "bloom_seasons"}
+
+# COPY 的 NULL 标记：FORMAT csv 默认把未加引号的空字段当作 NULL，空字符串会被写成 NULL；
+# 改用 \N 表示 NULL，字符串一律加引号写出（加引号的值从不匹配 NULL 标记），空字符串得以保留
+COPY_NULL = r"\N"
+
+
+@dataclass
+class ImportReport:
+    """导入结果统计"""
+    read: int = 0
+    loaded: int = 0
+    rejected: int = 0
+    elapsed: float = 0.0
+    reject_path: Optional[Path] = None
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.read / self.elapsed if self.elapsed else 0.0
+
+
+def detect_entity(path: Path) -> Optional[str]:
+    """根据文件名前缀推断实体（如导出文件 crops-20241018.csv）"""
+    for entity in IMPORT_TARGETS:
+        if path.name.startswith(entity):
+            return entity
+    return None
+
+
+# ============================================
+# 读取
+# ============================================
+
+def _read_csv(handle: TextIO) -> Iterator[tuple[int, object]]:
+    reader = csv.DictReader(handle)
+    for row in reader:
+        parsed = {}
+        for key, value in row.items():
+            if value == "" or value is None:
+                continue
+            if key in JSON_FIELDS:
+                try:
+                    value = json.loads(value)
+                except ValueError:
+                    pass  # 交由 Schema 校验报错
+            parsed[key] = value
+        yield reader.line_num, parsed
+
+
+def _read_ndjson(handle: TextIO) -> Iterator[tuple[int, object]]:
+    for line_num, line in enumerate(handle, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_num, json.loads(line)
+        except ValueError as exc:
+            yield line_num, {"__raw__": line.rstrip("\n"), "__error__": f"JSON 解析失败: {exc}"}
+
+
+def read_chunks(handle: TextIO, file_format: str, chunk_size: int = CHUNK_SIZE) -> Iterator[list]:
+    """逐块读取 (行号, 原始行)，内存只保留一块"""
+    rows = _read_csv(handle) if file_format == "csv" else _read_ndjson(handle)
+    chunk = []
+    for item in rows:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ============================================
+# 校验（在工作进程中执行）
+# ============================================
+
+@lru_cache(maxsize=None)
+def import_columns(entity: str) -> tuple[tuple[str, object, bool], ...]:
+    """
+    业务表可写入的列：(列名, 默认值, 是否枚举列)
+
+    默认值为模型上的 Python 端默认值（标量或可调用对象），枚举默认值转换为成员名
+    """
+    model, _, _ = IMPORT_TARGETS[entity]
+    plan = []
+    for column in model.__table__.columns:
+        if column.primary_key:
+            continue
+        default = column.default.arg if column.default is not None else None
+        is_enum = getattr(column.type, "enum_class", None) is not None
+        if is_enum and isinstance(default, enum.Enum):
+            default = default.name
+        plan.append((column.key, default, is_enum))
+    return tuple(plan)
+
+
+def _db_row(plan, data: dict) -> tuple:
+    """
+    把校验后的字段补全为业务表的一行（按 import_columns 的列顺序）
+
+    未提供的列取模型默认值；枚举列转为成员名（库中存成员名），JSON 列表中的枚举转为取值，
+    结果只含基础类型，跨进程传递开销小
+    """
+    row = []
+    for key, default, is_enum in plan:
+        value = data.get(key)
+        if value is None:
+            value = default(None) if callable(default) else default
+        elif is_enum:
+            value = value.name
+        elif isinstance(value, list):
+            value = [getattr(item, "value", item) for item in value]
+        row.append(value)
+    return tuple(row)
+
+
+def validate_chunk(entity: str, chunk: list) -> tuple[list[tuple], list[dict]]:
+    """校验一块原始行，返回 (业务表行, 拒绝记录)"""
+    _, schema, _ = IMPORT_TARGETS[entity]
+    plan = import_columns(entity)
+    valid, rejects = [], []
+    for line_num, raw in chunk:
+        if not isinstance(raw, dict):
+            rejects.append({"line": line_num, "errors": ["每行必须是 JSON 对象"], "row": raw})
+            continue
+        if "__error__" in raw:
+            rejects.append({"line": line_num, "errors": [raw["__error__"]], "row": raw["__raw__"]})
+            continue
+        try:
+            data = schema.model_validate(raw).model_dump()
+        except ValidationError as exc:
+            errors = [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in exc.errors()]
+            rejects.append({"line": line_num, "errors": errors, "row": raw})
+            continue
+        valid.append(_db_row(plan, data))
+    return valid, rejects
+
+
+def _bounded_map(executor: Executor, func, entity: str, chunks: Iterable[list], window: int) -> Iterator:
+    """按顺序返回结果，同时在途的任务不超过 window 个，避免整个文件被提前读入内存"""
+    pending = []
+    for chunk in chunks:
+        pending.append(executor.submit(func, entity, chunk))
+        if len(pending) >= window:
+            yield pending.pop(0).result()
+    for future in pending:
+        yield future.result()
+
+
+# ============================================
+# 写入
+# ============================================
+
+def _copy_field(value) -> str:
+    if value is None:
+        return COPY_NULL
+    if isinstance(value, list):
+        value = json.dumps(value, ensure_ascii=False)
+    elif isinstance(value, datetime):
+        value = value.isoformat(sep=" ")
+    if isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"'
+    return str(value)
+
+
+def copy_rows(rows: Iterable[tuple]) -> str:
+    """按 COPY ... WITH (FORMAT csv, NULL '\\N') 的格式写出业务表行"""
+    return "".join(",".join(_copy_field(value) for value in row) + "\n" for row in rows)
+
+
+class _PostgresLoader:
+    """COPY 到临时暂存表，结束时一次合并到业务表"""
+
+    def __init__(self, db: Session, model, columns: list[str]):
+        self.db = db
+        self.table = model.__table__.name
+        self.staging = f"import_{self.table}"
+        self.column_list = ", ".join(columns)
+        db.execute(text(
+            f"CREATE TEMP TABLE {self.staging} ON COMMIT DROP AS "
+            f"SELECT {self.column_list} FROM {self.table} WITH NO DATA"
+        ))
+        self.copy_sql = (
+            f"COPY {self.staging} ({self.column_list}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')"
+        )
+
+    def load(self, rows: list[tuple]) -> None:
+        buffer = io.StringIO(copy_rows(rows))
+        cursor = self.db.connection().connection.driver_connection.cursor()
+        try:
+            cursor.copy_expert(self.copy_sql, buffer)
+        finally:
+            cursor.close()
+
+    def merge(self) -> list[int]:
+        """合并到业务表，返回新记录的 ID"""
+        return self.db.scalars(text(
+            f"INSERT INTO {self.table} ({self.column_list}) "
+            f"SELECT {self.column_list} FROM {self.staging} RETURNING id"
+        )).all()
+
+
+class _InsertLoader:
+    """非 PostgreSQL 数据库：按块批量 INSERT"""
+
+    def __init__(self, db: Session, model, columns: list[str]):
+        self.db = db
+        self.table = model.__table__
+        self.columns = columns
+        self.ids = []
+
+    def load(self, rows: list[tuple]) -> None:
+        self.ids += self.db.scalars(
+            insert(self.table).returning(self.table.c.id),
+            [dict(zip(self.columns, row)) for row in rows],
+        ).all()
+
+    def merge(self) -> list[int]:
+        return self.ids
+
+
+@lru_cache(maxsize=None)
+def _summary_fields(entity: str) -> tuple[tuple[str, int, Optional[type]], ...]:
+    """参与汇总的字段在业务表行中的位置：(字段, 列序号, 枚举类)"""
+    model, _, _ = IMPORT_TARGETS[entity]
+    positions = {key: index for index, (key, _, _) in enumerate(import_columns(entity))}
+    return tuple(
+        (field, positions[field], getattr(model.__table__.columns[field].type, "enum_class", None))
+        for field in farm_summary.TRACKED_FIELDS[model]
+        if field in positions
+    )
+
+
+def _summary_state(entity: str, row: tuple) -> dict:
+    """由业务表行（枚举为成员名）构造 farm_summary.snapshot 形式的快照"""
+    state = {}
+    for field, index, enum_class in _summary_fields(entity):
+        value = row[index]
+        state[field] = enum_class[value] if enum_class is not None and value is not None else value
+    return state
+
+
+def _sync_derived(db: Session, model, ids: list[int], chunk_size: int) -> None:
+    """为新导入的记录生成日历事件与花卉关联行（按块限定 ID，动物没有派生行）"""
+    for start in range(0, len(ids), chunk_size):
+        batch = ids[start:start + chunk_size]
+        if model in farm_events.CATEGORY_BY_MODEL:
+            farm_events.sync_bulk_events(db, model, batch)
+        if model is Flower:
+            flower_tags.sync_bulk_flower_tags(db, batch)
+
+
+def import_file(
+    db: Session,
+    path: Path,
+    entity: str,
+    workers: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> ImportReport:
+    """
+    导入整个文件（单个事务，调用方负责提交）
+
+    汇总行按导入的行增量累加；品种去重数在锁定汇总行后，按每块中首次出现的品种查询导入前是否已被使用
+    （PostgreSQL 上各块先写入暂存表，合并前业务表不变；其他数据库上这些品种不会已被前面的块写入）。
+    合并后只为新记录的 ID 生成日历事件（粮食、花卉）与花卉关联行，并递增该实体的数据版本
+    """
+    started = time.perf_counter()
+    model, _, category = IMPORT_TARGETS[entity]
+    workers = workers or os.cpu_count() or 1
+    file_format = "csv" if path.suffix.lower() == ".csv" else "ndjson"
+    report = ImportReport(reject_path=path.with_name(path.name + ".rejects.ndjson"))
+
+    columns = [key for key, _, _ in import_columns(entity)]
+    loader_class = _PostgresLoader if db.get_bind().dialect.name == "postgresql" else _InsertLoader
+    loader = loader_class(db, model, columns)
+
+    deltas = {}
+    track_varieties = "variety" in farm_summary.TRACKED_FIELDS[model]
+    variety_index = columns.index("variety")
+    varieties, varieties_before = set(), set()
+    if track_varieties:
+        farm_summary.lock_summary(db)
+
+    with open(path, encoding="utf-8-sig", newline="") as handle, \
+            open(report.reject_path, "w", encoding="utf-8") as reject_file, \
+            ProcessPoolExecutor(max_workers=workers) as executor:
+        chunks = read_chunks(handle, file_format, chunk_size)
+        for valid, rejects in _bounded_map(executor, validate_chunk, entity, chunks, workers * 2):
+            report.read += len(valid) + len(rejects)
+            report.rejected += len(rejects)
+            for reject in rejects:
+                reject_file.write(json.dumps(reject, ensure_ascii=False, default=str) + "\n")
+            if not valid:
+                continue
+            chunk_deltas = farm_summary.bulk_deltas(model, ((None, _summary_state(entity, row)) for row in valid))
+            for key, value in chunk_deltas.items():
+                deltas[key] = deltas.get(key, 0) + value
+            if track_varieties:
+                new_varieties = {row[variety_index] for row in valid} - varieties
+                varieties_before |= farm_summary.varieties_in_use(db, model, new_varieties)
+                varieties |= new_varieties
+            loader.load(valid)
+
+    ids = loader.merge()
+    report.loaded = len(ids)
+    if ids:
+        farm_summary.record_bulk_deltas(db, model, deltas, varieties, varieties_before)
+        _sync_derived(db, model, ids, chunk_size)
+        data_versions.bump(db, category)
+
+    if not report.rejected:
+        report.reject_path.unlink()
+        report.reject_path = None
+    report.elapsed = time.perf_counter() - started
+    return report
@@ -0,0 +1,65 @@
+"""
+列表总数统计
+exact 执行 COUNT(*)；estimate 使用 PostgreSQL 的规划器估算
+（无筛选条件读 pg_class.reltuples，有筛选条件读 EXPLAIN 的行数估计）；
+none 不统计，由调用方返回 has_more
+"""
+import json
+from typing import Optional, Union
+
+from sqlalchemy import Select, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.explain import Explain
+from app.db.session import execute
+
+TOTAL_MODES = ("exact", "estimate", "none")
+
+
+async def _exact_count(db: Union[Session, AsyncSession], statement: Select) -> int:
+    """SELECT count(*) FROM (<statement>)"""
+    return (await execute(db, select(func.count()).select_from(statement.subquery()))).scalar()
+
+
+async def _table_estimate(db: Union[Session, AsyncSession], table_name: str) -> Optional[int]:
+    """读取表的统计行数，从未 ANALYZE 过时返回 None"""
+    reltuples = (await execute(
+        db,
+        text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:name)"),
+        {"name": table_name},
+    )).scalar()
+    if reltuples is None or reltuples < 0:
+        return None
+    return int(reltuples)
+
+
+async def _plan_estimate(db: Union[Session, AsyncSession], statement: Select) -> int:
+    """读取查询计划顶层节点的行数估计"""
+    plan = (await execute(db, Explain(statement))).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def estimate_count(db: Union[Session, AsyncSession], statement: Select) -> int:
+    """估算查询结果行数；非 PostgreSQL 数据库退化为精确统计"""
+    if db.get_bind().dialect.name != "postgresql":
+        return await _exact_count(db, statement)
+
+    if statement.whereclause is None:
+        froms = statement.get_final_froms()
+        if len(froms) == 1 and hasattr(froms[0], "name"):
+            estimate = await _table_estimate(db, froms[0].name)
+            if estimate is not None:
+                return estimate
+    return await _plan_estimate(db, statement)
+
+
+async def count_rows(db: Union[Session, AsyncSession], statement: Select, mode: str) -> Optional[int]:
+    """按模式统计列表总数（statement 为尚未排序分页的列表查询），mode 为 none 时返回 None"""
+    if mode == "none":
+        return None
+    if mode == "estimate":
+        return await estimate_count(db, statement)
+    return await _exact_count(db, statement)
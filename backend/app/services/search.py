@@ -0,0 +1,116 @@
+"""
+模糊搜索服务
+在名称、品种、备注上做 ILIKE '%关键词%' 子串匹配。PostgreSQL 上：
+- 3 个字符及以上的非中日韩关键词走 pg_trgm GIN 索引，结果按 word_similarity 相关度排序；
+- 短关键词（pg_trgm 提取不到 trigram）与中日韩关键词先用 search_grams 表达式索引按单字/相邻两字包含关系筛选，
+  再以 ILIKE 复核，结果按匹配位置排序（word_similarity 按“词”计算，对不分词的中文排序效果很差）。
+其他数据库只做 ILIKE 匹配，按匹配位置排序
+"""
+import re
+from typing import Iterable, Union
+
+from sqlalchemy import Float, Text, and_, case, cast, func, literal, or_, select, union_all
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.base import search_grams
+from app.db.session import execute
+from app.models import Crop, Animal, Flower
+
+# 分类 -> 模型（统一搜索接口使用）
+SEARCH_MODELS = {
+    "crop": Crop,
+    "animal": Animal,
+    "flower": Flower,
+}
+
+
+# 中日韩文字（汉字、假名、谚文）
+_CJK = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]")
+
+
+def uses_bigrams(q: str) -> bool:
+    """关键词不足 3 个字符或包含中日韩文字时走 bigram 路径"""
+    return len(q) < 3 or _CJK.search(q) is not None
+
+
+def query_grams(q: str) -> list[str]:
+    """关键词的相邻两字（单个字符时为其本身），与 search_grams 的小写规则一致"""
+    q = q.lower()
+    if len(q) == 1:
+        return [q]
+    return sorted({q[i:i + 2] for i in range(len(q) - 1)})
+
+
+def _postgresql(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _like_pattern(q: str) -> str:
+    """转义 LIKE 通配符，匹配任意位置的子串"""
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def matches(db: Session, model, q: str):
+    """名称、品种、备注任一包含关键词（bigram 路径先按 search_grams 索引筛选候选行）"""
+    pattern = _like_pattern(q)
+    condition = or_(
+        model.name.ilike(pattern, escape="\\"),
+        model.variety.ilike(pattern, escape="\\"),
+        model.notes.ilike(pattern, escape="\\"),
+    )
+    if _postgresql(db) and uses_bigrams(q):
+        grams = search_grams(model.name, model.variety, model.notes)
+        condition = and_(grams.contains(literal(query_grams(q), ARRAY(Text))), condition)
+    return condition
+
+
+def rank(db: Session, model, q: str):
+    """相关度表达式，数值越大越相关"""
+    if _postgresql(db) and not uses_bigrams(q):
+        return func.greatest(
+            func.word_similarity(q, model.name),
+            func.word_similarity(q, model.variety),
+            func.word_similarity(q, func.coalesce(model.notes, "")),
+        )
+
+    pattern = _like_pattern(q)
+    return case(
+        (func.lower(model.name) == q.lower(), 1.0),
+        (model.name.ilike(pattern[1:], escape="\\"), 0.9),  # 名称以关键词开头
+        (model.name.ilike(pattern, escape="\\"), 0.8),
+        (model.variety.ilike(pattern, escape="\\"), 0.6),
+        else_=0.3,
+    )
+
+
+def order_by_rank(db: Session, model, q: str) -> tuple:
+    """按相关度降序，相同相关度按 id 降序（新记录在前）"""
+    return rank(db, model, q).desc(), model.id.desc()
+
+
+async def search_all(
+    db: Union[Session, AsyncSession], q: str, categories: Iterable[str], skip: int, limit: int
+) -> list[dict]:
+    """
+    跨分类搜索，一条 UNION ALL 语句取回按相关度排好序的一页结果
+
+    返回 limit + 1 条以内的结果，多出的一条供调用方判断是否还有下一页
+    """
+    selects = [
+        select(
+            literal(category).label("category"),
+            model.id,
+            model.name,
+            model.variety,
+            cast(rank(db, model, q), Float).label("score"),
+        ).where(matches(db, model, q))
+        for category, model in SEARCH_MODELS.items()
+        if category in categories
+    ]
+    stmt = union_all(*selects)
+    columns = stmt.selected_columns
+    stmt = stmt.order_by(columns.score.desc(), columns.category, columns.id.desc()).offset(skip).limit(limit + 1)
+    return [row._asdict() for row in await execute(db, stmt)]
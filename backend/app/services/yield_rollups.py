@@ -0,0 +1,286 @@
+"""
+产量汇总服务
+增量维护 yield_records 的日/月汇总表，时间序列查询只扫描预聚合数据：
+日、周粒度读日汇总表，月、年粒度读月汇总表
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Optional, Union
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.session import execute
+from app.models import Crop, YieldRecord, YieldDailyRollup, YieldMonthlyRollup
+
+BUCKETS = ("day", "week", "month", "year")
+
+
+def snapshot(record: YieldRecord) -> dict:
+    """记录产量记录当前参与汇总的字段值"""
+    return {
+        "crop_id": record.crop_id,
+        "record_date": record.record_date,
+        "unit": record.unit,
+        "quantity": record.quantity,
+        "area_harvested": record.area_harvested,
+    }
+
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _apply(db: Session, model, keys: dict, extra: dict, deltas: dict) -> None:
+    """对汇总行做原子增量更新，行不存在时插入"""
+    where = [getattr(model, k) == v for k, v in keys.items()]
+    stmt = (
+        update(model)
+        .where(*where)
+        .values({k: getattr(model, k) + v for k, v in deltas.items()})
+        .execution_options(synchronize_session=False)
+    )
+    if db.execute(stmt).rowcount == 0:
+        try:
+            with db.begin_nested():
+                db.execute(insert(model).values(**keys, **extra, **deltas))
+        except IntegrityError:
+            # 并发写入已插入该行，改为增量更新
+            db.execute(stmt)
+
+    if deltas["record_count"] < 0:
+        db.execute(
+            delete(model)
+            .where(*where, model.record_count <= 0)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def _apply_state(db: Session, state: dict, sign: int) -> None:
+    deltas = {
+        "total_quantity": sign * float(state["quantity"] or 0),
+        "total_area": sign * float(state["area_harvested"] or 0),
+        "record_count": sign,
+    }
+    record_date = state["record_date"]
+    unit = state["unit"] or ""
+
+    _apply(
+        db, YieldDailyRollup,
+        {"crop_id": state["crop_id"], "record_date": record_date, "unit": unit},
+        {"week_start": week_start(record_date)},
+        deltas,
+    )
+    _apply(
+        db, YieldMonthlyRollup,
+        {"crop_id": state["crop_id"], "month_start": month_start(record_date), "unit": unit},
+        {"year": record_date.year},
+        deltas,
+    )
+
+
+def record_yield_change(db: Session, before: Optional[dict], after: Optional[dict]) -> None:
+    """
+    记录一次产量记录写操作对汇总表的影响
+
+    before/after 为 snapshot() 结果，新增时 before 为 None，删除时 after 为 None
+    """
+    if before:
+        _apply_state(db, before, -1)
+    if after:
+        _apply_state(db, after, 1)
+
+
+def record_yield_batch(db: Session, states: list[dict]) -> None:
+    """
+    记录一批新增的产量记录对汇总表的影响
+
+    先按汇总行的键合并增量，同一天/同一月的多条记录只更新一次汇总行
+    """
+    daily = defaultdict(lambda: {"total_quantity": 0.0, "total_area": 0.0, "record_count": 0})
+    monthly = defaultdict(lambda: {"total_quantity": 0.0, "total_area": 0.0, "record_count": 0})
+    for state in states:
+        record_date = state["record_date"]
+        unit = state["unit"] or ""
+        for bucket in (daily[(state["crop_id"], record_date, unit)],
+                       monthly[(state["crop_id"], month_start(record_date), unit)]):
+            bucket["total_quantity"] += float(state["quantity"] or 0)
+            bucket["total_area"] += float(state["area_harvested"] or 0)
+            bucket["record_count"] += 1
+
+    for (crop_id, record_date, unit), deltas in daily.items():
+        _apply(
+            db, YieldDailyRollup,
+            {"crop_id": crop_id, "record_date": record_date, "unit": unit},
+            {"week_start": week_start(record_date)},
+            deltas,
+        )
+    for (crop_id, month, unit), deltas in monthly.items():
+        _apply(
+            db, YieldMonthlyRollup,
+            {"crop_id": crop_id, "month_start": month, "unit": unit},
+            {"year": month.year},
+            deltas,
+        )
+
+
+def delete_crop_rollups(db: Session, crop_id: int) -> None:
+    """删除某个粮食的全部汇总行（粮食被删除时调用）"""
+    delete_crops_rollups(db, [crop_id])
+
+
+def delete_crops_rollups(db: Session, crop_ids: list[int]) -> None:
+    """删除多个粮食的全部汇总行（批量删除粮食时调用）"""
+    for model in (YieldDailyRollup, YieldMonthlyRollup):
+        db.execute(
+            delete(model)
+            .where(model.crop_id.in_(crop_ids))
+            .execution_options(synchronize_session=False)
+        )
+
+
+async def crop_yield_summaries(db: Union[Session, AsyncSession], crop_ids: list[int]) -> dict[int, dict]:
+    """
+    批量取回粮食的产量摘要：id -> 摘要
+
+    一条按 (粮食, 单位) 分组的聚合查询读日汇总表，不逐个加载产量记录；没有记录的粮食也有空摘要
+    """
+    summaries = {
+        crop_id: {
+            "record_count": 0,
+            "quantity_by_unit": {},
+            "total_area": 0.0,
+            "first_record_date": None,
+            "last_record_date": None,
+        }
+        for crop_id in crop_ids
+    }
+    if not crop_ids:
+        return summaries
+
+    rows = await execute(
+        db,
+        select(
+            YieldDailyRollup.crop_id,
+            YieldDailyRollup.unit,
+            func.sum(YieldDailyRollup.record_count),
+            func.sum(YieldDailyRollup.total_quantity),
+            func.sum(YieldDailyRollup.total_area),
+            func.min(YieldDailyRollup.record_date),
+            func.max(YieldDailyRollup.record_date),
+        )
+        .where(YieldDailyRollup.crop_id.in_(crop_ids))
+        .group_by(YieldDailyRollup.crop_id, YieldDailyRollup.unit),
+    )
+    for crop_id, unit, count, quantity, area, first_date, last_date in rows:
+        summary = summaries[crop_id]
+        summary["record_count"] += int(count or 0)
+        summary["quantity_by_unit"][unit] = float(quantity or 0)
+        summary["total_area"] += float(area or 0)
+        if summary["first_record_date"] is None or first_date < summary["first_record_date"]:
+            summary["first_record_date"] = first_date
+        if summary["last_record_date"] is None or last_date > summary["last_record_date"]:
+            summary["last_record_date"] = last_date
+    return summaries
+
+
+def rebuild_yield_rollups(db: Session) -> int:
+    """从 yield_records 全量重建日/月汇总表（调用方负责提交事务），返回日汇总行数"""
+    db.execute(delete(YieldDailyRollup))
+    db.execute(delete(YieldMonthlyRollup))
+
+    unit = func.coalesce(YieldRecord.unit, "")
+    daily_rows = db.execute(
+        select(
+            YieldRecord.crop_id,
+            YieldRecord.record_date,
+            unit,
+            func.sum(YieldRecord.quantity),
+            func.sum(func.coalesce(YieldRecord.area_harvested, 0)),
+            func.count(YieldRecord.id),
+        )
+        .group_by(YieldRecord.crop_id, YieldRecord.record_date, unit)
+    ).all()
+
+    daily = []
+    monthly = defaultdict(lambda: {"total_quantity": 0.0, "total_area": 0.0, "record_count": 0})
+    for crop_id, record_date, record_unit, quantity, area, count in daily_rows:
+        daily.append({
+            "crop_id": crop_id,
+            "record_date": record_date,
+            "week_start": week_start(record_date),
+            "unit": record_unit,
+            "total_quantity": float(quantity or 0),
+            "total_area": float(area or 0),
+            "record_count": count,
+        })
+        bucket = monthly[(crop_id, month_start(record_date), record_unit)]
+        bucket["total_quantity"] += float(quantity or 0)
+        bucket["total_area"] += float(area or 0)
+        bucket["record_count"] += count
+
+    if daily:
+        db.execute(insert(YieldDailyRollup), daily)
+        db.execute(insert(YieldMonthlyRollup), [
+            {"crop_id": crop_id, "month_start": month, "year": month.year, "unit": record_unit, **values}
+            for (crop_id, month, record_unit), values in monthly.items()
+        ])
+    return len(daily)
+
+
+async def query_timeseries(
+    db: Union[Session, AsyncSession],
+    bucket: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    crop_id: Optional[int] = None,
+    variety: Optional[str] = None,
+) -> list[dict]:
+    """
+    按时间粒度查询产量序列
+
+    月、年粒度按整月对齐：start/end 所在月份整体计入
+    """
+    if bucket in ("day", "week"):
+        model = YieldDailyRollup
+        period = YieldDailyRollup.record_date if bucket == "day" else YieldDailyRollup.week_start
+        date_column = YieldDailyRollup.record_date
+    else:
+        model = YieldMonthlyRollup
+        period = YieldMonthlyRollup.month_start if bucket == "month" else YieldMonthlyRollup.year
+        date_column = YieldMonthlyRollup.month_start
+        start = month_start(start) if start else None
+
+    stmt = select(
+        period.label("period"),
+        model.unit,
+        func.sum(model.total_quantity),
+        func.sum(model.total_area),
+        func.sum(model.record_count),
+    )
+    if start:
+        stmt = stmt.where(date_column >= start)
+    if end:
+        stmt = stmt.where(date_column <= end)
+    if crop_id is not None:
+        stmt = stmt.where(model.crop_id == crop_id)
+    if variety:
+        stmt = stmt.join(Crop, Crop.id == model.crop_id).where(Crop.variety == variety)
+    stmt = stmt.group_by(period, model.unit).order_by(period, model.unit)
+
+    points = []
+    for period_value, unit, quantity, area, count in await execute(db, stmt):
+        points.append({
+            "period": date(period_value, 1, 1) if bucket == "year" else period_value,
+            "unit": unit or None,
+            "quantity": float(quantity or 0),
+            "area_harvested": float(area or 0),
+            "record_count": int(count or 0),
+        })
+    return points
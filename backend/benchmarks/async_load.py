@@ -0,0 +1,135 @@
+"""
+同步 / 异步请求栈并发压测
+分别以 ASYNC_DB_ENABLED=false（同步会话 + 线程池）和 true（AsyncSession + 异步驱动）
+启动单个 uvicorn 工作进程，用固定并发数循环请求一组只读接口，对比吞吐量与延迟分位数
+
+用法（使用 .env 中的 DATABASE_URL，库中应已有数据）:
+    python -m benchmarks.async_load
+    python -m benchmarks.async_load --concurrency 200 --duration 30
+    python -m benchmarks.async_load --modes async   # 只测一种
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+backend_dir = Path(__file__).resolve().parent.parent
+
+API = "/api/v1"
+
+# 压测的请求组合：列表、详情、搜索与统计（统计缓存关闭，每次都查库）
+PATHS = [
+    f"{API}/crops/?limit=20",
+    f"{API}/crops/?status=harvested&include=yield_summary",
+    f"{API}/animals/?limit=20",
+    f"{API}/flowers/?limit=20",
+    f"{API}/crops/1",
+    f"{API}/search/?q=品种1",
+    f"{API}/statistics/overview",
+    f"{API}/statistics/charts",
+]
+
+
+def start_server(mode: str, port: int, database_url: str) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "ASYNC_DB_ENABLED": "true" if mode == "async" else "false",
+        "AUTO_CREATE_TABLES": "false",
+        "STATS_CACHE_ENABLED": "false",
+    }
+    if database_url:
+        env["DATABASE_URL"] = database_url
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=backend_dir,
+        env=env,
+    )
+
+
+async def wait_ready(base_url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"服务在 {timeout} 秒内未就绪")
+
+
+async def run_load(base_url: str, concurrency: int, duration: float, warmup: float) -> dict:
+    """concurrency 个客户端循环请求 PATHS，预热阶段的结果不计入"""
+    latencies, errors = [], 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        started = time.monotonic()
+        measure_from = started + warmup
+        stop_at = measure_from + duration
+
+        async def worker(offset: int) -> None:
+            nonlocal errors
+            i = offset
+            while True:
+                path = PATHS[i % len(PATHS)]
+                i += 1
+                begin = time.monotonic()
+                if begin >= stop_at:
+                    return
+                try:
+                    ok = (await client.get(path)).status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if begin >= measure_from:
+                    latencies.append((time.monotonic() - begin) * 1000)
+                    errors += not ok
+
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "rps": len(ordered) / duration,
+        "p50": statistics.median(ordered) if ordered else 0.0,
+        "p99": ordered[max(int(len(ordered) * 0.99) - 1, 0)] if ordered else 0.0,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="同步 / 异步请求栈并发压测")
+    parser.add_argument("--database-url", default="", help="压测使用的数据库（默认取 .env 中的 DATABASE_URL）")
+    parser.add_argument("--concurrency", type=int, default=100, help="并发客户端数")
+    parser.add_argument("--duration", type=float, default=20, help="计时时长（秒）")
+    parser.add_argument("--warmup", type=float, default=3, help="预热时长（秒）")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--modes", nargs="+", choices=("sync", "async"), default=["sync", "async"])
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    results = {}
+    for mode in args.modes:
+        server = start_server(mode, args.port, args.database_url)
+        try:
+            asyncio.run(wait_ready(base_url))
+            print(f"[Load] {mode}: 并发 {args.concurrency}，计时 {args.duration:g} 秒...")
+            results[mode] = asyncio.run(run_load(base_url, args.concurrency, args.duration, args.warmup))
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"{'mode':<8}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for mode, r in results.items():
+        print(f"{mode:<8}{r['requests']:>10}{r['errors']:>8}{r['rps']:>10.1f}{r['p50']:>10.1f}{r['p99']:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
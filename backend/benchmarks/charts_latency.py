@@ -0,0 +1,69 @@
+"""
+图表统计延迟基准测试
+对比旧实现（4 条 GROUP BY 串行执行）与聚合服务（单条 UNION ALL）的耗时
+
+用法（使用 .env 中的 DATABASE_URL）:
+    python -m benchmarks.charts_latency [迭代次数]
+"""
+import statistics
+import sys
+import time
+from pathlib import Path
+
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal, run_to_completion
+from app.models import Crop, Animal, Flower
+from app.services import aggregates
+
+
+def legacy_chart_queries(db: Session) -> None:
+    """旧实现：每个数据集一次往返"""
+    db.query(Crop.variety, func.sum(Crop.total_yield)).group_by(Crop.variety).all()
+    db.query(Crop.status, func.count(Crop.id)).group_by(Crop.status).all()
+    db.query(Animal.product_type, func.sum(Animal.quantity)).group_by(Animal.product_type).all()
+    db.query(Flower.bloom_season, func.sum(Flower.quantity)).group_by(Flower.bloom_season).all()
+
+
+def single_statement(db: Session) -> None:
+    """新实现：一条 UNION ALL 语句"""
+    run_to_completion(aggregates.compute_datasets(db, [
+        "crop_yield_by_variety",
+        "crop_count_by_status",
+        "animal_quantity_by_product_type",
+        "flower_quantity_by_season",
+    ]))
+
+
+def measure(func, iterations: int) -> list[float]:
+    """返回每次调用的耗时（毫秒），首次调用作为预热不计入"""
+    db = SessionLocal()
+    try:
+        func(db)
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            func(db)
+            timings.append((time.perf_counter() - start) * 1000)
+            db.rollback()
+        return timings
+    finally:
+        db.close()
+
+
+def report(name: str, timings: list[float]) -> None:
+    ordered = sorted(timings)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(f"{name:<12} mean={statistics.mean(timings):8.3f}ms  "
+          f"p50={statistics.median(timings):8.3f}ms  p95={p95:8.3f}ms")
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(f"[Bench] /statistics/charts 查询耗时，迭代 {iterations} 次")
+    report("legacy x4", measure(legacy_chart_queries, iterations))
+    report("union all", measure(single_statement, iterations))
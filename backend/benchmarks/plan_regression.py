@@ -0,0 +1,479 @@
+"""
+查询计划回归检查
+在独立数据库中生成大规模合成数据，逐个请求 API 路由，捕获每条 SELECT 并执行
+EXPLAIN (ANALYZE, BUFFERS)，把计划形状、行数估计与缓冲区读取量和已提交的基线对比，
+并检查每个计划节点的估计行数与实际行数的偏差。
+热点查询丢失索引（变为顺序扫描）或指标超过阈值时以非零状态退出并输出差异。
+请求时开启查询检测器的严格模式，路由超出 query_budget 声明的查询预算同样使检查失败。
+
+注意：目标数据库中的表会被全部删除重建，切勿指向业务库。
+
+用法:
+    python -m benchmarks.plan_regression --database-url postgresql://.../dalu_plan_check
+    python -m benchmarks.plan_regression --database-url ... --update   # 重新生成基线
+    python -m benchmarks.plan_regression --database-url ... --async-db  # 经 AsyncSession 栈请求（与同步栈共用基线）
+    python -m benchmarks.plan_regression --database-url sqlite:////tmp/dalu_plan_check.db  # 快速检查
+
+基线按数据库方言分别保存在 benchmarks/plan_baselines/<dialect>.json。
+PostgreSQL 是生产数据库，pg_trgm / bigram 索引与 (字段, id) 行值比较只在其上生效，以它的基线为准；
+SQLite 只记录 EXPLAIN QUERY PLAN 的输出，作为 pytest 中 tests/test_plan_regression.py 的快速检查。
+"""
+import argparse
+import difflib
+import json
+import os
+import random
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+if __name__ == "__main__":
+    # 路由的同步/异步形式在导入应用时按配置确定，须在导入前设置；两种会话栈执行的查询应完全相同
+    os.environ["ASYNC_DB_ENABLED"] = "true" if "--async-db" in sys.argv else "false"
+    os.environ["QUERY_DETECTOR_ENABLED"] = "true"
+    os.environ["QUERY_BUDGET_STRICT"] = "true"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.api.v1.crops import CROP_SORT_COLUMNS
+from app.core.config import settings
+from app.db.base import Base
+from app.db.explain import Explain
+from app.db.session import async_database_url, get_async_db, get_async_read_db, get_db, get_read_db
+from app.main import app
+from app.models import (
+    Crop, Animal, Flower, YieldRecord,
+    CropStatus, CropUnit, ProductType, FlowerPurpose, BloomSeason,
+)
+from app.services import data_versions
+from app.services.cache import stats_cache
+from app.services.farm_events import rebuild_farm_events
+from app.services.farm_summary import rebuild_farm_summary
+from app.services.flower_tags import rebuild_flower_tags
+from app.services.yield_rollups import rebuild_yield_rollups
+
+BASELINE_DIR = Path(__file__).resolve().parent / "plan_baselines"
+API = "/api/v1"
+
+# 检查的请求：(名称, 路径, 是否先取首页游标再请求下一页)
+REQUESTS = [
+    *[(f"crops.list.sort_{column}", f"{API}/crops/?sort_by={column}", False) for column in CROP_SORT_COLUMNS],
+    ("crops.list.sort_asc", f"{API}/crops/?sort_by=plant_date&sort_order=asc", False),
+    ("crops.list.sort_unknown", f"{API}/crops/?sort_by=notes", False),
+    ("crops.list.status", f"{API}/crops/?status=growing", False),
+    ("crops.list.deep_offset", f"{API}/crops/?skip=5000", False),
+    ("crops.list.cursor", f"{API}/crops/?sort_by=plant_date", True),
+    ("crops.list.estimate", f"{API}/crops/?status=harvested&total=estimate", False),
+    ("crops.list.no_total", f"{API}/crops/?total=none", False),
+    ("crops.list.fields", f"{API}/crops/?fields=name,variety,status,plant_date", False),
+    ("crops.list.search", f"{API}/crops/?q=品种01", False),
+    ("crops.list.yield_summary", f"{API}/crops/?status=harvested&include=yield_summary", False),
+    ("crops.detail", f"{API}/crops/1", False),
+    ("crops.detail.yield_summary", f"{API}/crops/1?include=yield_summary", False),
+    ("crops.yield_records", f"{API}/crops/1/yield-records?start=2023-01-01", False),
+    ("crops.yield_records.cursor", f"{API}/crops/1/yield-records?limit=1", True),
+    ("animals.list", f"{API}/animals/", False),
+    ("animals.list.cursor", f"{API}/animals/", True),
+    ("animals.list.product_type", f"{API}/animals/?product_type=egg", False),
+    ("animals.list.variety", f"{API}/animals/?variety=品种001", False),
+    ("animals.list.date_range", f"{API}/animals/?acquire_date_from=2023-01-01&acquire_date_to=2023-03-31", False),
+    ("animals.list.combined", f"{API}/animals/?product_type=milk&min_quantity=100&has_yield=true&total=estimate", False),
+    ("animals.list.fields", f"{API}/animals/?fields=name,quantity", False),
+    ("animals.detail", f"{API}/animals/1", False),
+    ("flowers.list", f"{API}/flowers/", False),
+    ("flowers.list.color", f"{API}/flowers/?color=红色", False),
+    ("flowers.list.season", f"{API}/flowers/?season=spring", False),
+    ("flowers.list.cursor", f"{API}/flowers/", True),
+    ("flowers.list.fields", f"{API}/flowers/?fields=name,colors&season=summer", False),
+    ("flowers.detail", f"{API}/flowers/1", False),
+    ("search.all", f"{API}/search/?q=粮食123", False),
+    ("search.category", f"{API}/search/?q=品种1&category=flower", False),
+    ("statistics.overview", f"{API}/statistics/overview", False),
+    ("statistics.crops", f"{API}/statistics/crops", False),
+    ("statistics.animals", f"{API}/statistics/animals", False),
+    ("statistics.flowers", f"{API}/statistics/flowers", False),
+    ("statistics.charts", f"{API}/statistics/charts", False),
+    ("statistics.calendar.month", f"{API}/statistics/calendar?year=2024&month=5", False),
+    ("statistics.calendar.rollup", f"{API}/statistics/calendar?year=2024&month=5&rollup=true", False),
+    ("statistics.calendar.category", f"{API}/statistics/calendar?year=2024&category=crop&limit=200", False),
+    ("statistics.yield_timeseries.week", f"{API}/statistics/yield-timeseries?bucket=week&start=2024-01-01&end=2024-12-31", False),
+    ("statistics.yield_timeseries.year", f"{API}/statistics/yield-timeseries?bucket=year", False),
+    ("statistics.yield_timeseries.crop", f"{API}/statistics/yield-timeseries?bucket=day&crop_id=1", False),
+]
+
+VARIETIES = [f"品种{i:03d}" for i in range(200)]
+COLORS = ["红色", "白色", "黄色", "粉色", "紫色", "橙色", "蓝色"]
+SEASONS = [BloomSeason.SPRING, BloomSeason.SUMMER, BloomSeason.AUTUMN, BloomSeason.WINTER]
+
+
+# ============================================
+# 合成数据
+# ============================================
+
+def _random_day(rng: random.Random, start: date, days: int) -> date:
+    return start + timedelta(days=rng.randrange(days))
+
+
+def seed_synthetic(engine, rows: int, seed: int) -> None:
+    """删除并重建全部表，插入 rows 条粮食（动物、花卉各一半，产量记录为两倍）"""
+    rng = random.Random(seed)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    crops, records = [], []
+    for crop_id in range(1, rows + 1):
+        plant_date = _random_day(rng, date(2021, 1, 1), 4 * 365)
+        status = rng.choices(list(CropStatus), weights=[6, 3, 1])[0]
+        harvested = status == CropStatus.HARVESTED
+        crops.append({
+            "id": crop_id,
+            "name": f"粮食{crop_id}",
+            "variety": rng.choice(VARIETIES),
+            "area": round(rng.uniform(1, 50), 1),
+            "plant_date": plant_date,
+            "expected_harvest_date": plant_date + timedelta(days=rng.randrange(90, 200)),
+            "actual_harvest_date": plant_date + timedelta(days=rng.randrange(90, 220)) if harvested else None,
+            "total_yield": round(rng.uniform(100, 20000), 1) if harvested else 0.0,
+            "unit": CropUnit.KG,
+            "status": status,
+        })
+        for _ in range(2):
+            records.append({
+                "crop_id": crop_id,
+                "record_date": plant_date + timedelta(days=rng.randrange(60, 240)),
+                "quantity": round(rng.uniform(10, 5000), 1),
+                "unit": "kg",
+                "area_harvested": round(rng.uniform(1, 20), 1),
+            })
+
+    animals = [{
+        "id": animal_id,
+        "name": f"动物{animal_id}",
+        "variety": rng.choice(VARIETIES),
+        "quantity": rng.randrange(1, 500),
+        "acquire_date": _random_day(rng, date(2020, 1, 1), 5 * 365),
+        "product_type": rng.choice(list(ProductType)),
+        "estimated_daily_yield": round(rng.uniform(0, 100), 1),
+    } for animal_id in range(1, rows // 2 + 1)]
+
+    flowers = []
+    for flower_id in range(1, rows // 2 + 1):
+        multiple = rng.random() < 0.2
+        flowers.append({
+            "id": flower_id,
+            "name": f"花卉{flower_id}",
+            "variety": rng.choice(VARIETIES),
+            "quantity": rng.randrange(1, 2000),
+            "plant_date": _random_day(rng, date(2021, 1, 1), 4 * 365),
+            "bloom_season": BloomSeason.MULTIPLE if multiple else rng.choice(SEASONS + [BloomSeason.ALL_YEAR]),
+            "bloom_seasons": [s.value for s in rng.sample(SEASONS, 2)] if multiple else None,
+            "colors": rng.sample(COLORS, rng.randrange(1, 3)),
+            "purpose": rng.choice(list(FlowerPurpose)),
+        })
+
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.execute(insert(Crop), crops)
+        db.execute(insert(YieldRecord), records)
+        db.execute(insert(Animal), animals)
+        db.execute(insert(Flower), flowers)
+        rebuild_farm_summary(db)
+        rebuild_farm_events(db)
+        rebuild_yield_rollups(db)
+        rebuild_flower_tags(db)
+        data_versions.bump(db, "crop", "animal", "flower")
+        db.commit()
+
+    if engine.dialect.name == "postgresql":
+        # 序列与显式 ID 对齐，并刷新规划器统计信息
+        with engine.connect() as conn:
+            for table in ("crops", "animals", "flowers"):
+                conn.execute(text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"))
+            conn.commit()
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM ANALYZE"))
+    else:
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+
+
+# ============================================
+# 捕获与 EXPLAIN
+# ============================================
+
+def _ratio(current, baseline) -> float:
+    if not baseline:
+        return 1.0 if not current else float("inf")
+    return current / baseline
+
+
+def _misestimate(node: dict) -> float:
+    """节点估计行数与实际行数（均为每次循环的值）相差的倍数，估计偏高或偏低都记为 >= 1"""
+    estimated, actual = max(node["Plan Rows"], 1), max(node["Actual Rows"], 1)
+    return max(estimated, actual) / min(estimated, actual)
+
+
+def _summarize_pg_plan(plan: dict) -> dict:
+    """
+    把 PostgreSQL 的 JSON 计划树转换为可比较的形状与指标
+
+    rows_error 记录估计行数与实际行数偏差最大的节点。Limit 之下的节点提前停止，
+    实际行数小于估计是正常的；从未执行的节点没有实际行数，两者都不参与比较
+    """
+    shape, seq_scans = [], set()
+    rows_error = {"node": None, "plan_rows": None, "actual_rows": None, "ratio": 1.0}
+
+    def walk(node: dict, depth: int, limited: bool) -> None:
+        label = node["Node Type"]
+        if node.get("Index Name"):
+            label += f" using {node['Index Name']}"
+        if node.get("Relation Name"):
+            label += f" on {node['Relation Name']}"
+            if node["Node Type"] == "Seq Scan":
+                seq_scans.add(node["Relation Name"])
+        shape.append("  " * depth + label)
+
+        if not limited and node.get("Actual Loops"):
+            ratio = _misestimate(node)
+            if ratio > rows_error["ratio"]:
+                rows_error.update(node=label, plan_rows=int(node["Plan Rows"]),
+                                  actual_rows=int(node["Actual Rows"]), ratio=round(ratio, 2))
+        limited = limited or node["Node Type"] == "Limit"
+        for child in node.get("Plans", []):
+            walk(child, depth + 1, limited)
+
+    root = plan["Plan"]
+    walk(root, 0, False)
+    return {
+        "shape": shape,
+        "seq_scans": sorted(seq_scans),
+        "plan_rows": int(root["Plan Rows"]),
+        "actual_rows": int(root["Actual Rows"]),
+        "rows_error": rows_error,
+        "buffers": int(root.get("Shared Hit Blocks", 0) + root.get("Shared Read Blocks", 0)),
+        "time_ms": round(plan.get("Execution Time", 0.0), 3),
+    }
+
+
+def _summarize_sqlite_plan(rows) -> dict:
+    """EXPLAIN QUERY PLAN 的输出：SCAN <表>（不带 USING）即全表扫描"""
+    shape, seq_scans = [], set()
+    for _, _, _, detail in rows:
+        shape.append(detail)
+        words = detail.split()
+        if len(words) >= 2 and words[0] == "SCAN" and "USING" not in words:
+            seq_scans.add(words[1])
+    return {"shape": shape, "seq_scans": sorted(seq_scans)}
+
+
+def explain(db, statement, parameters) -> dict:
+    dialect = db.get_bind().dialect
+    if dialect.name == "postgresql":
+        plan = db.execute(Explain(statement, ("ANALYZE", "BUFFERS")), parameters).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        summary = _summarize_pg_plan(plan[0])
+    else:
+        summary = _summarize_sqlite_plan(db.execute(Explain(statement), parameters).all())
+    summary["sql"] = " ".join(str(statement.compile(dialect=dialect)).split())
+    return summary
+
+
+class _CaptureSession(Session):
+    """请求使用的会话类（同步会话与 AsyncSession 内部的同步会话），只在其上捕获语句"""
+
+
+def _session_overrides(engine) -> dict:
+    """把路由的会话依赖替换为指向检查库的会话；异步模式下同时替换异步依赖"""
+    Session = sessionmaker(class_=_CaptureSession, autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    overrides = {get_db: override_get_db, get_read_db: override_get_db}
+    if settings.ASYNC_DB_ENABLED:
+        # NullPool：连接随会话关闭，不在 TestClient 的事件循环结束后遗留 aiosqlite 线程
+        async_engine = create_async_engine(async_database_url(engine.url.render_as_string(hide_password=False)), poolclass=NullPool)
+        AsyncSession = async_sessionmaker(
+            async_engine, sync_session_class=_CaptureSession, autoflush=False, expire_on_commit=False,
+        )
+
+        async def override_get_async_db():
+            async with AsyncSession() as db:
+                yield db
+
+        overrides.update({get_async_db: override_get_async_db, get_async_read_db: override_get_async_db})
+    return overrides
+
+
+def capture_plans(engine) -> dict[str, list[dict]]:
+    """逐个请求路由（超出查询预算时抛出 QueryBudgetExceeded），返回 {请求名: [每条 SELECT 的计划摘要]}"""
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    captured: list = []
+    capturing = False
+
+    @event.listens_for(_CaptureSession, "do_orm_execute")
+    def _capture(orm_execute_state):
+        if capturing and orm_execute_state.is_select:
+            captured.append((orm_execute_state.statement, orm_execute_state.parameters))
+
+    overrides = _session_overrides(engine)
+    app.dependency_overrides.update(overrides)
+    client = TestClient(app)
+    results = {}
+    try:
+        for name, path, follow_cursor in REQUESTS:
+            if follow_cursor:
+                cursor = client.get(path).json()["next_cursor"]
+                path += ("&" if "?" in path else "?") + f"cursor={cursor}"
+
+            stats_cache.clear()
+            captured.clear()
+            capturing = True
+            response = client.get(path)
+            capturing = False
+            if response.status_code != 200:
+                raise RuntimeError(f"{name}: {path} 返回 {response.status_code} {response.text}")
+
+            with Session() as db:
+                results[name] = [explain(db, statement, parameters) for statement, parameters in captured]
+                db.rollback()
+    finally:
+        event.remove(_CaptureSession, "do_orm_execute", _capture)
+        for dependency in overrides:
+            app.dependency_overrides.pop(dependency, None)
+    return results
+
+
+# ============================================
+# 基线对比
+# ============================================
+
+def baseline_path(dialect: str) -> Path:
+    return BASELINE_DIR / f"{dialect}.json"
+
+
+def load_baseline(dialect: str = "sqlite") -> dict:
+    return json.loads(baseline_path(dialect).read_text(encoding="utf-8"))
+
+
+def compare(
+    baseline: dict,
+    current: dict,
+    rows_threshold: float = 2.0,
+    buffers_threshold: float = 1.5,
+    misestimate_threshold: float = 10.0,
+) -> list[str]:
+    """
+    返回可读的失败描述列表，为空表示没有回归
+
+    计划形状与顺序扫描两种方言都比较；行数估计、估计与实际行数的偏差、缓冲区读取量只有 PostgreSQL 基线记录。
+    估计与实际行数的偏差超过 misestimate_threshold 倍且超过基线偏差的 rows_threshold 倍时失败
+    """
+    failures = []
+    for name, queries in current.items():
+        expected = baseline.get(name)
+        if expected is None:
+            failures.append(f"[{name}] 没有基线（使用 --update 生成）")
+            continue
+        if len(expected) != len(queries):
+            failures.append(f"[{name}] 查询条数由 {len(expected)} 变为 {len(queries)}")
+            continue
+
+        for index, (old, new) in enumerate(zip(expected, queries), start=1):
+            label = f"[{name} #{index}]"
+            lost_index = sorted(set(new["seq_scans"]) - set(old["seq_scans"]))
+            if lost_index:
+                failures.append(f"{label} 失去索引，变为顺序扫描: {', '.join(lost_index)}\n  SQL: {new['sql']}")
+            if new["shape"] != old["shape"]:
+                diff = "\n".join(difflib.unified_diff(
+                    old["shape"], new["shape"], fromfile="baseline", tofile="current", lineterm=""
+                ))
+                failures.append(f"{label} 计划形状变化\n{diff}")
+            if old.get("plan_rows") is not None and new.get("plan_rows") is not None:
+                ratio = _ratio(new["plan_rows"], old["plan_rows"])
+                if ratio > rows_threshold or ratio < 1 / rows_threshold:
+                    failures.append(f"{label} 行数估计 {old['plan_rows']} -> {new['plan_rows']} (x{ratio:.2f})")
+            # 基线中已有的偏差（如 pg_trgm 的选择度估计）视为已知，只有新出现或明显恶化的偏差才失败
+            error = new.get("rows_error")
+            known = old["rows_error"]["ratio"] * rows_threshold if old.get("rows_error") else 0.0
+            if error and error["ratio"] > max(misestimate_threshold, known):
+                failures.append(
+                    f"{label} 估计行数与实际行数相差 x{error['ratio']:.2f}: {error['node']} "
+                    f"估计 {error['plan_rows']} 行，实际 {error['actual_rows']} 行\n  SQL: {new['sql']}"
+                )
+            if old.get("buffers") is not None and new.get("buffers") is not None:
+                ratio = _ratio(new["buffers"], old["buffers"])
+                if ratio > buffers_threshold:
+                    failures.append(f"{label} 缓冲区读取 {old['buffers']} -> {new['buffers']} 块 (x{ratio:.2f})")
+
+    for name in baseline.keys() - current.keys():
+        failures.append(f"[{name}] 基线中的请求已不再检查")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="查询计划回归检查")
+    parser.add_argument("--database-url", default=os.environ.get("PLAN_DATABASE_URL"),
+                        help="专用检查库（表会被删除重建），默认读取 PLAN_DATABASE_URL")
+    parser.add_argument("--rows", type=int, default=50000, help="合成粮食条数")
+    parser.add_argument("--seed", type=int, default=20240101, help="随机种子")
+    parser.add_argument("--rows-threshold", type=float, default=2.0, help="行数估计相对基线允许的偏差倍数")
+    parser.add_argument("--misestimate-threshold", type=float, default=10.0,
+                        help="计划节点估计行数与实际行数允许的偏差倍数（仅 PostgreSQL）")
+    parser.add_argument("--buffers-threshold", type=float, default=1.5, help="缓冲区读取允许的增长倍数")
+    parser.add_argument("--update", action="store_true", help="用本次结果覆盖基线")
+    parser.add_argument("--async-db", action="store_true", help="路由经 AsyncSession 执行（默认同步会话栈）")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("需要 --database-url 或 PLAN_DATABASE_URL（不会使用 .env 中的业务库）")
+
+    engine = create_engine(args.database_url)
+    path = baseline_path(engine.dialect.name)
+
+    print(f"[Plan] 生成合成数据（{args.rows} 条粮食）...")
+    seed_synthetic(engine, args.rows, args.seed)
+    print(f"[Plan] 捕获 {len(REQUESTS)} 个请求的查询计划（{'异步' if settings.ASYNC_DB_ENABLED else '同步'}会话栈）...")
+    current = capture_plans(engine)
+    query_count = sum(len(queries) for queries in current.values())
+
+    if args.update:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        payload = {"rows": args.rows, "seed": args.seed, "requests": current}
+        path.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"[Plan] 已写入基线 {path.name}（{query_count} 条查询）")
+        return 0
+
+    if not path.exists():
+        print(f"[Plan] 缺少基线 {path}，请先使用 --update 生成")
+        return 1
+    baseline = load_baseline(engine.dialect.name)
+    if (baseline["rows"], baseline["seed"]) != (args.rows, args.seed):
+        print(f"[Plan] 基线使用 --rows {baseline['rows']} --seed {baseline['seed']} 生成，请使用相同参数")
+        return 1
+
+    failures = compare(
+        baseline["requests"], current, args.rows_threshold, args.buffers_threshold, args.misestimate_threshold,
+    )
+    if failures:
+        print(f"[Plan] 发现 {len(failures)} 处计划回归：\n")
+        print("\n\n".join(failures))
+        return 1
+    print(f"[Plan] {query_count} 条查询的计划与基线一致")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""
+响应序列化 CPU 基准测试
+分别以 FAST_JSON_ENABLED=false（FastAPI 默认：二次校验 + 标准库 json）和 true（预编译 TypeAdapter + orjson）
+启动子进程，在进程内直接调用 ASGI 应用（不经过网络与 HTTP 客户端），
+统计每个请求消耗的 CPU 时间（process_time，含线程池）以及 Server-Timing 中的 serialize 耗时
+
+用法（使用 .env 中的 DATABASE_URL，库中应已有至少 100 条粮食/动物/花卉）:
+    python -m benchmarks.serialization_cpu
+    python -m benchmarks.serialization_cpu --requests 500
+    python -m benchmarks.serialization_cpu --database-url sqlite:////tmp/bench.db --seed-rows 5000  # 先生成合成数据（会删除重建全部表）
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+API = "/api/v1"
+
+# 整页（100 条）的列表与统计接口；统计缓存保持开启，命中后请求的开销主要在序列化
+PATHS = [
+    f"{API}/crops/?limit=100",
+    f"{API}/crops/?limit=100&include=yield_summary",
+    f"{API}/animals/?limit=100",
+    f"{API}/flowers/?limit=100",
+    f"{API}/crops/1",
+    f"{API}/search/?q=品种&limit=100",
+    f"{API}/statistics/overview",
+    f"{API}/statistics/charts",
+    f"{API}/statistics/calendar?year=2023",
+]
+
+_SERIALIZE = re.compile(rb"serialize;dur=([\d.]+)")
+
+
+async def _request(app, path: str) -> tuple[int, float]:
+    """直接调用 ASGI 应用，返回 (状态码, Server-Timing 中的 serialize 毫秒)"""
+    url = urlsplit(path)
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    result = {"status": 0, "serialize": 0.0}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+            for name, value in message["headers"]:
+                if name == b"server-timing":
+                    match = _SERIALIZE.search(value)
+                    result["serialize"] = float(match.group(1)) if match else 0.0
+
+    await app(scope, receive, send)
+    return result["status"], result["serialize"]
+
+
+async def _measure(requests: int, warmup: int) -> dict:
+    from app.db.session import async_engine
+    from app.main import app
+
+    results = {}
+    for path in PATHS:
+        for _ in range(warmup):
+            status, _ = await _request(app, path)
+            if status != 200:
+                raise RuntimeError(f"{path} 返回 {status}")
+        serialize_total = 0.0
+        cpu_started = time.process_time()
+        for _ in range(requests):
+            _, serialize = await _request(app, path)
+            serialize_total += serialize
+        cpu = time.process_time() - cpu_started
+        results[path] = {"cpu_ms": cpu * 1000 / requests, "serialize_ms": serialize_total / requests}
+
+    # 关闭异步连接（aiosqlite 的连接线程不关闭时进程无法退出）
+    if async_engine is not None:
+        await async_engine.dispose()
+    return results
+
+
+def run_worker(mode: str, args) -> dict:
+    env = {
+        **os.environ,
+        "FAST_JSON_ENABLED": "true" if mode == "fast" else "false",
+        "ASYNC_DB_ENABLED": "true" if args.async_db else "false",
+        "AUTO_CREATE_TABLES": "false",
+        "SERVER_TIMING_ENABLED": "true",
+        "QUERY_DETECTOR_ENABLED": "false",
+    }
+    if args.database_url:
+        env["DATABASE_URL"] = args.database_url
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.serialization_cpu", "--worker",
+         "--requests", str(args.requests), "--warmup", str(args.warmup)],
+        cwd=backend_dir, env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="响应序列化 CPU 基准测试")
+    parser.add_argument("--database-url", default="", help="使用的数据库（默认取 .env 中的 DATABASE_URL）")
+    parser.add_argument("--seed-rows", type=int, default=0, help="先生成合成数据（删除重建全部表，切勿指向业务库）")
+    parser.add_argument("--requests", type=int, default=300, help="每个接口计时的请求数")
+    parser.add_argument("--warmup", type=int, default=20, help="每个接口的预热请求数")
+    parser.add_argument("--sync", dest="async_db", action="store_false", help="使用同步会话栈（默认异步）")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(asyncio.run(_measure(args.requests, args.warmup))))
+        return 0
+
+    if args.seed_rows:
+        if not args.database_url:
+            parser.error("--seed-rows 需要同时指定 --database-url（不会改动 .env 中的业务库）")
+        os.environ["DATABASE_URL"] = args.database_url  # 导入应用模块时创建的引擎也指向该库
+        from sqlalchemy import create_engine
+        from benchmarks.plan_regression import seed_synthetic
+
+        print(f"[Serialize] 生成合成数据（{args.seed_rows} 条粮食）...")
+        seed_synthetic(create_engine(args.database_url), args.seed_rows, seed=20240101)
+
+    results = {}
+    for mode in ("default", "fast"):
+        print(f"[Serialize] {mode}: 每个接口 {args.requests} 次请求...")
+        results[mode] = run_worker(mode, args)
+
+    print(f"{'path':<48}{'CPU ms/req':>22}{'serialize ms':>22}{'CPU':>8}")
+    print(f"{'':<48}{'default':>11}{'fast':>11}{'default':>11}{'fast':>11}")
+    for path in PATHS:
+        before, after = results["default"][path], results["fast"][path]
+        saved = 1 - after["cpu_ms"] / before["cpu_ms"] if before["cpu_ms"] else 0.0
+        print(
+            f"{path.removeprefix(API):<48}"
+            f"{before['cpu_ms']:>11.3f}{after['cpu_ms']:>11.3f}"
+            f"{before['serialize_ms']:>11.3f}{after['serialize_ms']:>11.3f}"
+            f"{saved:>8.0%}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
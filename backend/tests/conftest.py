@@ -0,0 +1,70 @@
+"""
+测试公共夹具
+应用在导入时按配置创建引擎与路由，因此先把 DATABASE_URL 指向临时 SQLite 库再导入；
+会话栈默认同步，可用 ASYNC_DB_ENABLED=true pytest 在异步栈上运行同一组测试
+"""
+import os
+import tempfile
+
+_DB_DIR = tempfile.mkdtemp(prefix="dalu_test_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_DIR}/test.db"
+os.environ["AUTO_CREATE_TABLES"] = "true"
+os.environ.setdefault("ASYNC_DB_ENABLED", "false")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.main import app
+
+API = settings.API_V1_PREFIX
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def strict_query_budget(monkeypatch):
+    """开启查询检测器的严格模式：路由超出 query_budget 时请求抛出 QueryBudgetExceeded"""
+    monkeypatch.setattr(settings, "QUERY_DETECTOR_ENABLED", True)
+    monkeypatch.setattr(settings, "QUERY_BUDGET_STRICT", True)
+
+
+@pytest.fixture(scope="session")
+def farm_data(client):
+    """经 API 写入几条粮食、动物、花卉与收获记录（整个测试会话共用）"""
+    crop_ids = []
+    for index in range(3):
+        response = client.post(f"{API}/crops/", json={
+            "name": f"水稻{index}", "variety": f"品种{index}", "area": 10 + index, "plant_date": "2024-03-01",
+        })
+        assert response.status_code == 201, response.text
+        crop_ids.append(response.json()["id"])
+        response = client.patch(f"{API}/crops/{crop_ids[-1]}/harvest", json={
+            "actual_harvest_date": "2024-07-01", "yield_quantity": 100, "partial": True,
+        })
+        assert response.status_code == 200, response.text
+
+    animal = client.post(f"{API}/animals/", json={
+        "name": "奶牛", "variety": "荷斯坦", "quantity": 5, "acquire_date": "2023-05-01", "product_type": "milk",
+    })
+    assert animal.status_code == 201, animal.text
+    flower = client.post(f"{API}/flowers/", json={
+        "name": "月季", "variety": "红双喜", "quantity": 20, "plant_date": "2024-02-01",
+        "bloom_season": "spring", "colors": ["红色"], "purpose": "ornamental",
+    })
+    assert flower.status_code == 201, flower.text
+    return {"crops": crop_ids, "animal": animal.json()["id"], "flower": flower.json()["id"]}
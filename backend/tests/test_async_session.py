@@ -0,0 +1,47 @@
+"""
+异步会话适配测试
+只读路由按 async def 编写：同步栈上包装为普通函数在线程池中一次跑完，异步栈上直接 await 异步会话
+"""
+import asyncio
+import inspect
+
+import pytest
+from fastapi import Depends
+from sqlalchemy import select
+
+from app.api import async_session
+from app.api.v1 import crops
+from app.core.config import settings
+from app.db.session import execute, get_read_db, run_to_completion
+from app.models import Crop
+
+
+def test_run_to_completion_on_sync_session(db, farm_data):
+    result = run_to_completion(execute(db, select(Crop.id).order_by(Crop.id).limit(1)))
+    assert result.scalar() is not None
+
+
+def test_run_to_completion_rejects_suspension():
+    async def suspends():
+        await asyncio.sleep(0)
+
+    with pytest.raises(RuntimeError):
+        run_to_completion(suspends())
+
+
+@pytest.mark.parametrize("enabled", [False, True])
+def test_read_routes_keep_one_body_for_both_stacks(monkeypatch, enabled):
+    monkeypatch.setattr(settings, "ASYNC_DB_ENABLED", enabled)
+
+    async def route(limit: int = 20, db=Depends(get_read_db)):
+        return limit
+
+    wrapped = async_session.async_db(route)
+    assert inspect.iscoroutinefunction(wrapped) is enabled
+    dependency = inspect.signature(wrapped).parameters["db"].default.dependency
+    assert dependency is (async_session.get_async_read_db if enabled else get_read_db)
+
+
+def test_list_and_detail_routes_are_not_run_sync():
+    for route in (crops.get_crops, crops.get_crop, crops.get_crop_yield_records):
+        assert inspect.iscoroutinefunction(inspect.unwrap(route))
@@ -0,0 +1,26 @@
+"""
+批量接口测试
+操作条数上限由请求 Schema 校验（max_length=BULK_MAX_OPERATIONS），超出时整批拒绝、不写库
+"""
+import pytest
+
+from app.core.config import settings
+from tests.conftest import API
+
+
+@pytest.mark.parametrize("category", ["crops", "animals", "flowers"])
+def test_bulk_rejects_too_many_operations(client, category):
+    operations = [{"op": "delete", "id": index} for index in range(1, settings.BULK_MAX_OPERATIONS + 2)]
+    response = client.post(f"{API}/{category}/bulk", json={"operations": operations})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "operations"]
+
+    assert client.post(f"{API}/{category}/bulk", json={"operations": []}).status_code == 422
+
+
+def test_harvest_batch_rejects_too_many_harvests(client, farm_data):
+    crop_id = farm_data["crops"][0]
+    item = {"crop_id": crop_id, "actual_harvest_date": "2024-07-02", "yield_quantity": 1, "partial": True}
+    response = client.post(f"{API}/crops/harvests", json={"harvests": [item] * (settings.BULK_MAX_OPERATIONS + 1)})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "harvests"]
@@ -0,0 +1,35 @@
+"""
+粮食列表测试
+每个白名单排序字段都按该字段排序，游标翻页与 skip/limit 分页结果一致
+"""
+import pytest
+
+from app.api.v1.crops import CROP_SORT_COLUMNS
+from tests.conftest import API
+
+
+@pytest.mark.parametrize("column", ["name", "area", "plant_date"])
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_sort_by_whitelisted_column(client, farm_data, column, order):
+    response = client.get(f"{API}/crops/", params={"sort_by": column, "sort_order": order, "limit": 100})
+    assert response.status_code == 200
+    items = response.json()["items"]
+    keys = [(item[column], item["id"]) for item in items]
+    assert keys == sorted(keys, reverse=order == "desc")
+
+
+@pytest.mark.parametrize("column", CROP_SORT_COLUMNS)
+def test_cursor_pages_match_offset_pages(client, farm_data, column):
+    expected = [item["id"] for item in client.get(
+        f"{API}/crops/", params={"sort_by": column, "limit": 100},
+    ).json()["items"]]
+
+    seen, cursor = [], None
+    while True:
+        params = {"sort_by": column, "limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get(f"{API}/crops/", params=params).json()
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert seen == expected
@@ -0,0 +1,77 @@
+"""
+批量导入测试
+COPY 数据格式（NULL 与空字符串）与导入后按新记录增量维护派生数据
+"""
+import json
+from datetime import date, datetime
+
+from sqlalchemy import event, func, select
+
+from app.db.session import engine
+from app.models import Animal, FarmEvent, FarmSummary, Flower, FlowerColor
+from app.services import importer
+from app.services.farm_summary import compute_summary
+
+
+def test_copy_rows_distinguishes_null_from_empty_string():
+    rows = [
+        ("水稻", "", None, 1.5, ["红色", '双"引号'], date(2024, 3, 1), datetime(2024, 3, 1, 8, 30)),
+        (r"\N", "a,b", None, 0, [], None, None),
+    ]
+    assert importer.copy_rows(rows) == (
+        '"水稻","",\\N,1.5,"[""红色"", ""双\\""引号""]",2024-03-01,"2024-03-01 08:30:00"\n'
+        '"\\N","a,b",\\N,0,"[]",\\N,\\N\n'
+    )
+
+
+def _write_ndjson(path, rows):
+    path.write_text("".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows), encoding="utf-8")
+    return path
+
+
+def _summary(db) -> dict:
+    row = db.get(FarmSummary, 1)
+    return {key: getattr(row, key) for key in compute_summary(db)}
+
+
+def test_import_maintains_derived_rows_incrementally(db, farm_data, tmp_path):
+    flowers = _write_ndjson(tmp_path / "flowers.ndjson", [
+        {"name": "导入花卉", "variety": "新品种A", "quantity": 3, "plant_date": "2024-03-01",
+         "colors": ["红色", "白色"], "notes": ""},
+        {"name": "导入花卉2", "variety": "红双喜", "quantity": 4, "plant_date": "2024-03-02"},
+        {"name": "", "variety": "x", "quantity": 1, "plant_date": "2024-03-03"},
+    ])
+    report = importer.import_file(db, flowers, "flowers", workers=1, chunk_size=1)
+    db.commit()
+    assert (report.read, report.loaded, report.rejected) == (3, 2, 1)
+    report.reject_path.unlink()
+
+    imported = db.scalars(select(Flower.id).where(Flower.name.like("导入花卉%"))).all()
+    assert len(imported) == 2
+    assert db.scalar(select(func.count()).select_from(FarmEvent).where(
+        FarmEvent.category == "flower", FarmEvent.entity_id.in_(imported))) == 2
+    assert db.scalar(select(func.count()).select_from(FlowerColor).where(FlowerColor.flower_id.in_(imported))) == 2
+    assert db.scalar(select(Flower.notes).where(Flower.variety == "新品种A")) == ""
+    assert _summary(db) == compute_summary(db)
+
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    animals = _write_ndjson(tmp_path / "animals.ndjson", [
+        {"name": "导入动物", "variety": "荷斯坦", "quantity": 2, "acquire_date": "2024-01-01"},
+        {"name": "导入动物2", "variety": "新品种B", "quantity": 7, "acquire_date": "2024-01-02",
+         "estimated_daily_yield": 1.5},
+    ])
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        report = importer.import_file(db, animals, "animals", workers=1)
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    db.commit()
+
+    assert report.loaded == 2
+    assert db.scalar(select(func.count()).select_from(Animal).where(Animal.name.like("导入动物%"))) == 2
+    assert not [sql for sql in statements if "farm_events" in sql or "flower_" in sql or "crops" in sql]
+    assert _summary(db) == compute_summary(db)
@@ -0,0 +1,40 @@
+"""
+内部监控接口测试
+默认不注册 /metrics、不返回 Server-Timing；开启后可用 METRICS_TOKEN 限制访问
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import metrics
+from app.core.config import settings
+from tests.conftest import API
+
+
+def test_metrics_disabled_by_default(client):
+    assert client.get("/metrics").status_code == 404
+    assert client.get("/metrics/db-pool").status_code == 404
+    assert "server-timing" not in client.get(f"{API}/crops/").headers
+
+
+@pytest.fixture
+def metrics_client():
+    test_app = FastAPI()
+    test_app.include_router(metrics.router, prefix="/metrics")
+    return TestClient(test_app)
+
+
+def test_metrics_token_required(metrics_client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "s3cret")
+
+    assert metrics_client.get("/metrics").status_code == 401
+    assert metrics_client.get("/metrics/db-pool", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+    response = metrics_client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+    assert response.status_code == 200
+    assert "http_requests_total" in response.text
+    assert metrics_client.get("/metrics/db-pool", headers={"Authorization": "Bearer s3cret"}).status_code == 200
+
+
+def test_metrics_open_without_token(metrics_client):
+    assert metrics_client.get("/metrics").status_code == 200
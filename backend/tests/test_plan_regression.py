@@ -0,0 +1,90 @@
+"""
+查询计划回归测试
+以基线相同的参数生成合成数据，在严格的查询预算下请求 benchmarks/plan_regression.py 中的全部路由，
+计划形状与 benchmarks/plan_baselines/sqlite.json 不一致时失败
+（计划变化是预期的时，用 python -m benchmarks.plan_regression --update 重新生成基线）。
+PLAN_DATABASE_URL 指向 PostgreSQL 检查库时，同时按 postgresql.json 检查计划、行数估计与缓冲区读取量
+"""
+import copy
+import os
+
+import pytest
+from sqlalchemy import create_engine
+
+from benchmarks import plan_regression
+
+PLAN_DATABASE_URL = os.environ.get("PLAN_DATABASE_URL", "")
+
+
+def _seeded_engine(url: str, dialect: str):
+    baseline = plan_regression.load_baseline(dialect)
+    engine = create_engine(url)
+    plan_regression.seed_synthetic(engine, baseline["rows"], baseline["seed"])
+    return engine
+
+
+@pytest.fixture(scope="module")
+def plan_engine(tmp_path_factory):
+    engine = _seeded_engine(f"sqlite:///{tmp_path_factory.mktemp('plan')}/plan.db", "sqlite")
+    yield engine
+    engine.dispose()
+
+
+def test_query_plans_match_baseline(plan_engine, strict_query_budget):
+    current = plan_regression.capture_plans(plan_engine)
+    failures = plan_regression.compare(plan_regression.load_baseline()["requests"], current)
+    assert not failures, "\n\n".join(failures)
+
+
+@pytest.mark.skipif(not PLAN_DATABASE_URL.startswith("postgresql"), reason="需要 PostgreSQL 检查库（PLAN_DATABASE_URL）")
+def test_postgresql_plans_match_baseline(strict_query_budget):
+    engine = _seeded_engine(PLAN_DATABASE_URL, "postgresql")
+    try:
+        current = plan_regression.capture_plans(engine)
+    finally:
+        engine.dispose()
+    failures = plan_regression.compare(plan_regression.load_baseline("postgresql")["requests"], current)
+    assert not failures, "\n\n".join(failures)
+
+
+def _pg_plan(node_type: str, plan_rows: int, actual_rows: int, **extra) -> dict:
+    return {
+        "Plan": {
+            "Node Type": "Aggregate", "Plan Rows": plan_rows, "Actual Rows": actual_rows, "Actual Loops": 1,
+            "Shared Hit Blocks": 4, "Shared Read Blocks": 0,
+            "Plans": [{
+                "Node Type": "Limit", "Plan Rows": 21, "Actual Rows": 21, "Actual Loops": 1,
+                "Plans": [{"Node Type": node_type, "Relation Name": "crops", "Plan Rows": 50000,
+                           "Actual Rows": 30, "Actual Loops": 1, **extra}],
+            }],
+        },
+        "Execution Time": 0.05,
+    }
+
+
+def test_pg_summary_records_misestimate_outside_limit():
+    summary = plan_regression._summarize_pg_plan(_pg_plan("Index Scan", 200, 2, **{"Index Name": "ix_crops_name_id"}))
+    assert summary["shape"] == ["Aggregate", "  Limit", "    Index Scan using ix_crops_name_id on crops"]
+    assert summary["seq_scans"] == []
+    assert (summary["plan_rows"], summary["actual_rows"], summary["buffers"]) == (200, 2, 4)
+    # Limit 之下的节点提前停止，不计入偏差
+    assert summary["rows_error"] == {"node": "Aggregate", "plan_rows": 200, "actual_rows": 2, "ratio": 100.0}
+
+
+def test_pg_compare_thresholds():
+    old = plan_regression._summarize_pg_plan(_pg_plan("Index Scan", 20, 20, **{"Index Name": "ix_crops_name_id"}))
+    old["sql"] = "SELECT ..."
+    baseline = {"crops.list": [old]}
+
+    assert plan_regression.compare(baseline, copy.deepcopy(baseline)) == []
+
+    new = plan_regression._summarize_pg_plan(_pg_plan("Seq Scan", 400, 2))
+    new["sql"] = "SELECT ..."
+    failures = plan_regression.compare(baseline, {"crops.list": [new]})
+    assert any("顺序扫描: crops" in failure for failure in failures)
+    assert any("估计行数与实际行数相差 x200.00" in failure for failure in failures)
+
+    # 基线中已有的偏差不重复报告，除非明显恶化
+    known = copy.deepcopy(new)
+    known["rows_error"]["ratio"] = 150.0
+    assert not any("估计行数" in failure for failure in plan_regression.compare({"crops.list": [known]}, {"crops.list": [new]}))
@@ -0,0 +1,100 @@
+"""
+查询预算测试
+在严格模式下请求各只读路由：超出 query_budget 声明的查询次数时请求抛出 QueryBudgetExceeded，测试随之失败
+"""
+import logging
+
+import pytest
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.api.request_metrics import RequestMetricsMiddleware, TimedRoute
+from app.db.query_detector import QueryBudgetExceeded, query_budget
+from app.db.session import get_read_db
+from app.models import Crop, FarmSummary, YieldRecord
+from app.services.cache import stats_cache
+from app.services.farm_summary import compute_summary, rebuild_farm_summary
+from tests.conftest import API
+
+READ_PATHS = [
+    f"{API}/crops/",
+    f"{API}/crops/?sort_by=plant_date&include=yield_summary",
+    f"{API}/crops/?fields=name,variety&total=estimate",
+    f"{API}/crops/{{crop}}",
+    f"{API}/crops/{{crop}}?include=yield_summary",
+    f"{API}/crops/{{crop}}/yield-records",
+    f"{API}/animals/",
+    f"{API}/animals/{{animal}}",
+    f"{API}/flowers/",
+    f"{API}/flowers/?color=红色",
+    f"{API}/flowers/{{flower}}",
+    f"{API}/search/?q=水稻",
+    f"{API}/statistics/overview",
+    f"{API}/statistics/crops",
+    f"{API}/statistics/animals",
+    f"{API}/statistics/flowers",
+    f"{API}/statistics/charts",
+    f"{API}/statistics/calendar?year=2024",
+    f"{API}/statistics/yield-timeseries?bucket=month",
+]
+
+
+@pytest.mark.parametrize("path", READ_PATHS)
+def test_read_routes_within_budget(client, farm_data, strict_query_budget, path):
+    stats_cache.clear()
+    path = path.format(crop=farm_data["crops"][0], animal=farm_data["animal"], flower=farm_data["flower"])
+    response = client.get(path)
+    assert response.status_code == 200, response.text
+
+
+def test_overview_without_summary_row_within_budget(client, farm_data, strict_query_budget, db):
+    """汇总行尚未建立时总览现算汇总（不写库），仍在预算内"""
+    db.execute(delete(FarmSummary))
+    db.commit()
+    stats_cache.clear()
+    try:
+        response = client.get(f"{API}/statistics/overview")
+        assert response.status_code == 200, response.text
+        assert response.json()["total_crops"] == compute_summary(db)["total_crops"]
+        assert db.scalar(select(FarmSummary.id)) is None
+    finally:
+        rebuild_farm_summary(db)
+        db.commit()
+
+
+def _n_plus_one_client() -> TestClient:
+    """逐个粮食查询产量记录（典型的 N+1）的测试路由，预算按一次批量查询声明"""
+    router = APIRouter(route_class=TimedRoute)
+
+    @router.get("/yields")
+    @query_budget(2)
+    def crop_yields(db: Session = Depends(get_read_db)):
+        return {
+            crop.id: len(db.scalars(select(YieldRecord).where(YieldRecord.crop_id == crop.id)).all())
+            for crop in db.scalars(select(Crop)).all()
+        }
+
+    test_app = FastAPI()
+    test_app.add_middleware(RequestMetricsMiddleware)
+    test_app.include_router(router)
+    return TestClient(test_app)
+
+
+def test_n_plus_one_route_exceeds_budget(farm_data, strict_query_budget, monkeypatch, caplog):
+    monkeypatch.setattr("app.core.config.settings.QUERY_REPEAT_THRESHOLD", 3)
+    with caplog.at_level(logging.WARNING, logger="app.db.query_detector"):
+        with pytest.raises(QueryBudgetExceeded) as exc_info:
+            _n_plus_one_client().get("/yields")
+
+    assert exc_info.value.budget == 2
+    assert exc_info.value.queries == 1 + len(farm_data["crops"])
+    assert any("N+1" in record.getMessage() for record in caplog.records)
+
+
+def test_budget_not_enforced_without_strict_mode(farm_data, monkeypatch):
+    """非严格模式下超出预算只记录日志，请求照常返回"""
+    monkeypatch.setattr("app.core.config.settings.QUERY_DETECTOR_ENABLED", True)
+    response = _n_plus_one_client().get("/yields")
+    assert response.status_code == 200
@@ -0,0 +1,68 @@
+"""
+搜索测试
+短关键词与中日韩关键词走 bigram 路径：PostgreSQL 上以 search_grams 表达式索引筛选（表达式须与索引一致），
+并按匹配位置排序
+"""
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from app.models import Crop
+from app.services import search
+from tests.conftest import API
+
+
+class _PostgresSession:
+    """只提供方言信息的会话替身，用于生成 PostgreSQL 的 SQL"""
+    dialect = postgresql.dialect()
+
+    def get_bind(self):
+        return self
+
+
+@pytest.mark.parametrize("q, expected", [
+    ("稻", True),
+    ("水稻", True),
+    ("杂交水稻", True),
+    ("ab", True),
+    ("rice", False),
+])
+def test_uses_bigrams(q, expected):
+    assert search.uses_bigrams(q) is expected
+
+
+def test_query_grams():
+    assert search.query_grams("稻") == ["稻"]
+    assert search.query_grams("杂交水稻") == ["交水", "杂交", "水稻"]
+    assert search.query_grams("AB") == ["ab"]
+
+
+def test_bigram_condition_matches_index_expression():
+    dialect = postgresql.dialect()
+    index = next(ix for ix in Crop.__table__.indexes if ix.name == "ix_crops_search_grams")
+    indexed = str(CreateIndex(index).compile(dialect=dialect)).split("USING gin (", 1)[1][:-1]
+
+    sql = str(select(Crop.id).where(search.matches(_PostgresSession(), Crop, "水稻")).compile(dialect=dialect))
+    assert indexed.replace("name", "crops.name").replace("variety", "crops.variety").replace("notes", "crops.notes") in sql
+    assert "@>" in sql
+
+    sql = str(select(Crop.id).where(search.matches(_PostgresSession(), Crop, "rice")).compile(dialect=dialect))
+    assert "search_grams" not in sql
+
+
+def test_short_cjk_search_ranks_name_prefix_first(client, farm_data):
+    for name in ("杂交水稻", "水稻王"):
+        response = client.post(f"{API}/crops/", json={
+            "name": name, "variety": "测试", "area": 1, "plant_date": "2024-04-01",
+        })
+        assert response.status_code == 201, response.text
+
+    response = client.get(f"{API}/search/", params={"q": "水稻", "category": "crop"})
+    assert response.status_code == 200
+    names = [item["name"] for item in response.json()["items"]]
+    assert set(names) >= {"杂交水稻", "水稻王"}
+    assert names.index("水稻王") < names.index("杂交水稻")
+
+    response = client.get(f"{API}/search/", params={"q": "稻", "category": "crop"})
+    assert {"杂交水稻", "水稻王"} <= {item["name"] for item in response.json()["items"]}